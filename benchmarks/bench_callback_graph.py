@@ -0,0 +1,108 @@
+"""
+Measure the Dash app's callback graph and the cost of a tree toggle.
+
+Imports ``dash/src/dashboard.py`` against a synthetic CSV with the requested
+number of departments and reports the number of registered callbacks, the
+number of inputs/outputs/states they declare, the size of the
+``/_dash-dependencies`` payload the browser downloads, and the server-side
+latency of toggling a department.  Toggles handled by clientside callbacks
+need no request at all and are reported as such.
+
+    python benchmarks/bench_callback_graph.py --departments 4 200 1000
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic_data import write_csv
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+src_dir = os.path.join(repo_dir, 'dash', 'src')
+
+TOGGLE_REPEATS = 200
+ROWS_PER_DEPARTMENT = 5
+
+
+def measure():
+    sys.path.insert(0, src_dir)
+    import dashboard
+
+    app = dashboard.app
+    client = app.server.test_client()
+    dependencies = client.get('/_dash-dependencies').get_data()
+    callbacks = json.loads(dependencies)
+    report = {
+        'server_callbacks': sum(1 for c in callbacks if not c.get('clientside_function')),
+        'clientside_callbacks': sum(1 for c in callbacks if c.get('clientside_function')),
+        'declared_inputs': sum(len(c['inputs']) for c in callbacks),
+        'declared_states': sum(len(c['state']) for c in callbacks),
+        'declared_outputs': sum(c['output'].count('...') + 1 if c['output'].startswith('..') else 1 for c in callbacks),
+        'dependencies_bytes': len(dependencies),
+        'toggle': 'clientside (no request)',
+    }
+
+    # Time whichever server-side callback toggles a department, if any.
+    departments = dashboard.data_source.snapshot().departments()
+    for key, entry in app.callback_map.items():
+        name = getattr(entry.get('callback'), '__name__', None)
+        if name == 'toggle_collapse':
+            body = {
+                'output': key,
+                'outputs': [{'id': f"dept-{d}-collapse", 'property': 'is_open'} for d in departments],
+                'inputs': [{'id': f"dept-{d}-toggle", 'property': 'n_clicks', 'value': None} for d in departments],
+                'state': [{'id': f"dept-{d}-collapse", 'property': 'is_open', 'value': False} for d in departments],
+                'changedPropIds': [f"dept-{departments[0]}-toggle.n_clicks"],
+            }
+        elif name == 'toggle_department_collapse':
+            dept_id = {'type': 'dept-button', 'index': departments[0]}
+            collapse_id = {'type': 'dept-collapse', 'index': departments[0]}
+            body = {
+                'output': key,
+                'outputs': {'id': collapse_id, 'property': 'is_open'},
+                'inputs': [{'id': dept_id, 'property': 'n_clicks', 'value': 1}],
+                'state': [{'id': collapse_id, 'property': 'is_open', 'value': False}],
+                'changedPropIds': [json.dumps(dept_id, sort_keys=True, separators=(',', ':')) + '.n_clicks'],
+            }
+        else:
+            continue
+        timings = []
+        for _ in range(TOGGLE_REPEATS):
+            start = time.perf_counter()
+            response = client.post('/_dash-update-component', json=body)
+            timings.append((time.perf_counter() - start) * 1000)
+        report[f"{name}_ms_p50"] = round(statistics.median(timings), 3)
+        report[f"{name}_request_bytes"] = len(json.dumps(body))
+        report[f"{name}_response_bytes"] = len(response.get_data())
+        report['toggle'] = 'server'
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--departments', type=int, nargs='+', default=[4, 200, 1000])
+    parser.add_argument('--measure', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure()))
+        return
+
+    # Each department count runs in a fresh interpreter because the app
+    # registers its callbacks at import time.
+    for departments in args.departments:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'data.csv')
+            write_csv(csv_path, departments * ROWS_PER_DEPARTMENT, departments=departments)
+            env = dict(os.environ, DASHBOARD_DATA_PATH=csv_path, DASHBOARD_WATCH_INTERVAL='0')
+            output = subprocess.run([sys.executable, __file__, '--measure'], env=env, check=True,
+                                    capture_output=True, text=True).stdout
+            print(json.dumps({'departments': departments, **json.loads(output.strip().splitlines()[-1])}))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark applying row deltas against reloading the whole roster.
+
+For each roster size a ``Dataset`` is loaded and its Statistics page
+aggregates (salary describe/mean/median/sum, the bar totals and the box plot
+statistics) are computed.  A delta of salary changes and new hires is then
+applied two ways, and the time until every aggregate is available again is
+reported:
+
+* reload: a new ``Dataset`` of the updated frame, aggregated from scratch
+* delta: ``Dataset.apply_delta``, which updates the fingerprint, the Name
+  order and the salary statistics from the changed rows alone
+
+Both must produce identical aggregates; the benchmark checks that they do.
+
+    python benchmarks/bench_ingest.py --sizes 100000 1000000 --deltas 1 100 1000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, repo_dir)
+
+from dashboard_core import Dataset, load_frame  # noqa: E402
+from synthetic_data import write_csv  # noqa: E402
+
+STATS = ('describe', 'mean', 'median', 'sum')
+
+
+def statistics(dataset):
+    aggregates = {stat: dataset.salary_aggregate(stat) for stat in STATS}
+    aggregates['bar'] = dataset.salary_by_department()
+    aggregates['box'] = dataset.salary_box_stats()
+    return aggregates
+
+
+def delta_records(data, size, rng):
+    """
+    ``size`` records, half salary changes of random employees and half new
+    hires copied from random employees.
+    """
+    records = []
+    for _ in range(size):
+        row = data.iloc[rng.randrange(len(data))]
+        salary = int(row['Salary'] * rng.uniform(0.9, 1.2))
+        if rng.random() < 0.5:
+            records.append({'id': int(row.name), 'Salary': salary})
+        else:
+            records.append({**{column: row[column] for column in data.columns}, 'Salary': salary})
+    return records
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--deltas', type=int, nargs='+', default=[1, 100, 1000])
+    args = parser.parse_args()
+    rng = random.Random(0)
+
+    print(f"{'rows':>10}{'delta':>8}  {'reload (s)':>12}{'delta (s)':>12}{'speedup':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.sizes:
+            path = os.path.join(tmp, f"data-{rows}.csv")
+            write_csv(path, rows)
+            dataset = Dataset(load_frame(path))
+            statistics(dataset)
+            for size in args.deltas:
+                records = delta_records(dataset.data, size, rng)
+                updated, incremental = timed(lambda: dataset.apply_delta(records))
+                after, seconds = timed(lambda: statistics(updated))
+                incremental += seconds
+                reloaded, full = timed(lambda: statistics(Dataset(updated.data)))
+                for name, frame in after.items():
+                    pd.testing.assert_frame_equal(frame, reloaded[name])
+                print(f"{rows:>10}{size:>8}  {full:>12.4f}{incremental:>12.4f}{full / incremental:>9.1f}x",
+                      flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+"""
+Page latency benchmark for the Dash and Streamlit dashboards.
+
+For every row-count tier a synthetic ``data.csv`` is generated (see
+``synthetic_data.py``) and each app is loaded against it in a fresh
+interpreter, once per ``--backends`` entry: ``pandas`` loads the CSV, while
+``sqlite`` converts it to a database first and queries that.
+
+* Dash: every callback a page fires is posted to ``/_dash-update-component``
+  through the Flask test client, exactly as the browser would send it.
+  Background callbacks are polled every ``BACKGROUND_POLL`` seconds until
+  their result arrives, and timed up to that point.
+* Streamlit: each page is selected in the sidebar and rerun with ``AppTest``.
+
+For each page the first (cold) run is reported on its own, then ``--repeat``
+warm runs give p50/p95/p99 latency.  Response bytes are the callback response
+bodies for Dash and the serialized element protos for Streamlit; peak RSS is
+sampled while the page runs.  Results are written as one JSON document so
+runs can be archived and compared; ``--baseline`` compares against an earlier
+document and exits non-zero when a page's p50 regressed beyond ``--tolerance``.
+
+    python benchmarks/bench_pages.py --rows 50 10000 100000 --output results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, repo_dir)
+
+from dashboard_core.sql_backend import import_csv  # noqa: E402
+from synthetic_data import write_csv  # noqa: E402
+
+APPS = ('dash', 'streamlit')
+BACKENDS = ('pandas', 'sqlite')
+BACKGROUND_POLL = 0.02
+RSS_SAMPLE_INTERVAL = 0.005
+# A pan to a zoom-6 view of the central US, as Plotly reports it: the view
+# and the corners of the visible map.
+MAP_RELAYOUT = {
+    'mapbox.center': {'lat': 39.5, 'lon': -90.0},
+    'mapbox.zoom': 6,
+    'mapbox._derived': {'coordinates': [[-100.5, 44.5], [-79.5, 44.5], [-79.5, 34.5], [-100.5, 34.5]]},
+}
+
+
+class PeakRSS:
+    """
+    Context manager sampling this process's resident set size on a thread.
+
+    Falls back to ``ru_maxrss`` (the peak since process start) where
+    ``/proc`` is not available.
+    """
+
+    def __init__(self):
+        self.peak = 0
+        self._stop = threading.Event()
+
+    @staticmethod
+    def current():
+        try:
+            with open('/proc/self/statm') as statm:
+                return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError):
+            scale = 1 if sys.platform == 'darwin' else 1024
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    def _sample(self):
+        while True:
+            self.peak = max(self.peak, self.current())
+            if self._stop.wait(RSS_SAMPLE_INTERVAL):
+                break
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def summarize(timings_ms):
+    warm = np.asarray(timings_ms[1:] or timings_ms)
+    return {
+        'cold_ms': round(timings_ms[0], 3),
+        'p50_ms': round(float(np.percentile(warm, 50)), 3),
+        'p95_ms': round(float(np.percentile(warm, 95)), 3),
+        'p99_ms': round(float(np.percentile(warm, 99)), 3),
+    }
+
+
+# Dash
+
+def prop_id(component_id, prop):
+    if isinstance(component_id, dict):
+        component_id = json.dumps(component_id, sort_keys=True, separators=(',', ':'))
+    return f"{component_id}.{prop}"
+
+
+def dash_step(name, outputs, inputs, state=()):
+    """
+    One callback invocation: ``outputs`` are (id, property) pairs, ``inputs``
+    and ``state`` (id, property, value) triples; the first input is the trigger.
+    """
+    return {
+        'name': name,
+        'outputs': [{'id': i, 'property': p} for i, p in outputs] if len(outputs) > 1
+        else {'id': outputs[0][0], 'property': outputs[0][1]},
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+        'state': [{'id': i, 'property': p, 'value': v} for i, p, v in state],
+        'changedPropIds': [prop_id(inputs[0][0], inputs[0][1])],
+    }
+
+
+def post_callback(client, body):
+    """
+    Post one callback and, for a background callback, poll its job until the
+    result is ready.  Returns the final response.
+    """
+    response = client.post('/_dash-update-component', json=body)
+    job = response.get_json(silent=True) or {}
+    if 'cacheKey' not in job:
+        return response
+    while True:
+        time.sleep(BACKGROUND_POLL)
+        response = client.post(f"/_dash-update-component?cacheKey={job['cacheKey']}&job={job['job']}", json=body)
+        if response.status_code != 200 or 'response' in (response.get_json(silent=True) or {}):
+            return response
+
+
+def paged_table_step(source):
+    table = {'type': 'paged-table', 'index': source}
+    return dash_step('update_paged_table', [(table, 'data'), (table, 'page_count')],
+                     [(table, 'page_current', 0), (table, 'page_size', 25), (table, 'sort_by', []),
+                      (table, 'filter_query', '')],
+                     [(table, 'id', table)])
+
+
+def dash_pages(snapshot):
+    """
+    The callbacks each page fires on load and on its main interaction.
+    """
+    dept = snapshot.departments()[0]
+    collapse = {'type': 'dept-collapse', 'index': dept}
+    more = {'type': 'dept-more', 'index': dept}
+    loaded = {'type': 'dept-loaded', 'index': dept}
+    children = {'type': 'dept-children', 'index': dept}
+
+    def page(pathname):
+        return dash_step('display_page', [('page-content', 'children')], [('url', 'pathname', pathname)])
+
+    def on_url(name, output, *extra):
+        return dash_step(name, [(output, 'figure' if 'salary' in output else 'children')],
+                         [('url', 'pathname', '/statistics'), *extra])
+
+    return {
+        'overview': [page('/')],
+        'employee-data': [
+            page('/employee-data'),
+            dash_step('update_filtered_employee_data', [('filtered-employee-data', 'children')],
+                      [('department-dropdown', 'value', dept)]),
+            paged_table_step(f"department:{dept}"),
+            dash_step('update_search_results', [('search-results', 'children')], [('search-name', 'value', 'an')]),
+            paged_table_step('search:an'),
+            dash_step('update_raw_data', [('raw-data', 'children')], [('show-raw-data', 'value', True)]),
+            paged_table_step('raw'),
+        ],
+        'statistics': [
+            page('/statistics'),
+            on_url('update_salary_distribution_2d', 'salary-distribution-2d', ('exact-figures', 'value', False)),
+            dash_step('update_salary_distribution_3d', [('salary-distribution-3d', 'figure')],
+                      [('exact-figures', 'value', False)]),
+            dash_step('update_salary_age_intervals', [('salary-age-intervals', 'figure')],
+                      [('salary-age-intervals', 'id', 'salary-age-intervals')]),
+            on_url('update_summary_statistics_table', 'summary-statistics-table'),
+            dash_step('update_summary_statistic', [('selected-summary-statistic', 'children')],
+                      [('summary-statistic-radio', 'value', 'mean')]),
+        ],
+        'department-tree-view': [
+            page('/department-tree-view'),
+            dash_step('load_department_employees',
+                      [(children, 'children'), (loaded, 'data'), (more, 'style')],
+                      [(collapse, 'is_open', True), (more, 'n_clicks', None)],
+                      [(loaded, 'data', 0), (more, 'style', {})]),
+        ],
+        'interactive-map': [
+            page('/interactive-map'),
+            dash_step('update_employee_options', [('employee-dropdown', 'options')],
+                      [('employee-dropdown', 'search_value', 'an')], [('employee-dropdown', 'value', None)]),
+            dash_step('update_map', [('employee-map', 'figure')], [('employee-dropdown', 'value', 0)]),
+            dash_step('update_map_clusters', [('employee-map', 'figure')],
+                      [('employee-map', 'relayoutData', MAP_RELAYOUT)]),
+        ],
+    }
+
+
+def run_dash(repeat):
+    sys.path.insert(0, os.path.join(repo_dir, 'dash', 'src'))
+    import dashboard
+
+    app = dashboard.app
+    client = app.server.test_client()
+    keys = {getattr(entry.get('callback'), '__name__', None): key for key, entry in app.callback_map.items()}
+    results = []
+    for page, steps in dash_pages(dashboard.data_source.snapshot()).items():
+        page_timings, callbacks = [], {}
+        with PeakRSS() as rss:
+            for _ in range(repeat + 1):
+                total = 0.0
+                for step in steps:
+                    body = {key: value for key, value in step.items() if key != 'name'}
+                    body['output'] = keys[step['name']]
+                    start = time.perf_counter()
+                    response = post_callback(client, body)
+                    elapsed = (time.perf_counter() - start) * 1000
+                    if response.status_code not in (200, 204):
+                        raise RuntimeError(f"{step['name']} returned {response.status_code}")
+                    total += elapsed
+                    stats = callbacks.setdefault(step['name'], {'timings': [], 'response_bytes': 0})
+                    stats['timings'].append(elapsed)
+                    stats['response_bytes'] = len(response.get_data())
+                page_timings.append(total)
+        results.append({
+            'page': page,
+            **summarize(page_timings),
+            'response_bytes': sum(stats['response_bytes'] for stats in callbacks.values()),
+            'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+            'callbacks': {name: {**summarize(stats['timings']), 'response_bytes': stats['response_bytes']}
+                          for name, stats in callbacks.items()},
+        })
+    return results
+
+
+# Streamlit
+
+STREAMLIT_PAGES = ["Overview", "Employee Data", "Statistics", "Department Tree View", "Interactive Map"]
+
+
+def element_bytes(node):
+    if hasattr(node, 'children'):
+        return sum(element_bytes(child) for child in node.children.values())
+    proto = getattr(node, 'proto', None)
+    return len(proto.SerializeToString()) if proto is not None else 0
+
+
+def run_streamlit(repeat, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    app_dir = os.path.join(repo_dir, 'streamlit')
+    sys.path.insert(0, os.path.join(app_dir, 'src'))
+    # The app reads data.csv, styles.css and logo.png from its working directory.
+    for asset in ('styles.css', 'logo.png'):
+        shutil.copy(os.path.join(app_dir, asset), asset)
+
+    at = AppTest.from_file(os.path.join(app_dir, 'src', 'dashboard.py'), default_timeout=timeout)
+    at.run()
+    results = []
+    for page in STREAMLIT_PAGES:
+        timings = []
+        with PeakRSS() as rss:
+            at.sidebar.radio[0].set_value(page)
+            for _ in range(repeat + 1):
+                start = time.perf_counter()
+                at.run()
+                timings.append((time.perf_counter() - start) * 1000)
+                if at.exception:
+                    raise RuntimeError(f"{page}: {at.exception[0].message}")
+        results.append({
+            'page': page.lower().replace(' ', '-'),
+            **summarize(timings),
+            'response_bytes': element_bytes(at._tree),
+            'peak_rss_mb': round(rss.peak / 2 ** 20, 1),
+        })
+    return results
+
+
+# Driver
+
+def run_tier(app, rows, repeat, timeout, backend='pandas'):
+    """
+    Run one app against ``rows`` synthetic employees in a fresh interpreter.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = write_csv(os.path.join(tmp, 'data.csv'), rows)
+        if backend == 'sqlite':
+            import_csv(data_path, os.path.join(tmp, 'data.db'))
+            data_path = os.path.join(tmp, 'data.db')
+        env = dict(os.environ, DASHBOARD_DATA_PATH=data_path, DASHBOARD_WATCH_INTERVAL='0',
+                   DASHBOARD_BACKGROUND_CACHE=os.path.join(tmp, 'background'))
+        command = [sys.executable, os.path.abspath(__file__), '--worker', app,
+                   '--repeat', str(repeat), '--timeout', str(timeout)]
+        completed = subprocess.run(command, cwd=tmp, env=env, capture_output=True, text=True)
+        if completed.returncode:
+            raise RuntimeError(f"{app} on {backend} at {rows} rows failed:\n{completed.stderr}")
+        pages = json.loads(completed.stdout.strip().splitlines()[-1])
+    return [{'app': app, 'backend': backend, 'rows': rows, **page} for page in pages]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Pages whose warm p50 grew by more than ``tolerance`` over ``baseline``.
+    """
+    def key(result):
+        return result['app'], result.get('backend', 'pandas'), result['rows'], result['page']
+
+    before = {key(r): r for r in baseline['results']}
+    found = []
+    for result in results:
+        old = before.get(key(result))
+        if old and result['p50_ms'] > old['p50_ms'] * (1 + tolerance):
+            found.append({'app': result['app'], 'backend': result['backend'], 'rows': result['rows'],
+                          'page': result['page'], 'baseline_p50_ms': old['p50_ms'], 'p50_ms': result['p50_ms']})
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[50, 10000, 100000])
+    parser.add_argument('--apps', nargs='+', choices=APPS, default=list(APPS))
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['pandas'])
+    parser.add_argument('--repeat', type=int, default=20, help="warm runs per page after the cold one")
+    parser.add_argument('--timeout', type=float, default=600, help="seconds allowed per Streamlit rerun")
+    parser.add_argument('--output', help="write the JSON document here instead of stdout")
+    parser.add_argument('--baseline', help="earlier --output document to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--worker', choices=APPS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker == 'dash':
+        print(json.dumps(run_dash(args.repeat)))
+        return
+    if args.worker == 'streamlit':
+        print(json.dumps(run_streamlit(args.repeat, args.timeout)))
+        return
+
+    results = []
+    for rows in args.rows:
+        for backend in args.backends:
+            for app in args.apps:
+                results.extend(run_tier(app, rows, args.repeat, args.timeout, backend))
+                print(f"{app} on {backend} at {rows} rows done", file=sys.stderr, flush=True)
+    document = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            document['regressions'] = regressions(results, json.load(baseline), args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(document, output, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+    if document.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,216 @@
+"""
+Cold start benchmark for the Dash dashboard.
+
+For every row-count tier a synthetic ``data.csv`` is generated and the app is
+started ``--repeat`` times, each in a fresh interpreter serving on a free
+port with Flask's server.  Every start reports:
+
+* import_s: the time to import the ``dashboard`` module
+* first_byte_s: from process start to the first byte of ``GET /``
+* overview_s: from process start to the Overview page's content, the
+  ``display_page`` callback the browser fires right after loading ``/``
+* statistics_ms: the first navigation to Statistics afterwards: its
+  ``display_page`` callback plus the bar chart and summary table callbacks
+
+Medians over the starts are written as one JSON document.  ``--prewarm``
+adds a run of each tier with ``DASHBOARD_PREWARM=1``; its Statistics page is
+requested once the warm-up has had ``--settle`` seconds.  ``--baseline``
+compares against an earlier document and exits non-zero when a median grew
+beyond ``--tolerance``.
+
+    python benchmarks/bench_startup.py --rows 10000 500000 --output startup.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, repo_dir)
+
+from bench_pages import git_revision  # noqa: E402
+from synthetic_data import write_csv  # noqa: E402
+
+METRICS = ('import_s', 'first_byte_s', 'overview_s', 'statistics_ms')
+STARTUP_TIMEOUT = 120
+POLL_INTERVAL = 0.005
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def callback_body(output, inputs):
+    """
+    A ``/_dash-update-component`` request for ``output`` ("id.property")
+    triggered by the first of ``inputs``, (id, property, value) triples.
+    """
+    component, prop = output.split('.')
+    return {
+        'output': output,
+        'outputs': {'id': component, 'property': prop},
+        'inputs': [{'id': i, 'property': p, 'value': v} for i, p, v in inputs],
+        'changedPropIds': [f"{inputs[0][0]}.{inputs[0][1]}"],
+    }
+
+
+def display_page(pathname):
+    return callback_body('page-content.children', [('url', 'pathname', pathname)])
+
+
+STATISTICS_CALLBACKS = [
+    display_page('/statistics'),
+    callback_body('salary-distribution-2d.figure',
+                  [('url', 'pathname', '/statistics'), ('exact-figures', 'value', False)]),
+    callback_body('summary-statistics-table.children', [('url', 'pathname', '/statistics')]),
+]
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    with urllib.request.urlopen(urllib.request.Request(url, data=data, headers=headers)) as response:
+        response.read(1)
+        if response.status != 200:
+            raise RuntimeError(f"{url} returned {response.status}")
+        response.read()
+
+
+def first_response(url, process):
+    # Connections are refused until the server is listening.
+    deadline = time.perf_counter() + STARTUP_TIMEOUT
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"the app exited with {process.returncode}:\n{process.stderr.read()}")
+        try:
+            return request(url)
+        except urllib.error.URLError:
+            time.sleep(POLL_INTERVAL)
+    raise RuntimeError(f"no response from {url} within {STARTUP_TIMEOUT}s")
+
+
+def serve(port):
+    """
+    Worker: import the app, report the import time on stdout and serve it
+    the way ``python dashboard.py`` does, without the reloader.
+    """
+    sys.path.insert(0, os.path.join(repo_dir, 'dash', 'src'))
+    start = time.perf_counter()
+    import dashboard
+    print(json.dumps({'import_s': time.perf_counter() - start}), flush=True)
+    import prewarm
+    if prewarm.PREWARM_ENABLED:
+        prewarm.start_prewarm()
+    dashboard.app.run(port=port, debug=False)
+
+
+def start_once(env, settle):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    command = [sys.executable, os.path.abspath(__file__), '--worker', str(port)]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    try:
+        first_response(url + '/', process)
+        first_byte = time.perf_counter() - start
+        request(url + '/_dash-update-component', display_page('/'))
+        overview = time.perf_counter() - start
+        time.sleep(settle)
+        navigation = time.perf_counter()
+        for body in STATISTICS_CALLBACKS:
+            request(url + '/_dash-update-component', body)
+        statistics_ms = (time.perf_counter() - navigation) * 1000
+        imported = json.loads(process.stdout.readline())
+    finally:
+        process.terminate()
+        process.communicate()
+    return {'import_s': imported['import_s'], 'first_byte_s': first_byte, 'overview_s': overview,
+            'statistics_ms': statistics_ms}
+
+
+def run_tier(rows, repeat, prewarm, settle):
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = write_csv(os.path.join(tmp, 'data.csv'), rows)
+        env = dict(os.environ, DASHBOARD_DATA_PATH=data_path, DASHBOARD_WATCH_INTERVAL='0',
+                   DASHBOARD_BACKGROUND_CACHE=os.path.join(tmp, 'background'),
+                   DASHBOARD_PREWARM='1' if prewarm else '0')
+        starts = [start_once(env, settle if prewarm else 0) for _ in range(repeat)]
+    return {
+        'rows': rows,
+        'prewarm': prewarm,
+        **{metric: round(statistics.median(start[metric] for start in starts), 4) for metric in METRICS},
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """
+    Metrics whose median grew by more than ``tolerance`` over ``baseline``.
+    """
+    before = {(r['rows'], r['prewarm']): r for r in baseline['results']}
+    found = []
+    for result in results:
+        old = before.get((result['rows'], result['prewarm']))
+        for metric in METRICS:
+            if old and result[metric] > old[metric] * (1 + tolerance):
+                found.append({'rows': result['rows'], 'prewarm': result['prewarm'], 'metric': metric,
+                              'baseline': old[metric], 'value': result[metric]})
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 500000])
+    parser.add_argument('--repeat', type=int, default=5, help="starts per tier")
+    parser.add_argument('--prewarm', action='store_true', help="also start each tier with DASHBOARD_PREWARM=1")
+    parser.add_argument('--settle', type=float, default=10, help="seconds the warm-up gets before Statistics")
+    parser.add_argument('--output', help="write the JSON document here instead of stdout")
+    parser.add_argument('--baseline', help="earlier --output document to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        serve(args.worker)
+        return
+
+    results = []
+    for rows in args.rows:
+        for prewarm in (False, True) if args.prewarm else (False,):
+            results.append(run_tier(rows, args.repeat, prewarm, args.settle))
+            print(f"{rows} rows{' with prewarm' if prewarm else ''} done", file=sys.stderr, flush=True)
+    document = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            document['regressions'] = regressions(results, json.load(baseline), args.tolerance)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(document, output, indent=2)
+    else:
+        print(json.dumps(document, indent=2))
+    if document.get('regressions'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Check that the SQLite backend answers every ``Backend`` query exactly as the
+in-memory ``Dataset`` does.
+
+A synthetic roster is written as a CSV, loaded into a ``Dataset`` and
+converted with ``import_csv``; then both backends run the same queries:
+table pages and chunks narrowed by department, search and DataTable filter
+expressions and ordered by ``sort_by`` (the SQL translation of
+``table_query``), searches short enough to scan and long enough for the
+FTS5 trigram index, aggregates, department trees and map layers.  Results
+are compared by value, row ids included; each difference is printed and the
+script exits non-zero if there is any.
+
+    python benchmarks/check_backend_parity.py --rows 60000
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, repo_dir)
+
+from dashboard_core import Dataset, SQLiteBackend, load_frame  # noqa: E402
+from dashboard_core.map_layers import viewport_around, viewport_boxes  # noqa: E402
+from dashboard_core.sql_backend import import_csv  # noqa: E402
+from synthetic_data import write_csv  # noqa: E402
+
+# One and two characters are matched by scanning, three or more through the
+# trigram index; the rest cover case, spaces, regex characters and misses.
+SEARCHES = ['a', 'an', 'AN', 'ann', 'son', 'New York', 'new y', ' ', 'o (', '.*', '%', '_', 'zzz']
+FILTERS = [
+    '',
+    '{Age} > 40',
+    '{Age} >= 40 && {Salary} < 90000',
+    '{Age} != 35',
+    '{Age} = 35',
+    '{Age} eq 35',
+    '{Salary} le 60000.5',
+    '{Age} > abc',
+    '{City} contains Bo',
+    '{City} icontains bo',
+    '{City} scontains bo',
+    '{Name} datestartswith J',
+    '{Name} idatestartswith j',
+    '{Department} = Finance',
+    '{Department} ieq finance',
+    '{Department} != Finance',
+    '{City} is blank',
+    '{Unknown} = 1',
+    '{City} contains "San',
+]
+SORTS = [
+    [],
+    [{'column_id': 'Salary', 'direction': 'desc'}],
+    [{'column_id': 'City', 'direction': 'asc'}, {'column_id': 'Age', 'direction': 'desc'}],
+    [{'column_id': 'Name', 'direction': 'desc'}],
+    [{'column_id': 'Department', 'direction': 'asc'}, {'column_id': 'lat', 'direction': 'asc'}],
+    [{'column_id': 'Unknown', 'direction': 'asc'}],
+]
+# (zoom, corners reported by Plotly) of map views, and whole-map zooms.
+MAP_VIEWS = [
+    (6, [[-100.5, 44.5], [-79.5, 44.5], [-79.5, 34.5], [-100.5, 34.5]]),
+    (9, [[-74.3, 40.9], [-73.7, 40.9], [-73.7, 40.5], [-74.3, 40.5]]),
+    (2, [[170.0, 60.0], [-170.0, 60.0], [-170.0, -60.0], [170.0, -60.0]]),
+]
+MAP_ZOOMS = [1, 3, 6]
+EXACT_COLUMNS = ['Age', 'Salary', 'Department']
+
+
+def plain(value):
+    """
+    ``value`` as nested Python lists, dicts and scalars, with missing values
+    as None and floats rounded, so results compare across dtypes.
+    """
+    if isinstance(value, pd.DataFrame):
+        frame = value.astype(object).where(value.notna(), None)
+        return {'columns': [str(c) for c in frame.columns], 'index': plain(frame.index),
+                'rows': plain(frame.to_numpy().tolist())}
+    if isinstance(value, (pd.Series, pd.Index)):
+        return plain(value.astype(object).where(value.notna(), None).tolist())
+    if isinstance(value, np.ndarray):
+        return plain(value.tolist())
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return None if math.isnan(value) else round(value, 6)
+    return value
+
+
+def markers(layer):
+    """
+    The markers of a map layer as sorted (lat, lon, text, size) tuples; the
+    order markers are drawn in does not matter.
+    """
+    sizes = layer['size'] if not isinstance(layer['size'], int) else [layer['size']] * len(layer['lat'])
+    return sorted(zip(*(plain(layer[key]) for key in ('lat', 'lon', 'text')), plain(sizes)))
+
+
+def queries(data):
+    """
+    (description, function of a backend) pairs covering the ``Backend`` methods.
+    """
+    departments = sorted(data['Department'].dropna().unique())
+    checks = [
+        ('len', len),
+        ('columns', lambda b: list(b.columns)),
+        ('departments', lambda b: b.departments()),
+        # Dataset hands out its whole frame; only the requested columns count.
+        ('exact_frame', lambda b: b.exact_frame(EXACT_COLUMNS)[EXACT_COLUMNS]),
+        ('salary_by_department', lambda b: b.salary_by_department()),
+        ('salary_box_stats', lambda b: b.salary_box_stats()),
+        ('scatter_3d_bins', lambda b: b.scatter_3d_bins()),
+        ('map_center', lambda b: b.map_center()),
+        ('employee_location', lambda b: [b.employee_location(i) for i in (0, len(data) - 1, len(data), -1)]),
+        ('employee_labels', lambda b: b.employee_labels([len(data) - 1, 0, 7])),
+    ]
+    for stat in ('describe', 'mean', 'median', 'sum'):
+        checks.append((f"salary_aggregate {stat}", lambda b, stat=stat: b.salary_aggregate(stat)))
+    for department in departments[:3] + ['No Such Department']:
+        checks.append((f"department_size {department}", lambda b, d=department: b.department_size(d)))
+        checks.append((f"department_employees {department}",
+                       lambda b, d=department: b.department_employees(d, offset=10, limit=50)))
+    for search in SEARCHES:
+        checks.append((f"search_employees {search!r}", lambda b, s=search: b.search_employees(s, limit=20)))
+    for zoom in MAP_ZOOMS:
+        checks.append((f"map_layer zoom {zoom}", lambda b, z=zoom: markers(b.map_layer(z))))
+    for zoom, corners in MAP_VIEWS:
+        checks.append((f"map_layer view {corners[0]} zoom {zoom}",
+                       lambda b, z=zoom, c=corners: markers(b.map_layer(z, viewport_boxes(c)))))
+    checks.append(('map_layer around', lambda b: markers(b.map_layer(6, viewport_around(40.7, -74.0, 6)))))
+
+    scopes = [{}, {'department': departments[0]}, {'search': 'an'}, {'search': 'son'},
+              {'department': departments[-1], 'search': 'ar'}]
+    for scope in scopes:
+        for filter_query in FILTERS:
+            for sort_by in SORTS:
+                query = dict(scope, filter_query=filter_query, sort_by=sort_by)
+                for page_current, page_size in ((0, 25), (3, 100)):
+                    checks.append((f"employee_page {query} page {page_current}x{page_size}",
+                                   lambda b, q=query, p=page_current, n=page_size:
+                                   b.employee_page(page_current=p, page_size=n, **q)))
+    for query in ({}, {'search': 'son', 'filter_query': '{Age} > 30',
+                       'sort_by': [{'column_id': 'Salary', 'direction': 'desc'}]}):
+        checks.append((f"employee_chunks {query}",
+                       lambda b, q=query: pd.concat(list(b.employee_chunks(chunk_size=997, **q)))))
+    return checks
+
+
+def differences(dataset, backend):
+    """
+    The number of queries run and the descriptions of those whose results
+    differ between the backends.
+    """
+    checks = queries(dataset.data)
+    return len(checks), [description for description, query in checks
+                         if plain(query(dataset)) != plain(query(backend))]
+
+
+def check(rows, directory):
+    data_path = write_csv(os.path.join(directory, 'data.csv'), rows)
+    db_path = os.path.join(directory, 'data.db')
+    import_csv(data_path, db_path)
+    return differences(Dataset(load_frame(data_path)), SQLiteBackend(db_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[60000])
+    args = parser.parse_args()
+
+    failed = False
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            count, found = check(rows, tmp)
+        for description in found:
+            print(f"{rows} rows: {description} differs", flush=True)
+        print(f"{rows} rows: {count} queries, {len(found)} differences", file=sys.stderr, flush=True)
+        failed = failed or bool(found)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
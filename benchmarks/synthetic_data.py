@@ -0,0 +1,86 @@
+"""
+Synthetic employee data at any scale, shaped like ``data.csv``.
+
+Department and city frequencies, each city's coordinates and the per
+department salary spread are taken from the shipped ``data.csv``; employees
+are drawn from those distributions, with locations jittered around their city
+so maps get realistic point clouds rather than a handful of stacked markers.
+
+    python benchmarks/synthetic_data.py --rows 1000000 --output /tmp/data.csv
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+repo_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BASE_CSV = os.path.join(repo_dir, 'dash', 'data.csv')
+
+# Standard deviation, in degrees, of the scatter around each city's center.
+LOCATION_JITTER = 0.08
+
+
+def generate(rows, departments=None, seed=0):
+    """
+    Return a DataFrame of ``rows`` employees with the columns of ``data.csv``.
+
+    ``departments`` replaces the real department names with that many
+    synthetic ones (``Dept 0`` ...), each present at least once when ``rows``
+    allows it.
+    """
+    base = pd.read_csv(BASE_CSV)
+    rng = np.random.default_rng(seed)
+
+    if departments is None:
+        dept_weights = base['Department'].value_counts(normalize=True)
+        dept_names = dept_weights.index.to_numpy()
+        dept = rng.choice(dept_names, size=rows, p=dept_weights.to_numpy())
+    else:
+        dept_names = np.array([f"Dept {i}" for i in range(departments)])
+        # Zipf-like sizes, with the first rows covering every department once.
+        weights = 1 / np.arange(1, departments + 1)
+        dept = rng.choice(dept_names, size=rows, p=weights / weights.sum())
+        dept[:min(rows, departments)] = dept_names[:min(rows, departments)]
+
+    salary_stats = base.groupby('Department')['Salary'].agg(['mean', 'std'])
+    mean = pd.Series(dept).map(salary_stats['mean']).fillna(base['Salary'].mean()).to_numpy()
+    std = pd.Series(dept).map(salary_stats['std']).fillna(base['Salary'].std()).to_numpy()
+    salary = np.maximum(rng.normal(mean, std), 30000).round().astype(np.int64)
+
+    cities = base.groupby('City').agg(lat=('lat', 'first'), lon=('lon', 'first'), n=('Name', 'size'))
+    city_pos = rng.choice(len(cities), size=rows, p=(cities['n'] / cities['n'].sum()).to_numpy())
+
+    first_names = base['Name'].str.split().str[0].unique()
+    last_names = base['Name'].str.split().str[-1].unique()
+    names = (pd.Series(rng.choice(first_names, size=rows)) + ' ' + pd.Series(rng.choice(last_names, size=rows))
+             + ' ' + pd.Series(np.arange(rows)).astype(str))
+
+    return pd.DataFrame({
+        'Name': names,
+        'Age': rng.integers(base['Age'].min(), base['Age'].max() + 1, size=rows),
+        'Department': dept,
+        'Salary': salary,
+        'City': cities.index.to_numpy()[city_pos],
+        'lat': (cities['lat'].to_numpy()[city_pos] + rng.normal(0, LOCATION_JITTER, rows)).round(4),
+        'lon': (cities['lon'].to_numpy()[city_pos] + rng.normal(0, LOCATION_JITTER, rows)).round(4),
+    })
+
+
+def write_csv(path, rows, departments=None, seed=0):
+    generate(rows, departments=departments, seed=seed).to_csv(path, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--rows', type=int, required=True)
+    parser.add_argument('--departments', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', required=True)
+    args = parser.parse_args()
+    write_csv(args.output, args.rows, departments=args.departments, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+# Production server settings: gunicorn --config gunicorn.conf.py --chdir src dashboard:server
+import multiprocessing
+import os
+
+bind = os.environ.get('DASHBOARD_BIND', '0.0.0.0:8050')
+workers = int(os.environ.get('DASHBOARD_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('DASHBOARD_THREADS', 4))
+# Each worker imports the app itself so its data watcher thread runs in that
+# worker; the memory-mapped Arrow cache keeps the column data shared anyway.
+preload_app = False
+timeout = 120
+
+
+def post_worker_init(worker):
+    # The app is loaded and the master already listens on the port, so with
+    # DASHBOARD_PREWARM=1 the worker warms up while it serves; see prewarm.py.
+    from prewarm import PREWARM_ENABLED, start_prewarm
+    if PREWARM_ENABLED:
+        start_prewarm()
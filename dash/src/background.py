@@ -0,0 +1,69 @@
+"""
+Background execution for the heavy statistics callbacks.
+
+Callbacks registered with ``background=True`` return right away with a job id;
+the figure is built in a child process and the browser polls for progress
+and the result.  Worker threads are not held for the seconds a large 3D
+scatter or box plot takes, so cheap interactions stay responsive meanwhile.
+A job is killed when the same callback fires again before it finishes (the
+renderer sends the superseded job along) or when one of its ``cancel``
+inputs changes.
+
+``DiskcacheManager`` needs no broker: jobs are plain processes and results
+live in a diskcache directory on the local disk.  The directory is shared by
+every worker on the host and results are keyed on the data fingerprint, so
+a figure built once is served to every worker until the data changes.
+
+Without ``dash[diskcache]`` installed, or with ``DASHBOARD_BACKGROUND=0``,
+``background_manager`` returns None and the callbacks run synchronously.
+"""
+import os
+import tempfile
+
+from dash import DiskcacheManager
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+BACKGROUND_ENABLED = os.environ.get('DASHBOARD_BACKGROUND', '1') not in ('', '0')
+CACHE_DIR = os.environ.get('DASHBOARD_BACKGROUND_CACHE', os.path.join(tempfile.gettempdir(), 'dashboard-background'))
+# Results not requested for this long are dropped from the cache.
+RESULT_EXPIRE = 3600
+# How often the browser polls a running job, in milliseconds.
+POLL_INTERVAL = 250
+
+
+def _cached_job(*_):
+    pass
+
+
+class CachedDiskcacheManager(DiskcacheManager):
+    """
+    ``DiskcacheManager`` that does not recompute cached results.
+
+    Dash starts a job for every call and only serves a cached result once the
+    browser polls, so the job would otherwise rebuild the figure until then.
+    """
+
+    def call_job_fn(self, key, job_fn, args, context):
+        if self.result_ready(key):
+            job_fn = _cached_job
+        return super().call_job_fn(key, job_fn, args, context)
+
+
+def background_manager(cache_by=(), enabled=BACKGROUND_ENABLED):
+    """
+    A diskcache-backed manager whose result keys include ``cache_by()``,
+    or None when background callbacks are unavailable.  Without
+    ``cache_by`` results are dropped once they are delivered.
+    """
+    if diskcache is None or not enabled:
+        return None
+    try:
+        return CachedDiskcacheManager(diskcache.Cache(CACHE_DIR), cache_by=list(cache_by) or None,
+                                      expire=RESULT_EXPIRE)
+    except ImportError:
+        # diskcache alone is not enough; the manager also needs psutil and multiprocess.
+        return None
@@ -1,10 +1,24 @@
 import os
+from functools import wraps
 import dash
-from dash import dcc, html, Input, Output, State, dash_table, MATCH
+from dash import dcc, html, Input, Output, State, ALL, MATCH, ctx, no_update
 import dash_bootstrap_components as dbc
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from flask import abort, send_from_directory
+
+import pages
+from background import POLL_INTERVAL, background_manager
+from instrumentation import instrument
+from prewarm import PREWARM_ENABLED, start_prewarm
+from serving import COMPRESS_ENABLED, compress_responses, use_fast_json
+# Also puts the shared dashboard_core package, at the repository root, on the path.
+from shared import PROGRESS_HIDDEN, PROGRESS_SHOWN, data_source, export_cache, progress_bar, table_source_query
+
+from dashboard_core.export import EXPORT_FORMATS, available_formats, export_filename
+
+# Pages are imported on first use (see pages/__init__.py) and the data is
+# loaded on the first snapshot, so importing this module stays cheap: the
+# callbacks below are declared up front, as Dash needs the whole callback
+# graph when the app loads, but each only delegates to its page module.
 
 # Define the base directory
 base_dir = os.path.abspath(os.path.dirname(__file__))
@@ -12,120 +26,84 @@ assets_dir = os.path.join(base_dir, '..', 'assets')
 
 # Update paths to be relative to the script's directory
 external_stylesheets = [dbc.themes.BOOTSTRAP, '/assets/styles.css']
-data_path = os.path.join(base_dir, '..', 'data.csv')
 logo_path = '/assets/logo.png'
 
-app = dash.Dash(__name__, external_stylesheets=external_stylesheets, assets_folder=assets_dir)
+# Heavy statistics figures are built in background jobs whose results are
+# cached on disk per data fingerprint; the version number restarts with the
+# process, the fingerprint does not.  None when dash[diskcache] is missing.
+background_callback_manager = background_manager(cache_by=[lambda: data_source.snapshot().fingerprint])
+# Report exports are cached as files by dashboard_core.export, so their jobs
+# keep no result of their own.
+export_manager = background_manager()
+
+app = dash.Dash(__name__, external_stylesheets=external_stylesheets, assets_folder=assets_dir,
+                background_callback_manager=background_callback_manager)
 app.config.suppress_callback_exceptions = True  # Add this line
 
-data = pd.read_csv(data_path)
-
-header_colors = {
-    'Name': '#333333',
-    'Age': '#FFDD44',
-    'Department': '#FF6F61',
-    'Salary': '#6B5B95',
-    'City': '#88B04B',
-    'lat': '#009879',
-    'lon': '#ff6347',
-    'Age Interval': '#4682b4'
-}
-
-def generate_table(dataframe):
-    return dash_table.DataTable(
-        columns=[
-            {'name': col, 'id': col, 'type': 'text', 'presentation': 'markdown'} 
-            for col in dataframe.columns
-        ],
-        data=dataframe.to_dict('records'),
-        style_header_conditional=[
-            {
-                'if': {'column_id': col},
-                'backgroundColor': header_colors.get(col, '#333'),
-                'color': 'white',
-                'fontWeight': 'bold'
-            } for col in dataframe.columns
-        ],
-        style_data={
-            'color': 'black',
-            'backgroundColor': 'white'
-        },
-        filter_action='native',
-        sort_action='native'
-    )
-
-def build_tree(data):
-    tree = []
-    departments = data['Department'].unique()
-    for dept in departments:
-        employees = data[data['Department'] == dept]['Name'].sort_values().tolist()
-        tree.append({
-            'department': dept,
-            'employees': [{'name': emp} for emp in employees]
-        })
-    return tree
-
-department_tree = build_tree(data)
-
-def show_department_tree_view():
-    departments = data['Department'].unique()
-    tree_layout = []
-
-    for dept in departments:
-        dept_data = data[data['Department'] == dept].sort_values(by='Name')
-        children_layout = []
-        for _, emp in dept_data.iterrows():
-            emp_id = f"emp-{emp['Name'].replace(' ', '-')}"
-            emp_details = html.Div([
-                html.P(f"Age: {emp['Age']}"),
-                html.P(f"City: {emp['City']}")
-            ], style={'padding-left': '40px', 'display': 'none'}, id={'type': 'emp-details', 'index': emp_id})
-
-            emp_button = dbc.Button(emp['Name'], color="secondary", size="sm",
-                                    style={'margin': '2px', 'width': '200px', 'margin-left': '20px'},  # Adjusted width and added indentation
-                                    id={'type': "emp-button", 'index': emp_id})
-            children_layout.extend([emp_button, emp_details])
-
-        dept_button = dbc.Button(
-            f"Department: {dept}", color="primary",
-            id={'type': "dept-button", 'index': dept},
-            className="mb-1",
-            style={'width': '250px'}
-        )
-        dept_collapse = dbc.Collapse(
-            children_layout, id={'type': 'dept-collapse', 'index': dept}, is_open=False,
-            style={'margin-left': '20px'}  # Added indentation
-        )
-
-        tree_layout.extend([dept_button, dept_collapse])
-
-    return html.Div([
-        html.H1("Department Tree View"),
-        html.Div(tree_layout)
-    ])
+# No-op unless DASHBOARD_INSTRUMENT is set; must run before any callback is registered.
+instrument(app)
+use_fast_json()
+if COMPRESS_ENABLED:
+    compress_responses(app.server)
+# WSGI entry point for production servers, e.g. gunicorn dashboard:server
+server = app.server
+
+@app.callback(
+    [Output({'type': 'paged-table', 'index': MATCH}, 'data'),
+     Output({'type': 'paged-table', 'index': MATCH}, 'page_count')],
+    [Input({'type': 'paged-table', 'index': MATCH}, 'page_current'),
+     Input({'type': 'paged-table', 'index': MATCH}, 'page_size'),
+     Input({'type': 'paged-table', 'index': MATCH}, 'sort_by'),
+     Input({'type': 'paged-table', 'index': MATCH}, 'filter_query')],
+    [State({'type': 'paged-table', 'index': MATCH}, 'id')]
+)
+def update_paged_table(*args):
+    return pages.load('employee_data').update_paged_table(*args)
 
 @app.callback(
+    [Output({'type': 'dept-children', 'index': MATCH}, 'children'),
+     Output({'type': 'dept-loaded', 'index': MATCH}, 'data'),
+     Output({'type': 'dept-more', 'index': MATCH}, 'style')],
+    [Input({'type': 'dept-collapse', 'index': MATCH}, 'is_open'),
+     Input({'type': 'dept-more', 'index': MATCH}, 'n_clicks')],
+    [State({'type': 'dept-loaded', 'index': MATCH}, 'data'),
+     State({'type': 'dept-more', 'index': MATCH}, 'style')],
+    prevent_initial_call=True
+)
+def load_department_employees(*args):
+    return pages.load('department_tree').load_department_employees(*args)
+
+# Expanding a department or an employee only flips client-side state, so both
+# toggles run in the browser without a server round-trip.
+app.clientside_callback(
+    """
+    function(n_clicks, is_open) {
+        return n_clicks ? !is_open : is_open;
+    }
+    """,
     Output({'type': 'dept-collapse', 'index': MATCH}, 'is_open'),
     [Input({'type': 'dept-button', 'index': MATCH}, 'n_clicks')],
     [State({'type': 'dept-collapse', 'index': MATCH}, 'is_open')]
 )
-def toggle_department_collapse(n_clicks, is_open):
-    if n_clicks:
-        return not is_open
-    return is_open
 
-@app.callback(
+app.clientside_callback(
+    """
+    function(n_clicks, style) {
+        if (!n_clicks) {
+            return style;
+        }
+        return Object.assign({}, style, {display: style.display === 'none' ? 'block' : 'none'});
+    }
+    """,
     Output({'type': 'emp-details', 'index': MATCH}, 'style'),
     [Input({'type': 'emp-button', 'index': MATCH}, 'n_clicks')],
     [State({'type': 'emp-details', 'index': MATCH}, 'style')]
 )
-def toggle_employee_details(n_clicks, style):
-    if n_clicks:
-        return {'display': 'block' if style['display'] == 'none' else 'none'}
-    return style
 
 app.layout = html.Div([
     dcc.Location(id='url', refresh=False),
+    # Query of the table the user last filtered or sorted, which reports export.
+    dcc.Store(id='report-query', data={}),
     dbc.Row([
         dbc.Col([
             html.Img(src=logo_path, style={'width': '100px'}),
@@ -143,7 +121,16 @@ app.layout = html.Div([
                 dbc.NavLink("Dash Documentation", href="https://dash.plotly.com", external_link=True),
                 dbc.NavLink("React Documentation", href="https://reactjs.org", external_link=True),
                 html.Br(),
+                dcc.Dropdown(
+                    id='report-format',
+                    options=[{'label': EXPORT_FORMATS[fmt][0], 'value': fmt} for fmt in available_formats()],
+                    value='zip',
+                    clearable=False,
+                    style={'color': 'black', 'margin-bottom': '5px'}
+                ),
                 dbc.Button("Download Reports", id="download-reports-button", className="btn"),
+                progress_bar('download-reports-progress'),
+                dcc.Download(id='download-reports'),
                 html.Div(id='download-reports-output')
             ], vertical=True, pills=True, style={'margin-top': '20px'})
         ], width=2, style={'background-color': '#161b22'}),
@@ -156,238 +143,184 @@ app.layout = html.Div([
     [Input('url', 'pathname')]
 )
 def display_page(pathname):
-    if pathname == '/':
-        return show_overview()
-    elif pathname == '/employee-data':
-        return show_employee_data()
-    elif pathname == '/statistics':
-        return show_statistics()
-    elif pathname == '/department-tree-view':
-        return show_department_tree_view()
-    elif pathname == '/interactive-map':
-        return show_interactive_map()
-    else:
+    if pathname not in pages.PAGES:
         return "404 Page Not Found"
-
-def show_overview():
-    return html.Div([
-        html.H1("Overview"),
-        html.P("Welcome to the Dash Dashboard Example!"),
-        html.P("Use the sidebar to navigate through different sections of the dashboard."),
-        html.Hr(),  # Adds a horizontal line
-        html.P("© 2024 Redhat Dashboard Example")
-    ])
-
-def show_employee_data():
-    departments = data['Department'].unique()
-    return html.Div([
-        html.H1("Employee Data"),
-        dcc.Dropdown(
-            id='department-dropdown',
-            options=[{'label': dept, 'value': dept} for dept in departments],
-            value=departments[0],
-            style={'width': '50%'}
-        ),
-        html.Div(id='filtered-employee-data')
-    ])
+    return pages.load(pages.PAGES[pathname]).layout()
 
 @app.callback(
     Output('filtered-employee-data', 'children'),
     [Input('department-dropdown', 'value')]
 )
-def update_filtered_employee_data(selected_department):
-    filtered_data = data[data['Department'] == selected_department].sort_values(by='Name')
-    return html.Div([
-        generate_table(filtered_data),
-        dcc.Input(id='search-name', type='text', placeholder='Search by Name', debounce=True),
-        html.Div(id='search-results'),
-        dbc.Checkbox(id='show-raw-data', label='Show Raw Data', value=True),
-        html.Div(id='raw-data')
-    ])
+def update_filtered_employee_data(*args):
+    return pages.load('employee_data').update_filtered_employee_data(*args)
 
 @app.callback(
     Output('search-results', 'children'),
     [Input('search-name', 'value')]
 )
-def update_search_results(search_term):
-    if search_term:
-        search_results = data[data['Name'].str.contains(search_term, case=False)].sort_values(by='Name')
-        return generate_table(search_results)
-    return ""
+def update_search_results(*args):
+    return pages.load('employee_data').update_search_results(*args)
 
 @app.callback(
     Output('raw-data', 'children'),
     [Input('show-raw-data', 'value')]
 )
-def update_raw_data(show_raw):
-    if show_raw:
-        raw_data_sorted = data.sort_values(by='Name')
-        return generate_table(raw_data_sorted)
-    return ""
-
-def show_statistics():
-    return html.Div([
-        html.H1("Statistics"),
-        html.H3("Salary Distribution"),
-        dcc.Graph(id='salary-distribution-2d'),
-        html.H3("3D Salary Distribution"),
-        dcc.Graph(id='salary-distribution-3d'),
-        html.H3("Salary by Age Intervals Cross Departments"),
-        dcc.Graph(id='salary-age-intervals'),
-        html.H3("Summary Statistics"),
-        html.Div(id='summary-statistics-table'),
-        dcc.RadioItems(
-            id='summary-statistic-radio',
-            options=[
-                {'label': 'Mean', 'value': 'mean'},
-                {'label': 'Median', 'value': 'median'},
-                {'label': 'Sum', 'value': 'sum'}
-            ],
-            value='mean'
-        ),
-        html.Div(id='selected-summary-statistic')
-    ])
+def update_raw_data(*args):
+    return pages.load('employee_data').update_raw_data(*args)
+
+def background_callback(output, inputs, progress_id, cancel_on_leave=True, prevent_initial_call=None,
+                        **background_options):
+    """
+    Register a callback that runs as a background job reporting progress to
+    ``progress_id``, or synchronously without a background manager.
+
+    The callback receives ``set_progress`` first; it takes a (percent, label)
+    pair, which the bar shows while the job runs.  Leaving the page kills a
+    running job unless ``cancel_on_leave`` is false.
+    """
+    def register(func):
+        if background_callback_manager is None:
+            @wraps(func)
+            def run(*args):
+                return func(lambda progress: None, *args)
+            return app.callback(output, inputs, prevent_initial_call=prevent_initial_call)(run)
+        running = [(Output(progress_id, 'style'), PROGRESS_SHOWN, PROGRESS_HIDDEN)]
+        return app.callback(
+            output, inputs,
+            prevent_initial_call=prevent_initial_call,
+            background=True,
+            interval=POLL_INTERVAL,
+            progress=[Output(progress_id, 'value'), Output(progress_id, 'label')],
+            running=running + background_options.pop('running', []),
+            cancel=[Input('url', 'pathname')] if cancel_on_leave else None,
+            **background_options
+        )(func)
+    return register
 
 @app.callback(
     Output('salary-distribution-2d', 'figure'),
-    [Input('url', 'pathname')]
+    [Input('url', 'pathname'),
+     Input('exact-figures', 'value')]
 )
-def update_salary_distribution_2d(_):
-    fig = px.bar(data, x='Department', y='Salary', color='Department')
-    return fig
-
-@app.callback(
+def update_salary_distribution_2d(*args):
+    return pages.load('statistics').update_salary_distribution_2d(*args)
+
+# The 3D scatter and the box plot are the slow figures at large sizes, so they
+# are built in background jobs.  They are driven by components that only exist
+# on the statistics page rather than by the URL, so leaving the page does not
+# start a job just to return no_update.  Background results are cached by
+# function source and arguments, so each callback keeps a function of its own.
+@background_callback(
     Output('salary-distribution-3d', 'figure'),
-    [Input('url', 'pathname')]
+    [Input('exact-figures', 'value')],
+    'salary-distribution-3d-progress'
 )
-def update_salary_distribution_3d(_):
-    fig = px.scatter_3d(data, x='Department', y='Salary', z='Age', color='Department')
-    return fig
+def update_salary_distribution_3d(set_progress, exact):
+    return pages.load('statistics').update_salary_distribution_3d(set_progress, exact)
 
-@app.callback(
+@background_callback(
     Output('salary-age-intervals', 'figure'),
-    [Input('url', 'pathname')]
+    [Input('salary-age-intervals', 'id')],
+    'salary-age-intervals-progress'
 )
-def update_salary_age_intervals(_):
-    bins = [20, 30, 40, 50, 60]
-    labels = ["20-30", "30-40", "40-50", "50-60"]
-    data['Age Interval'] = pd.cut(data['Age'], bins=bins, labels=labels, right=False)
-    data['Age Interval'] = pd.Categorical(data['Age Interval'], categories=labels, ordered=True)
-    data_sorted = data.sort_values('Age Interval')
-    fig = px.box(data_sorted, x='Age Interval', y='Salary', color='Department')
-    return fig
+def update_salary_age_intervals(set_progress, component_id):
+    return pages.load('statistics').update_salary_age_intervals(set_progress, component_id)
 
 @app.callback(
     Output('summary-statistics-table', 'children'),
     [Input('url', 'pathname')]
 )
-def update_summary_statistics_table(_):
-    summary_stats = data.groupby('Department')['Salary'].describe().reset_index()
-    return generate_table(summary_stats)
+def update_summary_statistics_table(*args):
+    return pages.load('statistics').update_summary_statistics_table(*args)
 
 @app.callback(
     Output('selected-summary-statistic', 'children'),
     [Input('summary-statistic-radio', 'value')]
 )
-def update_summary_statistic(stat):
-    if stat == 'mean':
-        summary_mean = data.groupby('Department')['Salary'].mean().reset_index().sort_values(by='Department')
-        return generate_table(summary_mean)
-    elif stat == 'median':
-        summary_median = data.groupby('Department')['Salary'].median().reset_index().sort_values(by='Department')
-        return generate_table(summary_median)
-    elif stat == 'sum':
-        summary_sum = data.groupby('Department')['Salary'].sum().reset_index().sort_values(by='Department')
-        return generate_table(summary_sum)
+def update_summary_statistic(*args):
+    return pages.load('statistics').update_summary_statistic(*args)
 
 @app.callback(
-    [Output(f"dept-{node['department']}-collapse", "is_open") for node in department_tree],
-    [Input(f"dept-{node['department']}-toggle", "n_clicks") for node in department_tree],
-    [State(f"dept-{node['department']}-collapse", "is_open") for node in department_tree]
+    Output('employee-dropdown', 'options'),
+    [Input('employee-dropdown', 'search_value')],
+    [State('employee-dropdown', 'value')]
 )
-def toggle_collapse(*args):
-    ctx = dash.callback_context
-    if not ctx.triggered:
-        return [False] * len(department_tree)
-    button_id = ctx.triggered[0]["prop_id"].split(".")[0]
-    is_open_states = args[len(department_tree):]
-    toggle_states = []
-    for i, node in enumerate(department_tree):
-        if button_id == f"dept-{node['department']}-toggle":
-            toggle_states.append(not is_open_states[i])
-        else:
-            toggle_states.append(is_open_states[i])
-    return toggle_states
-
-def show_interactive_map():
-    return html.Div([
-        html.H1("Interactive Map"),
-        html.P("This page displays an interactive map with employee locations."),
-        dcc.Dropdown(
-            id='employee-dropdown',
-            options=[{'label': f"{row['Name']} ({row['City']})", 'value': index} for index, row in data.iterrows()],
-            placeholder='Select an Employee'
-        ),
-        dcc.Graph(id='employee-map', style={'height': '750px'})  # Adjust the height as needed
-    ])
+def update_employee_options(*args):
+    return pages.load('interactive_map').update_employee_options(*args)
 
 @app.callback(
     Output('employee-map', 'figure'),
-    [Input('employee-dropdown', 'value')]
+    [Input('employee-dropdown', 'value')],
+    prevent_initial_call=True
 )
-def update_map(selected_index):
-    fig = go.Figure(go.Scattermapbox(
-        lat=data['lat'],
-        lon=data['lon'],
-        mode='markers',
-        marker=go.scattermapbox.Marker(size=9),
-        text=data.apply(lambda row: f"{row['Name']} ({row['City']})", axis=1)
-    ))
-
-    fig.update_layout(
-        mapbox=dict(
-            center=dict(
-                lat=data['lat'].mean(),
-                lon=data['lon'].mean()
-            ),
-            zoom=3,
-            style="open-street-map"
-        ),
-        margin={"r": 0, "t": 0, "l": 0, "b": 0}
-    )
-
-    if selected_index is not None:
-        selected_row = data.iloc[selected_index]
-        fig.add_trace(go.Scattermapbox(
-            lat=[selected_row['lat']],
-            lon=[selected_row['lon']],
-            mode='markers+text',
-            marker=dict(size=12, color='red'),
-            text=["Selected Location"],
-            textposition="top right"
-        ))
-        fig.update_layout(
-            mapbox=dict(
-                center=dict(
-                    lat=selected_row['lat'],
-                    lon=selected_row['lon']
-                ),
-                zoom=6
-            )
-        )
+def update_map(*args):
+    return pages.load('interactive_map').update_map(*args)
 
-    return fig
+@app.callback(
+    Output('employee-map', 'figure', allow_duplicate=True),
+    [Input('employee-map', 'relayoutData')],
+    prevent_initial_call=True
+)
+def update_map_clusters(*args):
+    return pages.load('interactive_map').update_map_clusters(*args)
 
 @app.callback(
-    Output('download-reports-output', 'children'),
-    [Input('download-reports-button', 'n_clicks')]
+    Output('report-query', 'data'),
+    [Input({'type': 'paged-table', 'index': ALL}, 'filter_query'),
+     Input({'type': 'paged-table', 'index': ALL}, 'sort_by')],
+    [State({'type': 'paged-table', 'index': ALL}, 'id')],
+    prevent_initial_call=True
+)
+def update_report_query(filter_queries, sort_bys, table_ids):
+    if ctx.triggered_id not in table_ids:
+        return no_update
+    position = table_ids.index(ctx.triggered_id)
+    return {
+        **table_source_query(ctx.triggered_id['index']),
+        'filter_query': filter_queries[position],
+        'sort_by': sort_bys[position]
+    }
+
+# Exports up to this size are sent inline through dcc.Download; larger ones
+# are linked to download_export, which streams them from disk instead of
+# base64-encoding them into a callback response.
+INLINE_DOWNLOAD_BYTES = 16 * 1024 * 1024
+
+@background_callback(
+    [Output('download-reports', 'data'),
+     Output('download-reports-output', 'children')],
+    [Input('download-reports-button', 'n_clicks'),
+     State('report-query', 'data'),
+     State('report-format', 'value')],
+    'download-reports-progress',
+    cancel_on_leave=False,
+    prevent_initial_call=True,
+    running=[(Output('download-reports-button', 'disabled'), True, False)],
+    manager=export_manager
 )
-def download_reports(n_clicks):
-    if n_clicks:
-        return html.Div("Reports were downloaded successfully!", style={'color': 'green'})
-    return ""
+def download_reports(set_progress, _, query, fmt):
+    def progress(written, total):
+        set_progress((100 * written // max(total, 1), f"{written:,} of {total:,} employees"))
+
+    path = export_cache.export(data_source.snapshot(), fmt, query, progress)
+    filename = export_filename(fmt)
+    size = os.path.getsize(path)
+    if size <= INLINE_DOWNLOAD_BYTES:
+        return dcc.send_file(path, filename), ""
+    return no_update, html.A(f"Download {filename} ({size / 2 ** 20:,.0f} MB)",
+                             href=f"/exports/{os.path.basename(path)}", style={'color': 'white'})
+
+@server.route('/exports/<name>')
+def download_export(name):
+    fmt = name.rpartition('.')[2]
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    return send_from_directory(export_cache.directory, name, as_attachment=True,
+                               download_name=export_filename(fmt), mimetype=EXPORT_FORMATS[fmt][1])
 
 if __name__ == '__main__':
+    # With debug=True the reloader serves from a child process, which is
+    # started once the port is bound; only that process warms up.
+    if PREWARM_ENABLED and os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_prewarm()
     app.run_server(debug=True, port=8050)
-   
-
@@ -0,0 +1,105 @@
+"""
+Server-side cache of serialized Plotly figures.
+
+Figures are keyed on (figure id, data fingerprint, parameters) and stored as
+encoded JSON, so a repeat request skips both figure construction and Plotly's
+validation.  The cache is an LRU bounded by the total size of the stored
+payloads; entries for an outdated data fingerprint are never hit again and age
+out on their own.
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from instrumentation import phase
+
+# The shared dashboard_core package lives at the repository root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from dashboard_core.memo import renew_locks_after_fork
+
+try:
+    from orjson import loads
+except ImportError:
+    from json import loads
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class FigureCache:
+    """
+    Thread-safe LRU of encoded figure JSON bounded by ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        # Background jobs fork from threaded workers; a lock held by another
+        # thread at the fork would never be released in the child.
+        renew_locks_after_fork(self)
+
+    def _renew_locks(self):
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        return self._size
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key, payload):
+        # A payload larger than the whole budget would only evict everything
+        # else and then itself, so it is not stored at all.
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = payload
+            self._size += len(payload)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def encoded(self, figure_id, fingerprint, build, **params):
+        """
+        Return the encoded JSON of a figure, building it with ``build(**params)`` on a miss.
+        """
+        key = (figure_id, fingerprint, tuple(sorted(params.items())))
+        payload = self.get(key)
+        if payload is None:
+            with phase('figure'):
+                figure = build(**params)
+            with phase('serialize'):
+                payload = figure.to_json().encode()
+            self.put(key, payload)
+        return payload
+
+    def figure(self, figure_id, fingerprint, build, **params):
+        """
+        Return a cached figure as a plain dict that a callback can return directly.
+        """
+        payload = self.encoded(figure_id, fingerprint, build, **params)
+        with phase('serialize'):
+            return loads(payload)
@@ -0,0 +1,307 @@
+"""
+Opt-in timing instrumentation for the Dash callbacks.
+
+Set ``DASHBOARD_INSTRUMENT=1`` and ``instrument(app)`` (called before any
+callback is registered) wraps every server-side callback and times each
+``/_dash-update-component`` request.  Per callback it records call and error
+counts, a wall-time histogram, request and response bytes, and the time spent
+in each phase:
+
+* ``compute``: the callback body itself, mostly pandas work
+* ``figure``: Plotly figure construction, marked with ``phase('figure')``
+* ``serialize``: JSON encoding, both Dash's response and cached figures
+
+Phases are exclusive, so they add up to the request's wall time.  Everything
+is served at ``/metrics`` in the Prometheus text format.
+
+``DASHBOARD_PROFILE_SLOWEST=N`` additionally samples the stacks of in-flight
+requests every ``DASHBOARD_PROFILE_INTERVAL`` seconds and keeps the folded
+stacks of the N slowest requests seen so far as ``*.folded`` files in
+``DASHBOARD_PROFILE_DIR``, ready for ``flamegraph.pl`` or speedscope.
+"""
+import functools
+import heapq
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from flask import Response, request
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('DASHBOARD_INSTRUMENT', '') not in ('', '0')
+PROFILE_SLOWEST = int(os.environ.get('DASHBOARD_PROFILE_SLOWEST', 0))
+PROFILE_INTERVAL = float(os.environ.get('DASHBOARD_PROFILE_INTERVAL', 0.005))
+PROFILE_DIR = os.environ.get('DASHBOARD_PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'dashboard-profiles'))
+
+UPDATE_PATH = '_dash-update-component'
+PHASES = ('compute', 'figure', 'serialize')
+# Upper bounds, in seconds, of the wall-time histogram buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+
+
+class CallTimer:
+    """
+    Timings of one callback request, accumulated as it runs.
+
+    Phases nest: time spent in an inner phase is subtracted from the phase
+    around it.  Whatever is not inside a callback-body phase is Dash's own
+    argument handling and response encoding, counted as ``serialize``.
+    """
+
+    def __init__(self):
+        self.name = 'unknown'
+        self.start = time.perf_counter()
+        self.phases = Counter()
+        self.samples = Counter()
+        self._stack = [['serialize', self.start, 0.0]]
+
+    def enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        name, start, inner = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        self.phases[name] += elapsed - inner
+        self._stack[-1][2] += elapsed
+
+    def finish(self):
+        while len(self._stack) > 1:
+            self.exit()
+        name, start, inner = self._stack[0]
+        wall = time.perf_counter() - start
+        self.phases[name] += wall - inner
+        return wall
+
+
+@contextmanager
+def phase(name):
+    """
+    Attribute the enclosed time to ``name``; free when nothing is being timed.
+    """
+    call = getattr(_local, 'call', None)
+    if call is None:
+        yield
+        return
+    call.enter(name)
+    try:
+        yield
+    finally:
+        call.exit()
+
+
+class CallbackMetrics:
+    """
+    Thread-safe per-callback counters, rendered in the Prometheus text format.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._calls = Counter()
+        self._errors = Counter()
+        self._wall = Counter()
+        self._histogram = defaultdict(lambda: [0] * len(buckets))
+        self._phases = Counter()
+        self._request_bytes = Counter()
+        self._response_bytes = Counter()
+
+    def record(self, name, wall, phases, request_bytes, response_bytes, error):
+        with self._lock:
+            self._calls[name] += 1
+            self._errors[name] += error
+            self._wall[name] += wall
+            counts = self._histogram[name]
+            for i, bound in enumerate(self.buckets):
+                if wall <= bound:
+                    counts[i] += 1
+            for phase_name, seconds in phases.items():
+                self._phases[name, phase_name] += seconds
+            self._request_bytes[name] += request_bytes
+            self._response_bytes[name] += response_bytes
+
+    def render(self):
+        lines = []
+
+        def metric(name, kind, doc, samples):
+            lines.append(f"# HELP {name} {doc}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        with self._lock:
+            names = sorted(self._calls)
+            metric('dash_callback_calls_total', 'counter', 'Callback requests served.',
+                   [f'dash_callback_calls_total{{callback="{n}"}} {self._calls[n]}' for n in names])
+            metric('dash_callback_errors_total', 'counter', 'Callback requests answered with a 5xx status.',
+                   [f'dash_callback_errors_total{{callback="{n}"}} {self._errors[n]}' for n in names])
+            histogram = []
+            for n in names:
+                for bound, count in zip(self.buckets, self._histogram[n]):
+                    histogram.append(f'dash_callback_duration_seconds_bucket{{callback="{n}",le="{bound}"}} {count}')
+                histogram.append(f'dash_callback_duration_seconds_bucket{{callback="{n}",le="+Inf"}} {self._calls[n]}')
+                histogram.append(f'dash_callback_duration_seconds_sum{{callback="{n}"}} {self._wall[n]:.6f}')
+                histogram.append(f'dash_callback_duration_seconds_count{{callback="{n}"}} {self._calls[n]}')
+            metric('dash_callback_duration_seconds', 'histogram', 'Wall time of callback requests.', histogram)
+            metric('dash_callback_phase_seconds_total', 'counter', 'Wall time of callback requests by phase.',
+                   [f'dash_callback_phase_seconds_total{{callback="{n}",phase="{p}"}} {self._phases[n, p]:.6f}'
+                    for n in names for p in PHASES])
+            metric('dash_callback_request_bytes_total', 'counter', 'Callback request body bytes.',
+                   [f'dash_callback_request_bytes_total{{callback="{n}"}} {self._request_bytes[n]}' for n in names])
+            metric('dash_callback_response_bytes_total', 'counter', 'Callback response body bytes.',
+                   [f'dash_callback_response_bytes_total{{callback="{n}"}} {self._response_bytes[n]}' for n in names])
+        return '\n'.join(lines) + '\n'
+
+
+def _folded(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SlowestProfiles:
+    """
+    Samples the stacks of in-flight requests and keeps the slowest ``keep``.
+
+    One daemon thread reads every active request thread's current frame each
+    ``interval`` seconds.  When a request finishes among the ``keep`` slowest
+    so far its folded stacks are written to ``directory``, and the file of the
+    request it displaced is removed.
+    """
+
+    def __init__(self, keep, interval=PROFILE_INTERVAL, directory=PROFILE_DIR):
+        self.keep = keep
+        self.interval = interval
+        self.directory = directory
+        self._active = {}
+        self._slowest = []
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        threading.Thread(target=self._sample, name='callback-profiler', daemon=True).start()
+
+    def _sample(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                active = dict(self._active)
+            frames = sys._current_frames()
+            for thread_id, call in active.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    call.samples[_folded(frame)] += 1
+
+    def begin(self, call):
+        with self._lock:
+            self._active[threading.get_ident()] = call
+
+    def end(self, call, wall):
+        with self._lock:
+            self._active.pop(threading.get_ident(), None)
+            if not call.samples or (len(self._slowest) == self.keep and wall <= self._slowest[0][0]):
+                return
+            path = os.path.join(self.directory, f"{wall:09.3f}s-{call.name}-{time.time_ns()}.folded")
+            if len(self._slowest) == self.keep:
+                _, evicted = heapq.heapreplace(self._slowest, (wall, path))
+            else:
+                heapq.heappush(self._slowest, (wall, path))
+                evicted = None
+        with open(path, 'w') as folded:
+            folded.writelines(f"{stack} {count}\n" for stack, count in call.samples.items())
+        if evicted is not None:
+            try:
+                os.remove(evicted)
+            except OSError:
+                pass
+        logger.info("Profiled %s (%.3fs) to %s", call.name, wall, path)
+
+
+def instrument(app, enabled=ENABLED, profile_slowest=PROFILE_SLOWEST):
+    """
+    Time every callback registered on ``app`` from now on and serve ``/metrics``.
+
+    Does nothing unless ``enabled``, so the uninstrumented app pays no cost.
+    Returns the ``CallbackMetrics`` being recorded, or None.
+    """
+    if not enabled:
+        return None
+    metrics = CallbackMetrics()
+    profiles = SlowestProfiles(profile_slowest) if profile_slowest > 0 else None
+    register = app.callback
+
+    @functools.wraps(register)
+    def timed_callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+
+        def wrap(func):
+            @functools.wraps(func)
+            def timed(*func_args, **func_kwargs):
+                call = getattr(_local, 'call', None)
+                if call is not None and call.name == 'unknown':
+                    call.name = func.__name__
+                with phase('compute'):
+                    return func(*func_args, **func_kwargs)
+            return decorator(timed)
+        return wrap
+
+    app.callback = timed_callback
+    server = app.server
+
+    def callback_name():
+        # Background callbacks run their function in a job process, so the
+        # request is named after the callback its output belongs to.
+        body = request.get_json(silent=True) or {}
+        entry = app.callback_map.get(body.get('output')) if isinstance(body, dict) else None
+        return getattr((entry or {}).get('callback'), '__name__', 'unknown')
+
+    @server.before_request
+    def start_timer():
+        if request.path.endswith(UPDATE_PATH):
+            _local.call = CallTimer()
+            _local.call.name = callback_name()
+            if profiles is not None:
+                profiles.begin(_local.call)
+
+    @server.after_request
+    def record_timer(response):
+        call = getattr(_local, 'call', None)
+        if call is None:
+            return response
+        _local.call = None
+        wall = call.finish()
+        response_bytes = response.content_length
+        if response_bytes is None and not response.is_streamed:
+            response_bytes = len(response.get_data())
+        metrics.record(call.name, wall, call.phases, request.content_length or 0, response_bytes or 0,
+                       response.status_code >= 500)
+        if profiles is not None:
+            profiles.end(call, wall)
+        return response
+
+    @server.teardown_request
+    def drop_timer(exc):
+        # Requests that raised past Flask's error handling never reach
+        # after_request; count them as errors and release the thread.
+        call = getattr(_local, 'call', None)
+        if call is not None:
+            _local.call = None
+            wall = call.finish()
+            metrics.record(call.name, wall, call.phases, 0, 0, True)
+            if profiles is not None:
+                profiles.end(call, wall)
+
+    @server.route('/metrics')
+    def serve_metrics():
+        return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    return metrics
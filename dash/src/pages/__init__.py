@@ -0,0 +1,31 @@
+"""
+The dashboard's pages, one module each, imported on first navigation.
+
+A page module builds its content in ``layout()`` and holds the bodies of
+its callbacks; the module, and what it imports (Plotly figures, the pandas
+query code), is only loaded when a user first opens the page or a callback
+of it first runs.  An optional ``prewarm()`` fills the page's caches ahead
+of its first visit.
+
+These are plain modules, not Dash Pages: the app shell registers every
+callback up front, since Dash sends the whole callback graph to the browser
+when the app loads, and routes ``/_dash-update-component`` to them.
+"""
+import importlib
+
+# URL path -> page module.
+PAGES = {
+    '/': 'overview',
+    '/employee-data': 'employee_data',
+    '/statistics': 'statistics',
+    '/department-tree-view': 'department_tree',
+    '/interactive-map': 'interactive_map',
+}
+
+
+def load(name):
+    """
+    The page module ``name``; the import system makes the first import safe
+    across request threads.
+    """
+    return importlib.import_module(f"{__name__}.{name}")
@@ -0,0 +1,73 @@
+from dash import dcc, html, Patch, ctx, no_update
+import dash_bootstrap_components as dbc
+
+from shared import data_source
+
+TREE_PAGE_SIZE = 50
+
+def employee_nodes(dept_data):
+    # Built from column slices of one page of a department rather than
+    # iterrows over the whole frame.
+    nodes = []
+    for position, name, age, city in zip(dept_data.index.tolist(), dept_data['Name'].tolist(),
+                                         dept_data['Age'].tolist(), dept_data['City'].tolist()):
+        emp_id = f"emp-{position}"
+        emp_details = html.Div([
+            html.P(f"Age: {age}"),
+            html.P(f"City: {city}")
+        ], style={'padding-left': '40px', 'display': 'none'}, id={'type': 'emp-details', 'index': emp_id})
+
+        # Adjusted width and added indentation
+        emp_button = dbc.Button(name, color="secondary", size="sm",
+                                style={'margin': '2px', 'width': '200px', 'margin-left': '20px'},
+                                id={'type': "emp-button", 'index': emp_id})
+        nodes.extend([emp_button, emp_details])
+    return nodes
+
+def layout():
+    # Departments render collapsed and empty; load_department_employees fills
+    # them in pages of TREE_PAGE_SIZE once they are expanded.
+    tree_layout = []
+
+    for dept in data_source.snapshot().departments():
+        dept_button = dbc.Button(
+            f"Department: {dept}", color="primary",
+            id={'type': "dept-button", 'index': dept},
+            className="mb-1",
+            style={'width': '250px'}
+        )
+        dept_collapse = dbc.Collapse([
+            html.Div(id={'type': 'dept-children', 'index': dept}),
+            dcc.Store(id={'type': 'dept-loaded', 'index': dept}, data=0),
+            dbc.Button("Show more", id={'type': 'dept-more', 'index': dept}, color="link", size="sm",
+                       style={'display': 'none', 'margin-left': '20px'})
+        ], id={'type': 'dept-collapse', 'index': dept}, is_open=False,
+            style={'margin-left': '20px'}  # Added indentation
+        )
+
+        tree_layout.extend([dept_button, dept_collapse])
+
+    return html.Div([
+        html.H1("Department Tree View"),
+        html.Div(tree_layout)
+    ])
+
+def load_department_employees(is_open, _, loaded, more_style):
+    loaded = loaded or 0
+    if ctx.triggered_id['type'] == 'dept-collapse' and (not is_open or loaded):
+        return no_update, no_update, no_update
+
+    snapshot = data_source.snapshot()
+    dept = ctx.triggered_id['index']
+    dept_data = snapshot.department_employees(dept, loaded, TREE_PAGE_SIZE)
+    nodes = employee_nodes(dept_data)
+    total = snapshot.department_size(dept)
+    loaded += len(dept_data)
+
+    # Later pages are appended in place so only the new chunk is sent.
+    if loaded > len(dept_data):
+        children = Patch()
+        children.extend(nodes)
+    else:
+        children = nodes
+    return children, loaded, {**more_style, 'display': 'inline-block' if loaded < total else 'none'}
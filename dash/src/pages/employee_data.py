@@ -0,0 +1,61 @@
+from dash import dcc, html, dash_table
+import dash_bootstrap_components as dbc
+
+from dashboard_core.table_query import PAGE_SIZE, page_count
+from shared import data_source, table_source_query, table_style
+
+def generate_paged_table(source):
+    # Rows are fetched page by page through update_paged_table, so the layout
+    # only carries the column definitions regardless of how many rows match.
+    return dash_table.DataTable(
+        id={'type': 'paged-table', 'index': source},
+        data=[],
+        page_current=0,
+        page_size=PAGE_SIZE,
+        page_action='custom',
+        filter_action='custom',
+        filter_query='',
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        **table_style(data_source.snapshot().columns)
+    )
+
+def update_paged_table(page_current, page_size, sort_by, filter_query, table_id):
+    page, row_count = data_source.snapshot().employee_page(
+        filter_query=filter_query, sort_by=sort_by, page_current=page_current, page_size=page_size,
+        **table_source_query(table_id['index'])
+    )
+    return page.to_dict('records'), page_count(row_count, page_size)
+
+def layout():
+    departments = data_source.snapshot().departments()
+    return html.Div([
+        html.H1("Employee Data"),
+        dcc.Dropdown(
+            id='department-dropdown',
+            options=[{'label': dept, 'value': dept} for dept in departments],
+            value=departments[0],
+            style={'width': '50%'}
+        ),
+        html.Div(id='filtered-employee-data')
+    ])
+
+def update_filtered_employee_data(selected_department):
+    return html.Div([
+        generate_paged_table(f"department:{selected_department}"),
+        dcc.Input(id='search-name', type='text', placeholder='Search by Name', debounce=True),
+        html.Div(id='search-results'),
+        dbc.Checkbox(id='show-raw-data', label='Show Raw Data', value=True),
+        html.Div(id='raw-data')
+    ])
+
+def update_search_results(search_term):
+    if search_term:
+        return generate_paged_table(f"search:{search_term}")
+    return ""
+
+def update_raw_data(show_raw):
+    if show_raw:
+        return generate_paged_table('raw')
+    return ""
@@ -0,0 +1,87 @@
+from functools import partial
+from dash import dcc, html, Patch, no_update
+
+from dashboard_core.figures import base_map_figure
+from dashboard_core.map_layers import MAX_MARKERS, viewport_around, viewport_boxes
+from shared import data_source, figure_cache
+
+EMPLOYEE_OPTIONS_LIMIT = 20
+MAP_ZOOM = 3
+SELECTED_ZOOM = 6
+
+def layout():
+    # Options are filled by update_employee_options as the user types, so the
+    # page does not carry the whole roster.
+    snapshot = data_source.snapshot()
+    return html.Div([
+        html.H1("Interactive Map"),
+        html.P("This page displays an interactive map with employee locations."),
+        dcc.Dropdown(
+            id='employee-dropdown',
+            options=[],
+            placeholder='Search for an Employee by name or city'
+        ),
+        dcc.Graph(
+            id='employee-map',
+            figure=figure_cache.figure('employee-map', snapshot.version, partial(base_map_figure, snapshot, MAP_ZOOM)),
+            style={'height': '750px'}  # Adjust the height as needed
+        )
+    ])
+
+def update_employee_options(search_value, selected_index):
+    if not search_value:
+        return no_update
+    snapshot = data_source.snapshot()
+    ids = snapshot.search_employees(search_value, limit=EMPLOYEE_OPTIONS_LIMIT)
+    # Keep the current selection among the options so it stays displayed.
+    if selected_index is not None and selected_index < len(snapshot) and selected_index not in ids:
+        ids.append(selected_index)
+    return [{'label': label, 'value': row_id} for row_id, label in zip(ids, snapshot.employee_labels(ids))]
+
+def patch_marker_layer(fig, layer):
+    fig['data'][0]['lat'] = layer['lat'].tolist()
+    fig['data'][0]['lon'] = layer['lon'].tolist()
+    fig['data'][0]['text'] = layer['text'].tolist()
+    fig['data'][0]['marker']['size'] = layer['size'] if isinstance(layer['size'], int) else layer['size'].tolist()
+
+def update_map(selected_index):
+    snapshot = data_source.snapshot()
+    location = snapshot.employee_location(selected_index) if selected_index is not None else None
+    fig = Patch()
+    if location is not None:
+        (lat, lon), zoom = location, SELECTED_ZOOM
+        fig['data'][1]['lat'] = [lat]
+        fig['data'][1]['lon'] = [lon]
+    else:
+        (lat, lon), zoom = snapshot.map_center(), MAP_ZOOM
+        fig['data'][1]['lat'] = []
+        fig['data'][1]['lon'] = []
+
+    # Moving the map from here does not report a new viewport, so the
+    # markers for the one it moves to are sent along.
+    if len(snapshot) > MAX_MARKERS:
+        patch_marker_layer(fig, snapshot.map_layer(
+            zoom, viewport_around(lat, lon, zoom) if location is not None else None))
+
+    # A new uirevision makes the map honour the new center over the user's pan/zoom.
+    fig['layout']['mapbox']['center'] = {'lat': lat, 'lon': lon}
+    fig['layout']['mapbox']['zoom'] = zoom
+    fig['layout']['uirevision'] = f"selection-{selected_index}"
+    return fig
+
+def update_map_clusters(relayout_data):
+    # Every pan or zoom reports the corners of the visible map; only the
+    # employees around them are sent, clustered when there are too many.
+    snapshot = data_source.snapshot()
+    derived = (relayout_data or {}).get('mapbox._derived')
+    if not derived or len(snapshot) <= MAX_MARKERS:
+        return no_update
+    fig = Patch()
+    patch_marker_layer(fig, snapshot.map_layer(relayout_data.get('mapbox.zoom', MAP_ZOOM),
+                                               viewport_boxes(derived['coordinates'])))
+    return fig
+
+def prewarm():
+    # The base map figure, and the search index behind the employee dropdown.
+    layout()
+    data_source.snapshot().search_employees('a', limit=EMPLOYEE_OPTIONS_LIMIT)
@@ -0,0 +1,10 @@
+from dash import html
+
+def layout():
+    return html.Div([
+        html.H1("Overview"),
+        html.P("Welcome to the Dash Dashboard Example!"),
+        html.P("Use the sidebar to navigate through different sections of the dashboard."),
+        html.Hr(),  # Adds a horizontal line
+        html.P("© 2024 Redhat Dashboard Example")
+    ])
@@ -0,0 +1,84 @@
+from functools import partial
+from dash import dcc, html, no_update
+import dash_bootstrap_components as dbc
+
+from dashboard_core.figures import salary_bar_figure, salary_box_figure, salary_scatter_3d_figure
+from dashboard_core.level_of_detail import use_aggregates
+from shared import data_source, figure_cache, generate_table, progress_bar
+
+def layout():
+    return html.Div([
+        html.H1("Statistics"),
+        dbc.Checkbox(id='exact-figures', label='Exact mode (plot every employee)', value=False),
+        html.H3("Salary Distribution"),
+        dcc.Graph(id='salary-distribution-2d'),
+        html.H3("3D Salary Distribution"),
+        dcc.Graph(id='salary-distribution-3d'),
+        progress_bar('salary-distribution-3d-progress'),
+        html.H3("Salary by Age Intervals Cross Departments"),
+        dcc.Graph(id='salary-age-intervals'),
+        progress_bar('salary-age-intervals-progress'),
+        html.H3("Summary Statistics"),
+        html.Div(id='summary-statistics-table'),
+        dcc.RadioItems(
+            id='summary-statistic-radio',
+            options=[
+                {'label': 'Mean', 'value': 'mean'},
+                {'label': 'Median', 'value': 'median'},
+                {'label': 'Sum', 'value': 'sum'}
+            ],
+            value='mean'
+        ),
+        html.Div(id='selected-summary-statistic')
+    ])
+
+def update_salary_distribution_2d(pathname, exact):
+    if pathname != '/statistics':
+        return no_update
+    snapshot = data_source.snapshot()
+    return figure_cache.figure(
+        'salary-distribution-2d', snapshot.version, partial(salary_bar_figure, snapshot),
+        aggregate=use_aggregates(snapshot, exact)
+    )
+
+# The 3D scatter and the box plot are the slow figures at large sizes; the
+# app shell runs them as background jobs, which pass set_progress first.
+def update_salary_distribution_3d(set_progress, exact):
+    snapshot = data_source.snapshot()
+    aggregate = use_aggregates(snapshot, exact)
+    if aggregate:
+        set_progress((10, "Binning employees by salary and age"))
+        snapshot.scatter_3d_bins()
+    set_progress((60, "Drawing the figure"))
+    return figure_cache.figure(
+        'salary-distribution-3d', snapshot.version, partial(salary_scatter_3d_figure, snapshot),
+        aggregate=aggregate
+    )
+
+def update_salary_age_intervals(set_progress, _):
+    snapshot = data_source.snapshot()
+    set_progress((10, "Computing salary quartiles per age interval and department"))
+    snapshot.salary_box_stats()
+    set_progress((70, "Drawing the figure"))
+    return figure_cache.figure(
+        'salary-age-intervals', snapshot.version, partial(salary_box_figure, snapshot)
+    )
+
+def update_summary_statistics_table(pathname):
+    if pathname != '/statistics':
+        return no_update
+    return generate_table(data_source.snapshot().salary_aggregate('describe'))
+
+def update_summary_statistic(stat):
+    if stat in ('mean', 'median', 'sum'):
+        return generate_table(data_source.snapshot().salary_aggregate(stat))
+
+def prewarm():
+    # The callbacks a first visit fires, with the page's initial inputs.
+    def ignore(progress):
+        pass
+    update_salary_distribution_2d('/statistics', False)
+    update_salary_distribution_3d(ignore, False)
+    update_salary_age_intervals(ignore, 'salary-age-intervals')
+    update_summary_statistics_table('/statistics')
+    update_summary_statistic('mean')
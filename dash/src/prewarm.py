@@ -0,0 +1,44 @@
+"""
+Optional warm-up of a freshly started worker.
+
+The app imports no page and loads no data at startup, so a worker answers
+its first requests quickly and the first visit to each page pays for that
+page.  With ``DASHBOARD_PREWARM=1`` the worker instead loads the data, every
+page module and the caches of the pages that have a ``prewarm`` step (the
+statistics figures and tables, the base map and the search index) on a
+background thread once it is serving, so the port is never held up by it
+and early visitors find most of the work done.
+
+Background jobs fork from the worker, so they inherit whatever the warm-up
+has cached by the time they start.
+"""
+import logging
+import os
+import threading
+import time
+
+import pages
+from shared import data_source
+
+logger = logging.getLogger(__name__)
+
+PREWARM_ENABLED = os.environ.get('DASHBOARD_PREWARM', '') not in ('', '0')
+
+
+def prewarm():
+    start = time.perf_counter()
+    data_source.snapshot()
+    for name in pages.PAGES.values():
+        page = pages.load(name)
+        if hasattr(page, 'prewarm'):
+            page.prewarm()
+    logger.info("Prewarmed the data and pages in %.2fs", time.perf_counter() - start)
+
+
+def start_prewarm():
+    """
+    Run ``prewarm`` on a daemon thread; call it once the server is listening.
+    """
+    thread = threading.Thread(target=prewarm, name='dashboard-prewarm', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,124 @@
+"""
+Production serving: fast JSON encoding and compressed responses.
+
+``use_fast_json`` switches Plotly's encoder, which Dash uses for every
+callback response, to orjson; it serializes NumPy arrays natively instead of
+converting them to lists first.
+
+``compress_responses`` negotiates brotli or gzip with the browser for
+callback responses, layouts and static assets.  Compressed bodies are kept in
+a byte-bounded LRU keyed on a hash of the uncompressed body, so a figure or
+table served again from the figure cache, or a JavaScript bundle requested by
+another browser, is compressed only once.
+
+Under a multi-worker WSGI server each worker loads its own snapshot; the Arrow
+cache is memory-mapped, so the workers share the column data through the page
+cache:
+
+    gunicorn --config gunicorn.conf.py --chdir src dashboard:server
+"""
+import gzip
+import hashlib
+import os
+
+import plotly.io as pio
+from flask import request
+
+from figure_cache import FigureCache
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPRESS_ENABLED = os.environ.get('DASHBOARD_COMPRESS', '1') not in ('', '0')
+# Bodies smaller than this are not worth the encoding header.
+COMPRESS_MIN_BYTES = 500
+COMPRESS_CACHE_BYTES = 64 * 1024 * 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+COMPRESSIBLE_TYPES = (
+    'application/json', 'application/javascript', 'text/javascript', 'text/css', 'text/html',
+    'text/plain', 'image/svg+xml',
+)
+
+
+def use_fast_json():
+    """
+    Make Plotly and Dash encode with orjson when it is installed.
+    """
+    if orjson is not None:
+        pio.json.config.default_engine = 'orjson'
+    return orjson is not None
+
+
+def negotiate(accept_encoding):
+    """
+    The encoding to use for a request's ``Accept-Encoding``, or None: the
+    supported one the client ranks highest, brotli on a tie.
+    """
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding.strip().lower()] = quality
+
+    def quality(coding):
+        return accepted.get(coding, accepted.get('*', 0))
+
+    # max keeps the first of equally ranked codings.
+    best = max(('br', 'gzip') if brotli is not None else ('gzip',), key=quality)
+    return best if quality(best) > 0 else None
+
+
+def compress(payload, coding):
+    if coding == 'br':
+        return brotli.compress(payload, quality=BROTLI_QUALITY)
+    return gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compress_responses(server, cache=None, min_bytes=COMPRESS_MIN_BYTES):
+    """
+    Compress eligible responses of the Flask ``server`` on the way out.
+
+    Returns the cache holding the compressed bodies.
+    """
+    cache = cache if cache is not None else FigureCache(max_bytes=COMPRESS_CACHE_BYTES)
+
+    @server.after_request
+    def compress_response(response):
+        if (response.status_code != 200 or 'Content-Encoding' in response.headers
+                or 'Content-Range' in response.headers or response.mimetype not in COMPRESSIBLE_TYPES):
+            return response
+        response.headers.add('Vary', 'Accept-Encoding')
+        coding = negotiate(request.headers.get('Accept-Encoding', ''))
+        if coding is None:
+            return response
+
+        # Static files are sent as passthrough file wrappers; read them in.
+        response.direct_passthrough = False
+        payload = response.get_data()
+        if len(payload) < min_bytes:
+            return response
+        key = (coding, hashlib.blake2b(payload, digest_size=16).digest())
+        compressed = cache.get(key)
+        if compressed is None:
+            compressed = compress(payload, coding)
+            cache.put(key, compressed)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = coding
+        return response
+
+    return cache
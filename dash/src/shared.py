@@ -0,0 +1,123 @@
+"""
+State and components shared by the app shell and the page modules: the data
+source, the figure and export caches, table and progress bar helpers.
+
+Nothing here loads data or pandas on import.  The data source opens on the
+first snapshot, so a worker serves the index page and the Overview before
+the roster has been read.
+"""
+import os
+import sys
+import threading
+
+from dash import dash_table
+import dash_bootstrap_components as dbc
+
+from figure_cache import FigureCache
+
+# The shared dashboard_core package lives at the repository root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from dashboard_core.export import ExportCache
+from dashboard_core.memo import renew_locks_after_fork
+
+base_dir = os.path.abspath(os.path.dirname(__file__))
+data_path = os.environ.get('DASHBOARD_DATA_PATH', os.path.join(base_dir, '..', 'data.csv'))
+
+
+class DeferredSource:
+    """
+    A data source opened, and watched, on the first ``snapshot``.
+
+    Callbacks arriving while it opens wait for it rather than each opening
+    their own.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._source = None
+        self._lock = threading.Lock()
+        # A background job forked while another thread was opening the
+        # source would wait on the copied lock forever; it gets its own.
+        renew_locks_after_fork(self)
+
+    def _renew_locks(self):
+        self._lock = threading.Lock()
+
+    @property
+    def source(self):
+        if self._source is None:
+            with self._lock:
+                if self._source is None:
+                    # Imported here: it loads pandas, which the index page does not need.
+                    from dashboard_core import open_data_source
+
+                    source = open_data_source(self.path)
+                    source.start_watching()
+                    self._source = source
+        return self._source
+
+    def snapshot(self):
+        return self.source.snapshot()
+
+
+# Callbacks take one snapshot of the data source and use it for their whole
+# run, so a reload that lands mid-request cannot mix two data versions.
+# DASHBOARD_DATA_PATH may point at an SQLite database instead of a CSV; see
+# dashboard_core.sql_backend.
+data_source = DeferredSource(data_path)
+figure_cache = FigureCache()
+export_cache = ExportCache()
+
+header_colors = {
+    'Name': '#333333',
+    'Age': '#FFDD44',
+    'Department': '#FF6F61',
+    'Salary': '#6B5B95',
+    'City': '#88B04B',
+    'lat': '#009879',
+    'lon': '#ff6347',
+    'Age Interval': '#4682b4'
+}
+
+def table_style(columns):
+    return dict(
+        columns=[
+            {'name': col, 'id': col, 'type': 'text', 'presentation': 'markdown'}
+            for col in columns
+        ],
+        style_header_conditional=[
+            {
+                'if': {'column_id': col},
+                'backgroundColor': header_colors.get(col, '#333'),
+                'color': 'white',
+                'fontWeight': 'bold'
+            } for col in columns
+        ],
+        style_data={
+            'color': 'black',
+            'backgroundColor': 'white'
+        }
+    )
+
+def generate_table(dataframe):
+    return dash_table.DataTable(
+        data=dataframe.to_dict('records'),
+        filter_action='native',
+        sort_action='native',
+        **table_style(dataframe.columns)
+    )
+
+def table_source_query(source):
+    kind, _, value = source.partition(':')
+    if kind == 'department':
+        return {'department': value}
+    elif kind == 'search':
+        return {'search': value}
+    return {}
+
+PROGRESS_SHOWN = {'display': 'flex', 'margin-bottom': '10px'}
+PROGRESS_HIDDEN = {'display': 'none'}
+
+def progress_bar(progress_id):
+    return dbc.Progress(id=progress_id, value=0, striped=True, animated=True, style=PROGRESS_HIDDEN)
@@ -0,0 +1,36 @@
+"""
+Data access shared by the Dash and Streamlit dashboards.
+
+Loading, indexing, search, aggregation, paging and figure construction live
+here, behind a backend interface with in-memory and SQLite implementations,
+so that both front ends stay thin presentation layers and every optimization
+lands, and is benchmarked, once.
+
+The names below are imported from their modules on first use, so importing
+a light module such as ``dashboard_core.export`` does not load pandas.
+"""
+import importlib
+
+# Exported name -> module defining it.
+_EXPORTS = {
+    'Backend': 'backend',
+    'DataSource': 'data_source',
+    'Dataset': 'dataset',
+    'SQLiteBackend': 'sql_backend',
+    'SQLiteSource': 'sql_backend',
+    'data_fingerprint': 'dataset',
+    'load_frame': 'data_loader',
+    'open_data_source': 'data_source',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+
+
+def __dir__():
+    return sorted([*globals(), *_EXPORTS])
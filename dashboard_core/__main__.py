@@ -0,0 +1,20 @@
+"""
+Convert the employee CSV to an SQLite database the dashboards can query:
+
+    python -m dashboard_core data.csv data.db
+"""
+import argparse
+
+from .sql_backend import import_csv
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert the employee CSV to an SQLite database for the dashboards.")
+    parser.add_argument('csv_path')
+    parser.add_argument('db_path')
+    args = parser.parse_args(argv)
+    import_csv(args.csv_path, args.db_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""
+The queries the dashboards run against employee data.
+
+Page functions in both apps ask a backend for exactly what they display: one
+page of a table, per-department aggregates, one department's employees, the
+map layer, search matches.  ``Dataset`` answers them from an in-memory frame
+and is the default; ``SQLiteBackend`` pushes them down to a database file so
+that rosters larger than memory never have to be loaded.  Shared figures are
+built from the same methods, so they work on either.
+"""
+from .table_query import PAGE_SIZE
+
+SEARCH_LIMIT = 20
+# Rows per frame when a query result is streamed rather than paged.
+CHUNK_ROWS = 50000
+
+
+class Backend:
+    """
+    Interface shared by the data backends.
+
+    ``fingerprint`` changes whenever the data does and keys every cache
+    downstream; ``version`` keys the Dash figure cache.  Row ids are the
+    0-based row numbers of the source file, so they mean the same row in
+    every backend.  Returned frames are shared and must not be mutated.
+    """
+
+    fingerprint = None
+    version = None
+
+    def __len__(self):
+        raise NotImplementedError
+
+    @property
+    def columns(self):
+        """
+        Column names of the employee table, in file order.
+        """
+        raise NotImplementedError
+
+    def departments(self):
+        """
+        Department names in order of first appearance.
+        """
+        raise NotImplementedError
+
+    def employee_page(self, department=None, search=None, filter_query='', sort_by=None,
+                      page_current=0, page_size=PAGE_SIZE):
+        """
+        One page of employees and the number of rows across all pages.
+
+        Rows are narrowed to ``department`` and to names containing
+        ``search``, filtered by a DataTable ``filter_query`` and ordered by
+        ``sort_by``, ties in Name order.
+        """
+        raise NotImplementedError
+
+    def employee_chunks(self, department=None, search=None, filter_query='', sort_by=None, chunk_size=CHUNK_ROWS):
+        """
+        Every row ``employee_page`` would page through, in the same order, as
+        frames of at most ``chunk_size`` rows.  At least one frame is yielded,
+        so an empty result still carries the columns.
+        """
+        raise NotImplementedError
+
+    def department_size(self, department):
+        raise NotImplementedError
+
+    def department_employees(self, department, offset=0, limit=None):
+        """
+        Name, Age and City of a department's employees ordered by Name,
+        indexed by row id.
+        """
+        raise NotImplementedError
+
+    def salary_aggregate(self, stat):
+        """
+        Salary ``stat`` per department as a frame with a Department column.
+        """
+        raise NotImplementedError
+
+    def salary_by_department(self):
+        raise NotImplementedError
+
+    def scatter_3d_bins(self):
+        raise NotImplementedError
+
+    def salary_box_stats(self):
+        raise NotImplementedError
+
+    def exact_frame(self, columns):
+        """
+        Every row of ``columns``, for figures drawn in exact mode.
+        """
+        raise NotImplementedError
+
+    def search_employees(self, query, limit=SEARCH_LIMIT):
+        """
+        Ids of the top ``limit`` employees whose Name or City contains ``query``.
+        """
+        raise NotImplementedError
+
+    def employee_labels(self, ids):
+        """
+        ``"Name (City)"`` of each of ``ids``.
+        """
+        raise NotImplementedError
+
+    def employee_location(self, row_id):
+        """
+        ``(lat, lon)`` of an employee, or None for an unknown id.
+        """
+        raise NotImplementedError
+
+    def map_center(self):
+        raise NotImplementedError
+
+    def map_layer(self, zoom, viewport=None):
+        """
+        Trace properties of the employee marker layer at ``zoom`` over a
+        ``viewport`` from ``map_layers.viewport_boxes``, or the whole map.
+        """
+        raise NotImplementedError
@@ -0,0 +1,107 @@
+"""
+Load the employee CSV through a memory-mapped Arrow IPC cache.
+
+The first load parses ``data.csv`` once, narrows its dtypes (categorical
+Department/City, the smallest integer types that fit) and writes an
+uncompressed Arrow IPC file next to it.  Later loads memory-map that file
+instead of parsing text, so numeric columns are backed by the OS page cache
+and shared between worker processes instead of being copied into each one.
+
+The cache records the CSV's modification time and size and is rebuilt when
+either changes; ``verify=True`` additionally compares a content hash.
+"""
+import hashlib
+import os
+import tempfile
+
+import pandas as pd
+import pyarrow as pa
+
+CATEGORICAL_COLUMNS = ('Department', 'City')
+
+
+def cache_path_for(csv_path):
+    root, _ = os.path.splitext(csv_path)
+    return root + '.arrow'
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_signature(csv_path):
+    stat = os.stat(csv_path)
+    return {b'source_mtime_ns': str(stat.st_mtime_ns).encode(), b'source_size': str(stat.st_size).encode()}
+
+
+def read_csv_compact(csv_path):
+    """
+    Parse the CSV with compact dtypes: categoricals for low-cardinality text
+    columns and downcast integers.
+    """
+    dataframe = pd.read_csv(csv_path)
+    for column in dataframe.columns:
+        if column in CATEGORICAL_COLUMNS:
+            dataframe[column] = dataframe[column].astype('category')
+        elif pd.api.types.is_integer_dtype(dataframe[column]):
+            dataframe[column] = pd.to_numeric(dataframe[column], downcast='integer')
+    return dataframe
+
+
+def write_cache(dataframe, cache_path, metadata):
+    table = pa.Table.from_pandas(dataframe, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    # Write to a temporary file and rename it into place so that concurrent
+    # workers never memory-map a partially written cache.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(cache_path) or '.', suffix='.arrow.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _open_cache(cache_path):
+    # The memory map is left open on purpose: zero-copy columns of the frame
+    # read from it keep referencing its pages.
+    return pa.ipc.open_file(pa.memory_map(cache_path))
+
+
+def _to_frame(reader):
+    return reader.read_all().to_pandas(split_blocks=True)
+
+
+def load_frame(csv_path, cache_path=None, verify=False):
+    """
+    Load ``csv_path`` as a DataFrame, going through the Arrow IPC cache.
+
+    Falls back to parsing the CSV directly if the cache cannot be written,
+    e.g. on a read-only filesystem.
+    """
+    cache_path = cache_path or cache_path_for(csv_path)
+    signature = _source_signature(csv_path)
+    if verify:
+        signature[b'source_sha256'] = file_digest(csv_path).encode()
+
+    if os.path.exists(cache_path):
+        try:
+            reader = _open_cache(cache_path)
+            metadata = reader.schema.metadata or {}
+            if all(metadata.get(key) == value for key, value in signature.items()):
+                return _to_frame(reader)
+        except (pa.ArrowInvalid, OSError):
+            pass
+
+    dataframe = read_csv_compact(csv_path)
+    signature.setdefault(b'source_sha256', file_digest(csv_path).encode())
+    try:
+        write_cache(dataframe, cache_path, signature)
+    except OSError:
+        return dataframe
+    return _to_frame(_open_cache(cache_path))
@@ -0,0 +1,181 @@
+"""
+Hot-reloadable employee data.
+
+``DataSource`` owns the current snapshot: a ``Dataset`` holding the loaded
+frame, everything derived from it and a version number that downstream caches
+key on.  A background thread polls the CSV for changes, loads the new version
+off the request path and swaps it in with a single reference assignment, so a
+callback that grabbed a snapshot keeps a consistent view for its whole run and
+never sees a half-loaded frame.  The same thread tails the delta file (see
+``delta``) and applies new lines to the current snapshot as they arrive,
+without re-reading the CSV.  A new version is checked against the schema
+first; one missing a column or holding text where numbers belong is
+rejected and the current snapshot stays.
+
+``open_data_source`` picks the backend from the path: a CSV is loaded into a
+``DataSource``, an SQLite database is queried in place through a
+``SQLiteSource``.
+"""
+import logging
+import os
+import threading
+
+import pandas as pd
+
+from .data_loader import load_frame
+from .dataset import Dataset
+from .delta import DELTA_PATH, apply_records, delta_path_for, delta_size, read_delta
+from .sql_backend import SQLiteSource, is_sqlite_path
+
+logger = logging.getLogger(__name__)
+
+WATCH_INTERVAL = float(os.environ.get('DASHBOARD_WATCH_INTERVAL', 5))
+# Columns the dashboards read, and those of them that must hold numbers.
+SCHEMA_COLUMNS = ('Name', 'Age', 'Department', 'Salary', 'City', 'lat', 'lon')
+NUMERIC_COLUMNS = ('Age', 'Salary', 'lat', 'lon')
+
+
+def check_schema(dataframe):
+    """
+    Raise ValueError unless ``dataframe`` has rows and every column of the
+    schema, with numeric dtypes where numbers are expected.
+    """
+    missing = [column for column in SCHEMA_COLUMNS if column not in dataframe.columns]
+    if missing:
+        raise ValueError(f"missing columns {', '.join(missing)}")
+    if not len(dataframe):
+        raise ValueError("no rows")
+    for column in NUMERIC_COLUMNS:
+        dtype = dataframe[column].dtype
+        if not pd.api.types.is_numeric_dtype(dtype) or pd.api.types.is_bool_dtype(dtype):
+            raise ValueError(f"column {column} has dtype {dtype}, not a number")
+
+
+class DataSource:
+    """
+    Loads ``path`` with the deltas in ``delta_path`` applied and keeps the
+    latest ``Dataset`` available to callbacks.
+    """
+
+    def __init__(self, path, loader=load_frame, delta_path=None):
+        self.path = path
+        self.loader = loader
+        self.delta_path = delta_path or DELTA_PATH or delta_path_for(path)
+        self._lock = threading.Lock()
+        self._signature = self._file_signature()
+        self._delta_offset = 0
+        self._snapshot = self._load(version=1)
+        self._thread = None
+        self._stop = threading.Event()
+
+    def snapshot(self):
+        """
+        The current snapshot; grab it once per callback and use it throughout.
+        """
+        return self._snapshot
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load(self, version):
+        dataframe = self.loader(self.path)
+        records, self._delta_offset = read_delta(self.delta_path)
+        if records:
+            dataframe = apply_records(dataframe, records).frame
+        return Dataset(dataframe, version=version)
+
+    def _swap(self, candidate, action):
+        # The version is only bumped when the content actually changed, so
+        # touching the files does not invalidate downstream caches.  A
+        # candidate that does not fit the schema, such as a half-written
+        # export, raises instead of replacing the current snapshot.
+        current = self._snapshot
+        if candidate.fingerprint == current.fingerprint:
+            return current
+        try:
+            check_schema(candidate.data)
+        except ValueError as error:
+            raise ValueError(f"{action} {self.path} version {candidate.version} rejected: {error}") from None
+        self._snapshot = candidate
+        logger.info("%s %s version %d (%d rows)", action, self.path, candidate.version, len(candidate))
+        return candidate
+
+    def reload(self):
+        """
+        Load the file and every delta again and swap the new snapshot in.
+        """
+        with self._lock:
+            signature = self._file_signature()
+            candidate = self._load(version=self._snapshot.version + 1)
+            self._signature = signature
+            return self._swap(candidate, 'Loaded')
+
+    def apply_deltas(self):
+        """
+        Apply the delta lines appended since the last read to the current
+        snapshot and swap the result in.
+        """
+        with self._lock:
+            records, offset = read_delta(self.delta_path, self._delta_offset)
+            candidate = self._snapshot.apply_delta(records) if records else self._snapshot
+            self._delta_offset = offset
+            return self._swap(candidate, 'Updated')
+
+    def _watch(self, interval):
+        pending = None
+        while not self._stop.wait(interval):
+            try:
+                signature = self._file_signature()
+            except OSError:
+                continue
+            # A delta file shorter than what was read has been truncated or
+            # replaced, typically after its lines were folded into the CSV.
+            rewritten = delta_size(self.delta_path) < self._delta_offset
+            if signature == self._signature and not rewritten:
+                pending = None
+                if delta_size(self.delta_path) > self._delta_offset:
+                    try:
+                        self.apply_deltas()
+                    except Exception:
+                        logger.exception("Applying %s failed; keeping version %d", self.delta_path, self.version)
+            elif (signature, rewritten) != pending:
+                # Wait for the file to stay unchanged for one more interval so
+                # an export that is still being written is not picked up.
+                pending = signature, rewritten
+            else:
+                try:
+                    self.reload()
+                except Exception:
+                    logger.exception("Reloading %s failed; keeping version %d", self.path, self.version)
+                pending = None
+
+    def start_watching(self, interval=WATCH_INTERVAL):
+        """
+        Poll the file's mtime and size and the delta file's size every
+        ``interval`` seconds on a daemon thread.
+        """
+        if interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, args=(interval,), name='data-source-watcher', daemon=True)
+        self._thread.start()
+
+    def stop_watching(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def open_data_source(path):
+    """
+    The data source for ``path``: SQLite for database files, pandas otherwise.
+    """
+    if is_sqlite_path(path):
+        return SQLiteSource(path)
+    return DataSource(path)
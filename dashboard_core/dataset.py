@@ -0,0 +1,203 @@
+"""
+One loaded version of the employee data and everything derived from it.
+
+A ``Dataset`` bundles the frame with its department index, derived columns,
+search index, salary statistics and a content fingerprint.  It is the
+default, in-memory data backend: both dashboards read through its ``Backend``
+methods, so each lookup structure is built once per loaded frame and an
+optimization to any of them lands in both front ends at once.
+
+``apply_delta`` derives the next version from row deltas: the fingerprint,
+the Name order and the salary statistics are updated from the changed rows
+alone, and everything else is rebuilt lazily on first use.
+"""
+import numpy as np
+import pandas as pd
+
+from .backend import CHUNK_ROWS, SEARCH_LIMIT, Backend
+from .delta import apply_records
+from .department_index import DepartmentIndex
+from .derived_columns import AGE_LABELS, DerivedColumns, age_intervals
+from .level_of_detail import scatter_3d_bins
+from .memo import Memo
+from .salary_stats import SalaryStats
+from .search_index import SearchIndex
+from .table_query import PAGE_SIZE, query_positions
+
+# Filtered and sorted table views kept per dataset, as row positions.
+QUERY_CACHE_ENTRIES = 32
+
+
+def _hash_sum(dataframe):
+    # Row hashes depend on values only, not on position or categories, so
+    # the sum can be updated row by row.
+    return int(pd.util.hash_pandas_object(dataframe, index=False).to_numpy().sum())
+
+
+def _fingerprint(length, hash_sum):
+    return f"{length}-{hash_sum:x}"
+
+
+def data_fingerprint(dataframe):
+    """
+    Content hash of a frame, used to key cache entries on the data version.
+    """
+    return _fingerprint(len(dataframe), _hash_sum(dataframe))
+
+
+def _with_age_interval(dataframe, intervals=None):
+    intervals = age_intervals(dataframe['Age']) if intervals is None else intervals
+    return pd.DataFrame({'Age Interval': intervals, 'Department': dataframe['Department'],
+                         'Salary': dataframe['Salary']})
+
+
+class Dataset(Backend):
+    """
+    The employee frame together with the structures derived from it.
+
+    Everything here is shared between requests or sessions and must be treated
+    as read-only; a reloaded or updated frame gets a new Dataset.
+    """
+
+    def __init__(self, dataframe, version=1, hash_sum=None, index=None, memo=None):
+        self.data = dataframe
+        self.version = version
+        self._hash_sum = _hash_sum(dataframe) if hash_sum is None else hash_sum
+        self.fingerprint = _fingerprint(len(dataframe), self._hash_sum)
+        self.index = DepartmentIndex(dataframe) if index is None else index
+        self.derived = DerivedColumns(dataframe)
+        self._queries = Memo(max_entries=QUERY_CACHE_ENTRIES)
+        self._memo = Memo(memo)
+
+    def __len__(self):
+        return len(self.data)
+
+    def _memoize(self, key, compute):
+        return self._memo.get(key, compute)
+
+    def apply_delta(self, records, version=None):
+        """
+        The Dataset after delta ``records`` (see ``delta``), as ``version``,
+        by default the next one.
+
+        The salary statistics are carried over only if they were built here;
+        a delta that changes a column's dtype rebuilds everything.
+        """
+        change = apply_records(self.data, records)
+        version = self.version + 1 if version is None else version
+        if change.retyped:
+            return Dataset(change.frame, version=version)
+        frame = change.frame
+        before = change.before
+        after = frame.iloc[np.concatenate([change.edited, change.appended])]
+        hash_sum = (self._hash_sum - _hash_sum(before) + _hash_sum(after)) % 2 ** 64
+        index = self.index.updated(frame, after.index.to_numpy())
+        memo = {}
+        departments = self._memo.peek('department_salaries')
+        intervals = self._memo.peek('interval_salaries')
+        if departments is not None:
+            memo['department_salaries'] = departments.updated(before, after)
+        if intervals is not None:
+            memo['interval_salaries'] = intervals.updated(_with_age_interval(before), _with_age_interval(after))
+        return Dataset(frame, version=version, hash_sum=hash_sum, index=index, memo=memo)
+
+    @property
+    def department_salaries(self):
+        return self._memoize('department_salaries', lambda: SalaryStats.from_frame(self.data, ['Department']))
+
+    @property
+    def interval_salaries(self):
+        return self._memoize('interval_salaries', lambda: SalaryStats.from_frame(
+            _with_age_interval(self.data, self.derived.age_interval), ['Age Interval', 'Department']))
+
+    @property
+    def search(self):
+        """
+        Trigram search index, built on first use so it stays off the load path.
+        """
+        return self._memoize('search', lambda: SearchIndex(self.data, name_rank=self.index.name_rank))
+
+    def employee_positions(self, department=None, search=None):
+        """
+        Row positions ordered by Name, optionally narrowed to a department
+        and/or to names containing ``search``.
+        """
+        if department is None and search is None:
+            return self.index.name_order
+        positions = self.search.name_contains(search) if search is not None else None
+        if department is None:
+            return positions
+        in_department = self.index.positions(department)
+        if positions is None:
+            return in_department
+        # Both are in Name order; keep the department's order.
+        return in_department[np.isin(in_department, positions)]
+
+    def _query_positions(self, department, search, filter_query, sort_by):
+        key = (department, search, filter_query, tuple((s['column_id'], s['direction']) for s in sort_by or ()))
+        return self._queries.get(key, lambda: query_positions(
+            self.data, self.employee_positions(department, search), filter_query, sort_by))
+
+    @property
+    def columns(self):
+        return list(self.data.columns)
+
+    def departments(self):
+        return self.index.departments
+
+    def employee_page(self, department=None, search=None, filter_query='', sort_by=None,
+                      page_current=0, page_size=PAGE_SIZE):
+        # Positions are cached per query, so turning pages only slices.
+        positions = self._query_positions(department, search, filter_query or '', sort_by)
+        page_size = page_size or PAGE_SIZE
+        start = (page_current or 0) * page_size
+        return self.data.iloc[positions[start:start + page_size]], len(positions)
+
+    def employee_chunks(self, department=None, search=None, filter_query='', sort_by=None, chunk_size=CHUNK_ROWS):
+        positions = self._query_positions(department, search, filter_query or '', sort_by)
+        for start in range(0, max(len(positions), 1), chunk_size):
+            yield self.data.iloc[positions[start:start + chunk_size]]
+
+    def department_size(self, department):
+        return len(self.index.positions(department))
+
+    def department_employees(self, department, offset=0, limit=None):
+        positions = self.index.positions(department)[offset:None if limit is None else offset + limit]
+        return self.data[['Name', 'Age', 'City']].iloc[positions]
+
+    def salary_aggregate(self, stat):
+        return self._memoize(('salary_aggregate', stat), lambda: self.department_salaries.aggregate(stat))
+
+    def salary_by_department(self):
+        return self._memoize('salary_by_department', lambda: self.department_salaries.totals(self.departments()))
+
+    def scatter_3d_bins(self):
+        return self._memoize('scatter_3d_bins', lambda: scatter_3d_bins(self.data))
+
+    def _salary_box_stats(self):
+        stats = self.interval_salaries.box_stats()
+        stats['Age Interval'] = pd.Categorical(stats['Age Interval'], categories=AGE_LABELS, ordered=True)
+        return stats
+
+    def salary_box_stats(self):
+        return self._memoize('salary_box_stats', self._salary_box_stats)
+
+    def exact_frame(self, columns):
+        return self.data
+
+    def search_employees(self, query, limit=SEARCH_LIMIT):
+        return self.search.search(query, limit=limit).tolist()
+
+    def employee_labels(self, ids):
+        return self.derived.employee_label.iloc[list(ids)].tolist()
+
+    def employee_location(self, row_id):
+        if not 0 <= row_id < len(self.data):
+            return None
+        return float(self.data['lat'].iat[row_id]), float(self.data['lon'].iat[row_id])
+
+    def map_center(self):
+        return self._memoize('map_center', lambda: (float(self.data['lat'].mean()), float(self.data['lon'].mean())))
+
+    def map_layer(self, zoom, viewport=None):
+        return self.derived.map_layer(zoom, viewport)
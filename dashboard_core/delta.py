@@ -0,0 +1,203 @@
+"""
+Row deltas: new hires and salary changes applied without re-reading the CSV.
+
+A feed appends JSON lines to a delta file beside the CSV (``data.delta.jsonl``
+for ``data.csv``, or ``DASHBOARD_DELTA_PATH``).  A line with an ``id`` updates
+the columns it names on that row; a line without one appends an employee, who
+gets the next row id.  ``DataSource`` tails the file and applies each batch of
+complete lines to the current ``Dataset``; the CSV is only re-read, with the
+whole delta file on top, when the CSV changes or the delta file is truncated.
+
+    {"Name": "Ada Lovelace", "Age": 36, "Department": "Engineering", "Salary": 120000, "City": "Boston", ...}
+    {"id": 1042, "Salary": 98000}
+"""
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DELTA_PATH = os.environ.get('DASHBOARD_DELTA_PATH')
+
+
+def delta_path_for(csv_path):
+    root, _ = os.path.splitext(csv_path)
+    return root + '.delta.jsonl'
+
+
+def delta_size(path):
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return 0
+
+
+def read_delta(path, offset=0):
+    """
+    Records of the complete lines after byte ``offset``, and the offset just
+    past them; a line still being written is left for the next read.
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+    end = data.rfind(b'\n') + 1
+    records = []
+    for number, line in enumerate(data[:end].splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        if isinstance(record, dict):
+            records.append(record)
+        else:
+            logger.warning("Skipping malformed line %d after byte %d of %s", number, offset, path)
+    return records, offset + end
+
+
+def append_delta(path, records):
+    """
+    Append ``records`` to the delta file as JSON lines, in a single write so
+    that a reader never sees a batch half written.
+    """
+    lines = ''.join(json.dumps(record, default=str) + '\n' for record in records).encode()
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, lines)
+    finally:
+        os.close(fd)
+
+
+def _number(value):
+    """
+    ``value`` as a number, parsing numbers sent as strings; missing values
+    pass through and anything else is None.
+    """
+    if isinstance(value, bool):
+        return None
+    if value is None or isinstance(value, (int, float, np.number)):
+        return value
+    if isinstance(value, str):
+        number = pd.to_numeric(value, errors='coerce')
+        return None if pd.isna(number) else number
+    return None
+
+
+def _record_values(frame, record):
+    """
+    The values of ``record`` for ``frame``'s columns, or None if one of them
+    is not a number in a numeric column.
+    """
+    values = {}
+    for column, value in record.items():
+        if column not in frame.columns:
+            continue
+        if pd.api.types.is_numeric_dtype(frame[column].dtype):
+            number = _number(value)
+            if number is None and value is not None:
+                logger.warning("Skipping delta %r: %s %r is not a number", record, column, value)
+                return None
+            value = number
+        values[column] = value
+    return values
+
+
+def _fitted(series, values):
+    """
+    ``values`` as a Series of ``series``' dtype, or of the common dtype both
+    are converted to when the values do not fit in it (NaN in an integer
+    column, an age beyond int8).
+    """
+    values = pd.Series(values, dtype=object)
+    values = values.infer_objects() if values.notna().any() else values.astype(float)
+    try:
+        cast = values.astype(series.dtype)
+        present = values.notna()
+        if (cast.notna() == present).all() and (cast[present] == values[present]).all():
+            return cast
+    except (TypeError, ValueError, OverflowError):
+        pass
+    return values.astype(pd.concat([series.head(1), values], ignore_index=True).dtype)
+
+
+def _categorical(series, appended, positions, values):
+    # Codes are extended and overwritten directly; new values become new
+    # categories after the existing ones.
+    new = pd.Series([*appended, *values], dtype=object)
+    present = new[new.notna()]
+    categories = series.cat.categories
+    added = pd.unique(present[~present.isin(categories)])
+    dtype = pd.CategoricalDtype(categories.append(pd.Index(added))) if len(added) else series.dtype
+    new_codes = dtype.categories.get_indexer(new)
+    codes = np.concatenate([series.cat.codes.to_numpy(), new_codes[:len(appended)]]).astype(np.int32)
+    codes[positions] = new_codes[len(appended):]
+    return pd.Series(pd.Categorical.from_codes(codes, dtype=dtype), name=series.name)
+
+
+class FrameChange:
+    """
+    A frame with a delta applied.
+
+    ``edited`` and ``appended`` are the positions of the updated and the new
+    rows and ``before`` holds the updated rows as they were.  ``retyped``
+    tells that a column changed dtype, which changes how every row of it
+    hashes and sorts, not just the delta's.
+    """
+
+    def __init__(self, frame, edited, appended, before, retyped):
+        self.frame = frame
+        self.edited = edited
+        self.appended = appended
+        self.before = before
+        self.retyped = retyped
+
+
+def apply_records(frame, records):
+    """
+    A copy of ``frame`` with delta ``records`` applied, as a ``FrameChange``.
+
+    Later records win over earlier ones and may update rows appended earlier
+    in the same batch.  Columns the frame does not have are ignored.  Numbers
+    sent as strings are parsed for numeric columns; a record with a value
+    that is not a number there, or an update of an unknown row id, is
+    skipped with a warning.
+    """
+    length = len(frame)
+    appended, edits = [], {}
+    for record in records:
+        row_id = record.get('id')
+        values = _record_values(frame, record)
+        if values is None:
+            continue
+        if row_id is None:
+            appended.append(values)
+        elif isinstance(row_id, int) and not isinstance(row_id, bool) and 0 <= row_id < length + len(appended):
+            (edits.setdefault(row_id, {}) if row_id < length else appended[row_id - length]).update(values)
+        else:
+            logger.warning("Skipping delta for unknown row id %r", row_id)
+
+    edited = np.array(sorted(edits), dtype=np.intp)
+    columns, retyped = {}, False
+    for column in frame.columns:
+        series = frame[column]
+        new = [row.get(column) for row in appended]
+        positions = np.array([p for p in edited if column in edits[p]], dtype=np.intp)
+        values = [edits[p][column] for p in positions]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[column] = _categorical(series, new, positions, values)
+            continue
+        fitted = _fitted(series, new + values)
+        if fitted.dtype != series.dtype:
+            series, retyped = series.astype(fitted.dtype), True
+        combined = pd.concat([series, fitted.iloc[:len(new)]], ignore_index=True)
+        combined.iloc[positions] = fitted.iloc[len(new):].to_numpy()
+        columns[column] = combined
+    return FrameChange(pd.DataFrame(columns), edited, np.arange(length, length + len(appended)),
+                       frame.iloc[edited], retyped)
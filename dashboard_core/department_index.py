@@ -0,0 +1,89 @@
+"""
+Per-department row index for the employee frame.
+
+Built once per loaded frame so that callbacks can look up a department's rows
+in O(group size) instead of scanning the whole frame with a boolean mask.
+"""
+import bisect
+
+import numpy as np
+import pandas as pd
+
+# Merging a changed row into the Name order costs a binary search of Python
+# string comparisons, so a delta touching more than this fraction of the rows
+# is sorted from scratch instead.
+REBUILD_FRACTION = 0.002
+
+
+class DepartmentIndex:
+    """
+    Maps each department to its row positions, pre-sorted by Name.
+
+    The index is tied to the frame it was built from; a reloaded frame gets a
+    new index.  ``name_order``, when known, skips the string sort.
+    """
+
+    def __init__(self, dataframe, name_order=None):
+        self.dataframe = dataframe
+        codes, uniques = pd.factorize(dataframe['Department'])
+        # One string sort gives the global Name order; a stable sort of the
+        # department codes in that order then groups it by department.
+        if name_order is None:
+            name_order = dataframe['Name'].reset_index(drop=True).sort_values(kind='mergesort').index.to_numpy()
+        self.name_order = name_order
+        self.name_rank = np.empty_like(self.name_order)
+        self.name_rank[self.name_order] = np.arange(len(self.name_order))
+        # Codes narrowed to the fewest bytes sort by radix.
+        narrow = codes.astype(np.min_scalar_type(len(uniques)))
+        order = self.name_order[np.argsort(narrow[self.name_order], kind='stable')]
+        order = order[codes[order] >= 0]
+        bounds = np.cumsum(np.bincount(codes[order], minlength=len(uniques)))[:-1]
+        self.departments = list(uniques)
+        self._positions = dict(zip(self.departments, np.split(order, bounds)))
+
+    def updated(self, dataframe, changed):
+        """
+        Index of ``dataframe``, this index's frame with the rows at positions
+        ``changed`` edited or appended.
+
+        Only those rows are sorted by Name; each is then placed among the
+        others, whose order is kept, with a binary search.
+        """
+        names = dataframe['Name']
+        changed = np.unique(changed)
+        if len(changed) > REBUILD_FRACTION * len(dataframe) or names.hasnans:
+            return DepartmentIndex(dataframe)
+        kept = np.delete(self.name_order, self.name_rank[changed[changed < len(self.name_order)]])
+        array = names.array
+
+        def key(position):
+            # The stable sort orders equal names by position.
+            return array[position], position
+
+        moved = sorted(changed.tolist(), key=key)
+        at = [bisect.bisect_left(kept, key(position), key=key) for position in moved]
+        return DepartmentIndex(dataframe, name_order=np.insert(kept, at, moved))
+
+    def __contains__(self, department):
+        return department in self._positions
+
+    def positions(self, department):
+        """
+        Row positions of ``department`` in the frame, ordered by Name.
+        """
+        return self._positions.get(department, np.empty(0, dtype=np.intp))
+
+    def frame(self, department):
+        """
+        Rows of ``department`` ordered by Name.
+        """
+        return self.dataframe.iloc[self.positions(department)]
+
+    def by_name(self):
+        """
+        The whole frame ordered by Name.
+        """
+        return self.dataframe.iloc[self.name_order]
+
+    def names(self, department):
+        return self.dataframe['Name'].to_numpy()[self.positions(department)].tolist()
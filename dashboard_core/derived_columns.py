@@ -0,0 +1,79 @@
+"""
+Columns derived from the employee frame, computed once per loaded frame.
+
+Callbacks used to bin ``Age`` into ``data['Age Interval']`` on every request,
+mutating the shared frame.  The derived values are now held beside the frame
+instead of inside it.  The map's spatial index is built here too, and
+whole-map marker layers are memoized per zoom level.
+"""
+import pandas as pd
+
+from .map_layers import marker_layer
+from .memo import Memo
+from .spatial_index import SpatialIndex
+
+AGE_BINS = [20, 30, 40, 50, 60]
+AGE_LABELS = ["20-30", "30-40", "40-50", "50-60"]
+
+
+def age_intervals(ages):
+    """
+    Bin ages into the ordered ``AGE_LABELS`` categories.
+    """
+    return pd.cut(ages, bins=AGE_BINS, labels=AGE_LABELS, right=False).rename('Age Interval')
+
+
+def employee_labels(dataframe):
+    """
+    ``"Name (City)"`` for every row, built with vectorized string concatenation.
+    """
+    return (dataframe['Name'].astype(str) + ' (' + dataframe['City'].astype(str) + ')').rename('Label')
+
+
+class DerivedColumns:
+    """
+    Lazily computed, memoized columns derived from a single frame.
+
+    The returned objects are shared between callbacks and must be treated as
+    read-only; a reloaded frame gets a new instance.
+    """
+
+    def __init__(self, dataframe):
+        self.dataframe = dataframe
+        self._cache = Memo()
+
+    def _memoize(self, key, compute):
+        return self._cache.get(key, compute)
+
+    @property
+    def age_interval(self):
+        return self._memoize('age_interval', lambda: age_intervals(self.dataframe['Age']))
+
+    @property
+    def employee_label(self):
+        return self._memoize('employee_label', lambda: employee_labels(self.dataframe))
+
+    @property
+    def spatial_index(self):
+        return self._memoize('spatial_index', lambda: SpatialIndex.from_points(
+            self.dataframe['lat'], self.dataframe['lon']))
+
+    def _points(self, cells):
+        positions = self.spatial_index.positions(cells)
+        return (self.dataframe['lat'].iloc[positions].to_numpy(dtype=float),
+                self.dataframe['lon'].iloc[positions].to_numpy(dtype=float),
+                self._labels(positions))
+
+    def _labels(self, positions):
+        return self.employee_label.iloc[positions].to_numpy(dtype=object)
+
+    def map_layer(self, zoom, viewport=None):
+        """
+        The employee marker layer at ``zoom`` for a viewport; whole-map layers
+        are precomputed per whole zoom level.
+        """
+        if viewport is not None:
+            return marker_layer(self.spatial_index, zoom, viewport, self._points, self._labels)
+        zoom = int(round(zoom))
+        return self._memoize(('map_layer', zoom), lambda: marker_layer(
+            self.spatial_index, zoom, None, self._points, self._labels))
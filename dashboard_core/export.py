@@ -0,0 +1,262 @@
+"""
+Report exports: the employee table, per-department salary statistics and the
+statistics figures, as CSV, Parquet, Excel or a ZIP bundle of all three.
+
+Writers pull the table through ``Backend.employee_chunks`` and write it chunk
+by chunk, so an export of millions of rows holds one chunk in memory at a
+time on either backend.  Finished files are kept in ``EXPORT_DIR`` under a
+hash of (data fingerprint, table query, format): a repeat download is served
+from disk, by every worker on the host, until the data changes.
+
+Parquet needs pyarrow and Excel needs XlsxWriter; formats whose library is
+missing are left out of ``available_formats``.  Figures are PNG images when
+kaleido is installed and standalone HTML pages otherwise.  These libraries,
+and the figures, are only imported once an export is written, so the apps
+can list the formats without loading them.
+"""
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+import time
+import zipfile
+
+EXPORT_DIR = os.environ.get('DASHBOARD_EXPORT_DIR', os.path.join(tempfile.gettempdir(), 'dashboard-exports'))
+EXPORT_CACHE_ENTRIES = int(os.environ.get('DASHBOARD_EXPORT_CACHE_ENTRIES', 16))
+# Files left behind by an export that was killed mid-write are removed after this long.
+STALE_PARTIAL_SECONDS = 3600
+# Excel caps a worksheet at this many rows; longer tables continue on more sheets.
+EXCEL_MAX_ROWS = 1048576
+
+# Format -> (label, MIME type); the format is also the file extension.
+EXPORT_FORMATS = {
+    'zip': ('ZIP bundle', 'application/zip'),
+    'csv': ('CSV', 'text/csv'),
+    'parquet': ('Parquet', 'application/vnd.apache.parquet'),
+    'xlsx': ('Excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def available_formats():
+    """
+    Export formats whose writer library is installed, in menu order.
+    """
+    missing = {'parquet': not _installed('pyarrow'), 'xlsx': not _installed('xlsxwriter')}
+    return [fmt for fmt in EXPORT_FORMATS if not missing.get(fmt)]
+
+
+def export_filename(fmt):
+    return f"employee-report.{fmt}"
+
+
+def export_key(dataset, fmt, query):
+    """
+    Cache key of an export of ``dataset`` narrowed by a table ``query``:
+    ``employee_chunks`` keyword arguments other than ``chunk_size``.
+    """
+    sort_by = [(s['column_id'], s['direction']) for s in query.get('sort_by') or ()]
+    payload = json.dumps([dataset.fingerprint, fmt, query.get('department'), query.get('search'),
+                          (query.get('filter_query') or '').strip(), sort_by])
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def write_csv(chunks, stream):
+    header = True
+    for chunk in chunks:
+        chunk.to_csv(stream, header=header, index=False)
+        header = False
+
+
+def write_parquet(chunks, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    # Every chunk is converted to the first chunk's schema, so a column that
+    # happens to hold only nulls in one chunk keeps its type.
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _worksheet_rows(frame):
+    return frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None)
+
+
+def _add_worksheet(workbook, name, columns):
+    sheet = workbook.add_worksheet(name)
+    sheet.write_row(0, 0, list(columns))
+    return sheet
+
+
+def write_xlsx(chunks, summary, path):
+    """
+    Employees on one or more "Employees" sheets and ``summary`` on a
+    "Summary" sheet.  In constant-memory mode XlsxWriter flushes each row as
+    soon as the next one starts.
+    """
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        sheet, sheets, row = None, 0, 0
+        for chunk in chunks:
+            for record in _worksheet_rows(chunk):
+                if sheet is None or row == EXCEL_MAX_ROWS:
+                    sheets += 1
+                    name = f"Employees {sheets}" if sheets > 1 else 'Employees'
+                    sheet = _add_worksheet(workbook, name, chunk.columns)
+                    row = 1
+                sheet.write_row(row, 0, record)
+                row += 1
+        if sheet is None:
+            _add_worksheet(workbook, 'Employees', chunk.columns)
+        summary_sheet = _add_worksheet(workbook, 'Summary', summary.columns)
+        for row, record in enumerate(_worksheet_rows(summary), start=1):
+            summary_sheet.write_row(row, 0, record)
+    finally:
+        workbook.close()
+
+
+def report_figures(dataset):
+    """
+    The statistics page figures by file name, drawn from aggregates on large data.
+    """
+    from .figures import salary_bar_figure, salary_box_figure, salary_scatter_3d_figure
+    from .level_of_detail import use_aggregates
+
+    aggregate = use_aggregates(dataset)
+    return {
+        'salary_by_department': salary_bar_figure(dataset, aggregate, title='Salary Distribution by Department'),
+        'salary_3d': salary_scatter_3d_figure(dataset, aggregate,
+                                              title='3D Salary Distribution by Department and Age'),
+        'salary_by_age_interval': salary_box_figure(dataset, title='Salary by Age Intervals Cross Departments'),
+    }
+
+
+def figure_file(fig):
+    """
+    ``(extension, content)`` of a figure saved on its own.
+    """
+    if _installed('kaleido'):
+        return 'png', fig.to_image(format='png', width=1200, height=700)
+    return 'html', fig.to_html(include_plotlyjs='cdn').encode()
+
+
+def write_zip(dataset, chunks, path):
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        # The table is compressed as it is written; force_zip64 because its
+        # final size is not known up front.
+        with archive.open('employees.csv', 'w', force_zip64=True) as entry:
+            with io.TextIOWrapper(entry, encoding='utf-8', newline='') as stream:
+                write_csv(chunks, stream)
+        archive.writestr('salary_summary.csv', dataset.salary_aggregate('describe').to_csv(index=False))
+        for name, fig in report_figures(dataset).items():
+            extension, content = figure_file(fig)
+            archive.writestr(f"figures/{name}.{extension}", content)
+
+
+def _reporting(chunks, progress, total):
+    written = 0
+    for chunk in chunks:
+        yield chunk
+        written += len(chunk)
+        progress(written, total)
+
+
+def write_export(dataset, fmt, path, query=None, progress=None):
+    """
+    Write an export of the employees matching ``query`` to ``path``.
+
+    ``progress``, if given, is called with (rows written, total rows) after
+    every chunk.
+    """
+    if fmt not in available_formats():
+        raise ValueError(f"Unsupported export format: {fmt}")
+    query = query or {}
+    chunks = dataset.employee_chunks(**query)
+    if progress is not None:
+        chunks = _reporting(chunks, progress, dataset.employee_page(page_size=1, **query)[1])
+    if fmt == 'csv':
+        with open(path, 'w', encoding='utf-8', newline='') as stream:
+            write_csv(chunks, stream)
+    elif fmt == 'parquet':
+        write_parquet(chunks, path)
+    elif fmt == 'xlsx':
+        write_xlsx(chunks, dataset.salary_aggregate('describe'), path)
+    else:
+        write_zip(dataset, chunks, path)
+
+
+class ExportCache:
+    """
+    Finished exports on disk, keyed by data fingerprint, table query and format.
+
+    Files are written under a temporary name and renamed into place, so a
+    concurrent request never sees a partial file.  Beyond ``max_entries``
+    the least recently downloaded files are deleted.
+    """
+
+    def __init__(self, directory=EXPORT_DIR, max_entries=EXPORT_CACHE_ENTRIES):
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def path(self, dataset, fmt, query=None):
+        return os.path.join(self.directory, f"{export_key(dataset, fmt, query or {})}.{fmt}")
+
+    def export(self, dataset, fmt, query=None, progress=None):
+        """
+        Path of the export, written first unless it is already cached.
+        """
+        path = self.path(dataset, fmt, query)
+        try:
+            # The modification time records the last download for eviction.
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            pass
+        os.makedirs(self.directory, exist_ok=True)
+        fd, partial = tempfile.mkstemp(dir=self.directory, prefix='.', suffix='.partial')
+        os.close(fd)
+        try:
+            write_export(dataset, fmt, partial, query, progress)
+            os.replace(partial, path)
+        except BaseException:
+            os.remove(partial)
+            raise
+        self._evict()
+        return path
+
+    def _evict(self):
+        now = time.time()
+        finished = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_file():
+                continue
+            mtime = entry.stat().st_mtime
+            if not entry.name.startswith('.'):
+                finished.append((mtime, entry.path))
+            elif now - mtime > STALE_PARTIAL_SECONDS:
+                _remove(entry.path)
+        finished.sort(reverse=True)
+        for _, path in finished[self.max_entries:]:
+            _remove(path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
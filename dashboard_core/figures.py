@@ -0,0 +1,107 @@
+"""
+Plotly figures shared by both dashboards.
+
+Builders take a data backend and draw from the aggregates it returns, so
+neither front end touches the raw rows to draw a chart.  Extra keyword
+arguments go to the figure layout (titles, bar mode) where the two apps
+style a chart differently.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+from .derived_columns import AGE_LABELS
+from .level_of_detail import annotate_aggregated
+
+
+def salary_bar_figure(dataset, aggregate, **layout):
+    if not aggregate:
+        data = dataset.exact_frame(['Department', 'Salary'])
+        return px.bar(data, x='Department', y='Salary', color='Department', **layout)
+    fig = px.bar(dataset.salary_by_department(), x='Department', y='Salary', color='Department',
+                 hover_data=['Employees'], **layout)
+    return annotate_aggregated(fig, len(dataset), 'total salary per department')
+
+
+def salary_scatter_3d_figure(dataset, aggregate, **layout):
+    if not aggregate:
+        data = dataset.exact_frame(['Department', 'Salary', 'Age'])
+        return px.scatter_3d(data, x='Department', y='Salary', z='Age', color='Department', **layout)
+    fig = px.scatter_3d(dataset.scatter_3d_bins(), x='Department', y='Salary', z='Age', color='Department',
+                        size='Employees', hover_data=['Employees'], **layout)
+    return annotate_aggregated(fig, len(dataset), 'salary/age bins sized by headcount')
+
+
+def salary_box_figure(dataset, **layout):
+    """
+    Salary box plot per age interval and department.
+
+    Boxes are drawn from precomputed quartiles, so the figure size depends on
+    the number of (interval, department) groups rather than on row count.
+    """
+    stats = dataset.salary_box_stats()
+    fig = go.Figure()
+    colors = px.colors.qualitative.Plotly
+    for i, dept in enumerate(dataset.departments()):
+        rows = stats[stats['Department'] == dept]
+        fig.add_trace(go.Box(
+            name=dept,
+            x=rows['Age Interval'].astype(str),
+            q1=rows['q1'],
+            median=rows['median'],
+            q3=rows['q3'],
+            mean=rows['mean'],
+            lowerfence=rows['lowerfence'],
+            upperfence=rows['upperfence'],
+            marker_color=colors[i % len(colors)],
+            offsetgroup=dept
+        ))
+    fig.update_layout(
+        boxmode='group',
+        xaxis={'title': 'Age Interval', 'categoryorder': 'array', 'categoryarray': AGE_LABELS},
+        yaxis_title='Salary',
+        legend_title_text='Department',
+        **layout
+    )
+    return fig
+
+
+def base_map_figure(dataset, zoom):
+    """
+    Employee map centered on the mean location.
+
+    Trace 0 is the (clustered) employee layer and trace 1 the selection
+    highlight, so callers can update either in place instead of rebuilding.
+    """
+    layer = dataset.map_layer(zoom)
+    lat, lon = dataset.map_center()
+    fig = go.Figure([
+        go.Scattermapbox(
+            lat=layer['lat'],
+            lon=layer['lon'],
+            mode='markers',
+            marker=go.scattermapbox.Marker(size=layer['size']),
+            text=layer['text']
+        ),
+        go.Scattermapbox(
+            lat=[],
+            lon=[],
+            mode='markers+text',
+            marker=dict(size=12, color='red'),
+            text=["Selected Location"],
+            textposition="top right"
+        )
+    ])
+
+    fig.update_layout(
+        mapbox=dict(
+            center=dict(
+                lat=lat,
+                lon=lon
+            ),
+            zoom=zoom,
+            style="open-street-map"
+        ),
+        margin={"r": 0, "t": 0, "l": 0, "b": 0},
+        showlegend=False
+    )
+    return fig
@@ -0,0 +1,57 @@
+"""
+Aggregate-first inputs for figures that would otherwise plot every employee.
+
+Above ``LOD_THRESHOLD`` rows the salary bar chart is drawn from one bar per
+department and the 3D scatter from (department, salary, age) bins with counts,
+so figure size depends on the number of groups rather than on headcount.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+LOD_THRESHOLD = int(os.environ.get('DASHBOARD_LOD_THRESHOLD', 50000))
+LOD_BINS = 40
+
+
+def use_aggregates(dataset, exact=False):
+    return not exact and len(dataset) > LOD_THRESHOLD
+
+
+def _bin_codes(values, bins):
+    values = values.to_numpy(dtype=float)
+    low, high = np.nanmin(values), np.nanmax(values)
+    width = (high - low) / bins or 1.0
+    return np.minimum(((values - low) / width).astype(np.int64), bins - 1)
+
+
+def scatter_3d_bins(dataframe, bins=LOD_BINS):
+    """
+    Bin employees per department on a ``bins`` x ``bins`` Salary/Age grid.
+
+    Each occupied cell becomes one marker placed at the mean Salary and Age of
+    its members, with the member count in ``Employees``.
+    """
+    frame = dataframe[['Department', 'Salary', 'Age']].dropna()
+    keys = pd.DataFrame({
+        'Department': frame['Department'].to_numpy(),
+        'salary_bin': _bin_codes(frame['Salary'], bins),
+        'age_bin': _bin_codes(frame['Age'], bins),
+        'Salary': frame['Salary'].to_numpy(),
+        'Age': frame['Age'].to_numpy()
+    })
+    grouped = keys.groupby(['Department', 'salary_bin', 'age_bin'], sort=False, observed=True)
+    cells = grouped.agg(Salary=('Salary', 'mean'), Age=('Age', 'mean'), Employees=('Salary', 'size'))
+    return cells.reset_index().drop(columns=['salary_bin', 'age_bin'])
+
+
+def annotate_aggregated(fig, total_rows, detail):
+    """
+    Tell the user that ``fig`` shows an aggregate rather than individual employees.
+    """
+    fig.add_annotation(
+        text=f"Aggregated view of {total_rows:,} employees ({detail}). Enable exact mode for full detail.",
+        xref='paper', yref='paper', x=0, y=1.08, xanchor='left',
+        showarrow=False, font={'size': 12, 'color': '#6c757d'}
+    )
+    return fig
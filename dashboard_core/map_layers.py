@@ -0,0 +1,83 @@
+"""
+Marker layers for the employee map.
+
+A layer covers a viewport, or the whole map.  When up to ``MAX_MARKERS``
+employees fall in it they are plotted one marker each; above that they are
+clustered on a lat/lon grid whose cell size follows the map zoom level, and
+the grid is coarsened until the layer fits within the budget.  Both are
+answered from a ``SpatialIndex``, so the cost and size of a layer follow what
+is on screen rather than the size of the roster.
+"""
+import math
+
+import numpy as np
+
+MAX_MARKERS = 3000
+# Cell edge in degrees at zoom 0; every zoom level halves it.
+CELL_DEGREES_AT_ZOOM_0 = 45.0
+# Viewports are widened by this fraction of their size on every side, so a
+# short pan stays within the markers already sent.
+VIEWPORT_MARGIN = 0.25
+# Web map tiles are this many pixels wide at zoom 0.
+TILE_PIXELS = 512
+
+
+def _padded(low, high, limit_low, limit_high):
+    margin = (high - low) * VIEWPORT_MARGIN
+    return max(low - margin, limit_low), min(high + margin, limit_high)
+
+
+def viewport_boxes(corners):
+    """
+    ``(south, west, north, east)`` boxes covering a map viewport.
+
+    ``corners`` are the ``[lon, lat]`` pairs Plotly reports as
+    ``mapbox._derived.coordinates``.  Longitudes keep growing past 180 when
+    the map is panned around the globe, so they are wrapped back and a view
+    across the antimeridian becomes two boxes.
+    """
+    lons = [corner[0] for corner in corners]
+    lats = [corner[1] for corner in corners]
+    south, north = _padded(min(lats), max(lats), -90, 90)
+    west, east = min(lons), max(lons)
+    margin = (east - west) * VIEWPORT_MARGIN
+    west, east = west - margin, east + margin
+    if east - west >= 360:
+        return [(south, -180, north, 180)]
+    turns = math.floor((west + 180) / 360)
+    west, east = west - 360 * turns, east - 360 * turns
+    if east <= 180:
+        return [(south, west, north, east)]
+    return [(south, west, north, 180), (south, -180, north, east - 360)]
+
+
+def viewport_around(lat, lon, zoom, width=1200, height=750):
+    """
+    Boxes of a ``width`` x ``height`` pixel map centered on (lat, lon) at ``zoom``.
+    """
+    lon_span = 360 * width / (TILE_PIXELS * 2 ** zoom)
+    # Web Mercator stretches latitudes by 1 / cos(lat) away from the equator.
+    lat_span = 360 * height / (TILE_PIXELS * 2 ** zoom) * math.cos(math.radians(lat))
+    return viewport_boxes([[lon - lon_span / 2, lat - lat_span / 2], [lon + lon_span / 2, lat + lat_span / 2]])
+
+
+def marker_layer(index, zoom, viewport, points, labels):
+    """
+    Trace properties (lat, lon, text, marker size) of the marker layer.
+
+    ``index`` is the ``SpatialIndex`` of the data and ``viewport`` a list of
+    boxes, or None for the whole map.  ``points(cells)`` returns the lat,
+    lon and label arrays of the employees in index cells and
+    ``labels(ids)`` the labels of row ids.
+    """
+    cells = index.visible(viewport)
+    if index.size(cells) <= MAX_MARKERS:
+        lat, lon, text = points(cells)
+        return {'lat': np.asarray(lat), 'lon': np.asarray(lon), 'text': np.asarray(text, dtype=object), 'size': 9}
+    clusters = index.clusters(cells, zoom, MAX_MARKERS)
+    count = clusters['count']
+    singles = count == 1
+    text = np.array([f"{value:,} employees" for value in count.tolist()], dtype=object)
+    text[singles] = labels(clusters['first'][singles].tolist())
+    size = np.where(singles, 9, np.minimum(9 + 3 * np.log2(count), 40))
+    return {'lat': clusters['lat'], 'lon': clusters['lon'], 'text': text, 'size': size}
@@ -0,0 +1,83 @@
+"""
+Thread-safe memoization that survives ``fork``.
+
+Background jobs are forked from threaded workers.  A child inherits every
+lock in the state it had at the fork, and one held by another thread then
+is never released in the child, so a job waiting on it hangs.  A ``Memo``
+therefore never holds its table lock while computing: a value is built
+under a lock of its own key, so a multi-second build (a trigram index, box
+plot statistics) delays only callers of that key, and concurrent callers
+still wait for one build rather than each doing it.  In a forked child
+every ``Memo`` and every object passed to ``renew_locks_after_fork`` gets
+fresh locks; a value some other thread was building is built again there.
+"""
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+_renewed = weakref.WeakSet()
+
+
+def renew_locks_after_fork(obj):
+    """
+    Call ``obj._renew_locks()`` in every child forked from now on, for as
+    long as ``obj`` is alive.
+    """
+    _renewed.add(obj)
+
+
+def _after_fork_in_child():
+    # The child runs only the thread that forked, so nothing races this.
+    for obj in list(_renewed):
+        obj._renew_locks()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class Memo:
+    """
+    Values computed on first use, by key; at most ``max_entries`` of them,
+    least recently used first out, when given.
+    """
+
+    def __init__(self, values=None, max_entries=None):
+        self.max_entries = max_entries
+        self._values = OrderedDict(values or {})
+        self._building = {}
+        self._lock = threading.Lock()
+        renew_locks_after_fork(self)
+
+    def _renew_locks(self):
+        self._lock = threading.Lock()
+        self._building = {}
+
+    def peek(self, key):
+        """
+        The value of ``key`` if it was already computed, else None.
+        """
+        with self._lock:
+            return self._values.get(key)
+
+    def get(self, key, compute):
+        """
+        The value of ``key``, computed with ``compute()`` if it is missing.
+        """
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+            building = self._building.setdefault(key, threading.Lock())
+        with building:
+            with self._lock:
+                if key in self._values:
+                    return self._values[key]
+            value = compute()
+            with self._lock:
+                self._values[key] = value
+                self._building.pop(key, None)
+                if self.max_entries is not None and len(self._values) > self.max_entries:
+                    self._values.popitem(last=False)
+        return value
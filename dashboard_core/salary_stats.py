@@ -0,0 +1,213 @@
+"""
+Salary statistics per group, maintained incrementally as rows change.
+
+Each group (a department, or an age interval and department) keeps its
+headcount, the sum and sum of squares of its salaries, and the salaries
+themselves in sorted order.  Counts, means and standard deviations come from
+the sums; medians, quartiles and box plot fences are read off the sorted
+salaries by position, so they are exactly the linearly interpolated quantiles
+pandas computes.  Applying a delta touches only the groups of the rows it
+removes or adds: their sums are adjusted and their sorted salaries get values
+deleted and inserted at binary-searched positions, while every other group is
+shared with the previous statistics.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+SALARY_STATS = ('describe', 'mean', 'median', 'sum')
+DESCRIBE_COLUMNS = ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+
+
+def _exact(values):
+    return values.astype(np.int64) if values.dtype.kind in 'iub' else values.astype(float)
+
+
+def _sum(values):
+    return _exact(values).sum().item() if len(values) else 0
+
+
+def _sum_squares(values):
+    values = _exact(values)
+    return np.dot(values, values).item() if len(values) else 0
+
+
+class SalaryGroup:
+    """
+    One group's headcount, salary sums and sorted salaries.
+
+    Sums of integer salaries are Python ints, so the variance does not
+    suffer the cancellation of E[x^2] - E[x]^2 in floating point.
+    """
+
+    __slots__ = ('rows', 'total', 'squares', 'values')
+
+    def __init__(self, rows, total, squares, values):
+        self.rows = rows
+        self.total = total
+        self.squares = squares
+        self.values = values
+
+    @property
+    def count(self):
+        return len(self.values)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else float('nan')
+
+    @property
+    def std(self):
+        n = self.count
+        if n < 2:
+            return float('nan')
+        return math.sqrt(max(n * self.squares - self.total * self.total, 0) / (n * (n - 1)))
+
+    def quantile(self, q):
+        """
+        Linearly interpolated quantile, as ``Series.quantile`` computes it.
+        """
+        if not self.count:
+            return float('nan')
+        position = q * (self.count - 1)
+        low = int(position)
+        below = self.values[low].item()
+        above = self.values[min(low + 1, self.count - 1)].item()
+        return below + (position - low) * (above - below)
+
+    def fences(self, low, high):
+        """
+        The smallest salary at or above ``low`` and the largest at or below ``high``.
+        """
+        if not self.count:
+            return float('nan'), float('nan')
+        first = np.searchsorted(self.values, low, side='left')
+        last = np.searchsorted(self.values, high, side='right') - 1
+        return self.values[first].item(), self.values[last].item()
+
+    def changed(self, removed, added, rows):
+        """
+        A copy with the sorted ``removed`` salaries taken out, the sorted
+        ``added`` salaries put in and ``rows`` added to the headcount.
+        """
+        values = self.values
+        if len(removed):
+            # Equal salaries are deleted at consecutive positions of their run.
+            runs = np.arange(len(removed)) - np.searchsorted(removed, removed, side='left')
+            values = np.delete(values, np.searchsorted(values, removed, side='left') + runs)
+        if len(added):
+            values = np.insert(values, np.searchsorted(values, added, side='left'), added)
+        return SalaryGroup(self.rows + rows, self.total - _sum(removed) + _sum(added),
+                           self.squares - _sum_squares(removed) + _sum_squares(added), values)
+
+
+def _key(key):
+    return key[0] if isinstance(key, tuple) and len(key) == 1 else key
+
+
+class SalaryStats:
+    """
+    ``SalaryGroup``s of the frame's Salary column keyed by the values of the
+    ``by`` columns: a department name, or an (age interval, department) tuple.
+
+    Instances are never modified; ``updated`` returns new statistics.
+    """
+
+    def __init__(self, by, groups, dtype):
+        self.by = list(by)
+        self.groups = groups
+        self.dtype = dtype
+
+    @classmethod
+    def from_frame(cls, frame, by):
+        """
+        Statistics of ``frame`` grouped by the ``by`` columns; rows with a
+        missing key are left out, as ``groupby`` leaves them out.
+        """
+        grouped = frame.groupby(by, observed=True, sort=False)
+        # Rows with a missing key get no group number.
+        codes = grouped.ngroup().fillna(-1).to_numpy(dtype=np.int64)
+        keys = [_key(key) for key in grouped.size().index]
+        salaries = frame['Salary'].to_numpy()
+        rows = np.bincount(codes[codes >= 0], minlength=len(keys))
+        # One sort by (group, salary) orders every group at once.
+        present = np.flatnonzero((codes >= 0) & ~pd.isna(salaries))
+        order = present[np.lexsort((salaries[present], codes[present]))]
+        values = np.split(salaries[order], np.cumsum(np.bincount(codes[order], minlength=len(keys)))[:-1])
+        groups = {key: SalaryGroup(int(count), _sum(group), _sum_squares(group), group)
+                  for key, count, group in zip(keys, rows, values)}
+        return cls(by, groups, salaries.dtype)
+
+    def updated(self, removed, added):
+        """
+        Statistics after the rows of frame ``removed`` were deleted and those
+        of ``added`` inserted; an edited row is removed as it was and added
+        as it is now.  Only the groups of those rows are rebuilt.
+        """
+        changes = {}
+        for slot, frame in ((0, removed), (1, added)):
+            for key, salaries in frame.groupby(self.by, observed=True, sort=False)['Salary']:
+                change = changes.setdefault(_key(key), [(), (), 0])
+                change[slot] = np.sort(salaries.dropna().to_numpy(dtype=self.dtype))
+                change[2] += len(salaries) if slot else -len(salaries)
+        groups = dict(self.groups)
+        empty = SalaryGroup(0, 0, 0, np.empty(0, dtype=self.dtype))
+        for key, (taken, put, rows) in changes.items():
+            group = groups.get(key, empty).changed(np.asarray(taken, dtype=self.dtype),
+                                                   np.asarray(put, dtype=self.dtype), rows)
+            if group.rows:
+                groups[key] = group
+            else:
+                groups.pop(key, None)
+        return SalaryStats(self.by, groups, self.dtype)
+
+    def _records(self, values):
+        """
+        One record per group, sorted by key: the key columns followed by ``values(group)``.
+        """
+        records = []
+        for key in sorted(self.groups):
+            keys = key if isinstance(key, tuple) else (key,)
+            records.append([*keys, *values(self.groups[key])])
+        return records
+
+    def aggregate(self, stat):
+        """
+        ``groupby(by)['Salary']`` ``stat`` as a frame with the key columns, sorted by key.
+        """
+        if stat not in SALARY_STATS:
+            raise ValueError(f"Unknown salary statistic: {stat}")
+        if stat == 'describe':
+            def describe(group):
+                low, high = group.fences(-math.inf, math.inf)
+                return [float(group.count), group.mean, group.std, float(low), group.quantile(0.25),
+                        group.quantile(0.5), group.quantile(0.75), float(high)]
+            return pd.DataFrame(self._records(describe), columns=[*self.by, *DESCRIBE_COLUMNS])
+        value = {
+            'mean': lambda group: [group.mean],
+            'median': lambda group: [group.quantile(0.5)],
+            'sum': lambda group: [group.total],
+        }[stat]
+        return pd.DataFrame(self._records(value), columns=[*self.by, 'Salary'])
+
+    def box_stats(self):
+        """
+        Box plot statistics per group.  Fences follow Plotly's default: the
+        most extreme salaries that lie within 1.5 IQR of the quartiles.
+        """
+        def box(group):
+            q1, median, q3 = (group.quantile(q) for q in (0.25, 0.5, 0.75))
+            iqr = q3 - q1
+            return [q1, median, q3, group.mean, *group.fences(q1 - 1.5 * iqr, q3 + 1.5 * iqr)]
+        return pd.DataFrame(self._records(box),
+                            columns=[*self.by, 'q1', 'median', 'q3', 'mean', 'lowerfence', 'upperfence'])
+
+    def totals(self, keys):
+        """
+        Total salary and headcount of the groups ``keys``, in that order.
+        """
+        groups = [self.groups[key] for key in keys if key in self.groups]
+        return pd.DataFrame({self.by[0]: [key for key in keys if key in self.groups],
+                             'Salary': [group.total for group in groups],
+                             'Employees': [group.rows for group in groups]})
@@ -0,0 +1,120 @@
+"""
+Trigram index over employee names and cities for server-side search.
+
+Every row is indexed by the lowercase trigrams of its ``"Name (City)"``
+label, each packed into a single integer key.  A query of three or more
+characters intersects the posting lists of its own trigrams, smallest
+first, and only the surviving candidates are checked with a real substring
+test, so a keystroke costs time proportional to the number of plausible
+matches rather than to the number of employees.  Shorter queries fall
+back to a vectorized scan.
+"""
+import numpy as np
+import pandas as pd
+
+DEFAULT_LIMIT = 20
+BUILD_CHUNK = 100000
+
+
+def _codepoints(texts):
+    # Fixed-width unicode array viewed as one uint32 codepoint per character,
+    # zero-padded on the right.
+    width = max(max((len(text) for text in texts), default=0), 1)
+    array = np.asarray(texts, dtype=f'<U{width}')
+    return array.view(np.uint32).reshape(len(array), width).astype(np.uint64)
+
+
+def _trigram_keys(codepoints):
+    # Codepoints fit in 21 bits, so three of them pack into one integer key.
+    return (codepoints[:, :-2] << np.uint64(42)) | (codepoints[:, 1:-1] << np.uint64(21)) | codepoints[:, 2:]
+
+
+def _trigram_postings(texts):
+    """
+    Sorted unique trigram keys, the offset of each key's rows and the rows.
+    """
+    keys, rows = [], []
+    for start in range(0, len(texts), BUILD_CHUNK):
+        codepoints = _codepoints(texts[start:start + BUILD_CHUNK])
+        if codepoints.shape[1] < 3:
+            continue
+        grams = _trigram_keys(codepoints)
+        valid = codepoints[:, 2:] != 0
+        chunk_rows = np.broadcast_to(np.arange(start, start + len(codepoints), dtype=np.int32)[:, None], grams.shape)
+        keys.append(grams[valid])
+        rows.append(chunk_rows[valid])
+    if not keys:
+        return np.empty(0, dtype=np.uint64), np.zeros(1, dtype=np.intp), np.empty(0, dtype=np.int32)
+
+    # Rows come out in ascending order, and a stable sort by key keeps them
+    # that way within each key, so duplicates of a (key, row) pair are adjacent.
+    keys, rows = np.concatenate(keys), np.concatenate(rows)
+    order = np.argsort(keys, kind='stable')
+    keys, rows = keys[order], rows[order]
+    keep = np.ones(len(keys), dtype=bool)
+    keep[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+    keys, rows = keys[keep], rows[keep]
+    unique_keys, starts = np.unique(keys, return_index=True)
+    return unique_keys, np.append(starts, len(keys)), rows
+
+
+class SearchIndex:
+    """
+    Substring search over Name and City, returning row positions.
+    """
+
+    def __init__(self, dataframe, name_rank=None):
+        names = dataframe['Name'].astype(str).str.lower().reset_index(drop=True)
+        cities = dataframe['City'].astype(str).str.lower().reset_index(drop=True)
+        self._names = names.to_numpy()
+        self._texts = (names + ' (' + cities + ')')
+        self._gram_keys, self._gram_offsets, self._gram_rows = _trigram_postings(self._texts.tolist())
+        self._name_rank = name_rank if name_rank is not None else np.arange(len(names))
+
+    def __len__(self):
+        return len(self._names)
+
+    def _candidates(self, query):
+        if len(query) < 3:
+            return np.flatnonzero(self._texts.str.contains(query, regex=False).to_numpy())
+        postings = []
+        for key in np.unique(_trigram_keys(_codepoints([query]))[0]):
+            i = np.searchsorted(self._gram_keys, key)
+            if i == len(self._gram_keys) or self._gram_keys[i] != key:
+                return np.empty(0, dtype=np.intp)
+            postings.append(self._gram_rows[self._gram_offsets[i]:self._gram_offsets[i + 1]])
+        postings.sort(key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            candidates = np.intersect1d(candidates, posting, assume_unique=True)
+            if not len(candidates):
+                break
+        candidates = candidates.astype(np.intp)
+        return candidates[self._texts.iloc[candidates].str.contains(query, regex=False).to_numpy()]
+
+    def _by_name(self, positions):
+        return positions[np.argsort(self._name_rank[positions], kind='stable')]
+
+    def name_contains(self, query):
+        """
+        Positions of rows whose Name contains ``query`` (case-insensitive), ordered by Name.
+        """
+        query = query.lower()
+        candidates = self._candidates(query)
+        matches = candidates[pd.Series(self._names[candidates]).str.contains(query, regex=False).to_numpy()]
+        return self._by_name(matches)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """
+        Top ``limit`` positions whose Name or City contains ``query``.
+
+        Names starting with the query rank first, then names with a word
+        starting with it, then any other match; ties are broken by Name.
+        """
+        query = query.lower().strip()
+        if not query:
+            return np.empty(0, dtype=np.intp)
+        matches = self._by_name(self._candidates(query))
+        names = pd.Series(self._names[matches])
+        rank = np.where(names.str.startswith(query), 0, np.where(names.str.contains(f" {query}", regex=False), 1, 2))
+        return matches[np.argsort(rank, kind='stable')][:limit]
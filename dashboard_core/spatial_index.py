@@ -0,0 +1,132 @@
+"""
+Grid index of employee locations for viewport queries on the map.
+
+The world is divided into a fixed lat/lon grid of ``INDEX_CELL_DEGREES``
+cells, the cell size of the map's clustering grid at zoom ``INDEX_ZOOM``.
+Only occupied cells are stored, sorted by cell key, each with its number of
+employees, the sums of their coordinates and its first row id.  Finding the
+cells in a viewport takes one binary search per grid row it spans, and the
+cells of every coarser clustering grid are unions of index cells, so a
+viewport is clustered from its cells without touching individual employees.
+"""
+import numpy as np
+
+from .map_layers import CELL_DEGREES_AT_ZOOM_0
+
+INDEX_ZOOM = 12
+INDEX_CELL_DEGREES = CELL_DEGREES_AT_ZOOM_0 / 2 ** INDEX_ZOOM
+GRID_ROWS = int(180 / INDEX_CELL_DEGREES) + 1
+GRID_COLUMNS = int(360 / INDEX_CELL_DEGREES) + 1
+
+
+def valid_locations(lat, lon):
+    """
+    Mask of the coordinates the index covers: present and within range.
+    """
+    with np.errstate(invalid='ignore'):
+        return (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+
+
+def cell_keys(lat, lon):
+    """
+    Grid cell key of each location; row-major, so keys sort by latitude band.
+    """
+    rows = np.floor((lat + 90) / INDEX_CELL_DEGREES).astype(np.int64)
+    cols = np.floor((lon + 180) / INDEX_CELL_DEGREES).astype(np.int64)
+    return rows * GRID_COLUMNS + cols
+
+
+def _ranges(starts, stops):
+    """
+    Concatenation of ``arange(start, stop)`` for each pair.
+    """
+    lengths = stops - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return offsets + np.arange(lengths.sum())
+
+
+class SpatialIndex:
+    """
+    Occupied grid cells with per-cell counts, coordinate sums and first row id.
+
+    Built from raw points, the index also keeps the row positions ordered by
+    cell, so the employees of any set of cells are read as slices.
+    """
+
+    def __init__(self, keys, count, lat_sum, lon_sum, first, order=None):
+        self.keys = np.asarray(keys, dtype=np.int64)
+        self.count = np.asarray(count, dtype=np.int64)
+        self.lat_sum = np.asarray(lat_sum, dtype=float)
+        self.lon_sum = np.asarray(lon_sum, dtype=float)
+        self.first = np.asarray(first, dtype=np.int64)
+        self.order = order
+        self._starts = np.concatenate([[0], np.cumsum(self.count)[:-1]]) if order is not None else None
+
+    @classmethod
+    def from_points(cls, lat, lon):
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        positions = np.flatnonzero(valid_locations(lat, lon))
+        keys = cell_keys(lat[positions], lon[positions])
+        # A stable sort keeps positions ascending within each cell.
+        by_cell = np.argsort(keys, kind='stable')
+        order, keys = positions[by_cell], keys[by_cell]
+        cells, starts, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        return cls(cells, np.bincount(inverse), np.bincount(inverse, weights=lat[order]),
+                   np.bincount(inverse, weights=lon[order]), order[starts], order)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def visible(self, boxes=None):
+        """
+        Indices of the cells overlapping any of ``boxes``, each a
+        ``(south, west, north, east)`` tuple in degrees; every cell when None.
+        """
+        if boxes is None:
+            return np.arange(len(self.keys))
+        found = []
+        for south, west, north, east in boxes:
+            first_row, last_row = (int(np.clip(np.floor((value + 90) / INDEX_CELL_DEGREES), 0, GRID_ROWS - 1))
+                                   for value in (south, north))
+            first_col, last_col = (int(np.clip(np.floor((value + 180) / INDEX_CELL_DEGREES), 0, GRID_COLUMNS - 1))
+                                   for value in (west, east))
+            rows = np.arange(first_row, last_row + 1, dtype=np.int64) * GRID_COLUMNS
+            found.append(_ranges(np.searchsorted(self.keys, rows + first_col),
+                                 np.searchsorted(self.keys, rows + last_col + 1)))
+        return np.unique(np.concatenate(found)) if len(found) > 1 else found[0]
+
+    def size(self, cells):
+        return int(self.count[cells].sum())
+
+    def positions(self, cells):
+        """
+        Row positions of the employees in ``cells``; only for indexes built
+        from points.
+        """
+        starts = self._starts[cells]
+        return self.order[_ranges(starts, starts + self.count[cells])]
+
+    def clusters(self, cells, zoom, max_clusters):
+        """
+        Merge ``cells`` into the clustering grid of ``zoom``, coarsened until at
+        most ``max_clusters`` remain.
+
+        Returns the mean ``lat``/``lon``, ``count`` and ``first`` row id of each
+        cluster; ``first`` identifies the employee of a single-employee cluster.
+        """
+        rows, cols = np.divmod(self.keys[cells], GRID_COLUMNS)
+        shift = INDEX_ZOOM - min(max(int(round(zoom)), 0), INDEX_ZOOM)
+        while True:
+            merged = (rows >> shift) * GRID_COLUMNS + (cols >> shift)
+            groups, first, inverse = np.unique(merged, return_index=True, return_inverse=True)
+            if len(groups) <= max_clusters:
+                break
+            shift += 1
+        count = np.bincount(inverse, weights=self.count[cells])
+        return {
+            'lat': np.bincount(inverse, weights=self.lat_sum[cells]) / count,
+            'lon': np.bincount(inverse, weights=self.lon_sum[cells]) / count,
+            'count': count.astype(np.int64),
+            'first': self.first[cells][first]
+        }
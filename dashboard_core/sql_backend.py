@@ -0,0 +1,454 @@
+"""
+Employee data served from an SQLite database instead of an in-memory frame.
+
+Every page query is pushed down to the engine: filters become ``WHERE``
+clauses, sorts ``ORDER BY``, paging ``LIMIT``/``OFFSET``, per-department
+aggregates ``GROUP BY Department`` (quartiles read off an index with
+``OFFSET``), so only the rows a page shows ever leave the database.  The map's
+``SpatialIndex`` is built from one ``GROUP BY`` over an index on the grid cell
+of each location, and the employees of a zoomed-in viewport are read through
+that index too.  Name/City search uses an FTS5 trigram index when the database
+has one, the SQL counterpart of ``SearchIndex``.
+
+Convert a CSV once, then point ``DASHBOARD_DATA_PATH`` at the database:
+
+    python -m dashboard_core data.csv data.db
+
+Connections are read-only and pooled per worker process.  Queries always see
+the live file; the fingerprint follows its modification time, so caches keyed
+on it are dropped when the database is rewritten.
+"""
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+import pandas as pd
+
+from .backend import CHUNK_ROWS, SEARCH_LIMIT, Backend
+from .derived_columns import AGE_BINS, AGE_LABELS
+from .level_of_detail import LOD_BINS
+from .map_layers import marker_layer
+from .memo import Memo, renew_locks_after_fork
+from .salary_stats import SALARY_STATS
+from .spatial_index import GRID_COLUMNS, INDEX_CELL_DEGREES, SpatialIndex
+from .table_query import PAGE_SIZE, filter_sql, quote_identifier, sort_columns
+
+SQLITE_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
+TABLE = 'employees'
+SEARCH_TABLE = 'employee_search'
+POOL_SIZE = int(os.environ.get('DASHBOARD_DB_POOL_SIZE', 8))
+LABEL_SQL = "Name || ' (' || City || ')'"
+
+
+def is_sqlite_path(path):
+    return path.lower().endswith(SQLITE_SUFFIXES)
+
+
+def import_csv(csv_path, db_path):
+    """
+    Write the employee CSV to an SQLite database at ``db_path``.
+
+    Row ids are the CSV's 0-based row numbers.  The database is built next to
+    the target and renamed into place, so a running dashboard never opens a
+    half-written file.
+    """
+    dataframe = pd.read_csv(csv_path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(db_path)), suffix='.db.tmp')
+    os.close(fd)
+    try:
+        with sqlite3.connect(tmp_path) as connection:
+            dataframe.to_sql(TABLE, connection, index=True, index_label='id', if_exists='replace')
+            connection.executescript(f"""
+                CREATE UNIQUE INDEX {TABLE}_id ON {TABLE} (id);
+                CREATE INDEX {TABLE}_name ON {TABLE} (Name, id);
+                CREATE INDEX {TABLE}_department ON {TABLE} (Department, Name, id);
+                CREATE INDEX {TABLE}_department_salary ON {TABLE} (Department, Salary);
+                CREATE INDEX {TABLE}_department_age_salary ON {TABLE} (Department, ({AGE_INTERVAL_SQL}), Salary);
+                CREATE INDEX {TABLE}_cell ON {TABLE} (({CELL_SQL}), lat, lon, id);
+            """)
+            try:
+                connection.execute(f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(label, tokenize='trigram')")
+                connection.execute(f"INSERT INTO {SEARCH_TABLE} (rowid, label) SELECT id, {LABEL_SQL} FROM {TABLE}")
+            except sqlite3.OperationalError:
+                # SQLite without FTS5 trigrams; search falls back to scanning.
+                pass
+            connection.execute("ANALYZE")
+        connection.close()
+        os.replace(tmp_path, db_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class ConnectionPool:
+    """
+    Read-only connections to one database, reused across requests.
+
+    Connections are never shared across a fork: a worker forked from a
+    process that already queried starts with an empty pool of its own.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.uri = f"file:{quote(os.path.abspath(path))}?mode=ro"
+        self.size = size
+        self._idle = []
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        renew_locks_after_fork(self)
+
+    def _renew_locks(self):
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        return sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+    @contextmanager
+    def connection(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._idle, self._pid = [], os.getpid()
+            connection = self._idle.pop() if self._idle else None
+        if connection is None:
+            connection = self._connect()
+        try:
+            yield connection
+        finally:
+            with self._lock:
+                if self._pid == os.getpid() and len(self._idle) < self.size:
+                    self._idle.append(connection)
+                    connection = None
+            if connection is not None:
+                connection.close()
+
+
+def _age_interval_sql():
+    cases = ' '.join(f"WHEN Age >= {low} AND Age < {high} THEN '{label}'"
+                     for low, high, label in zip(AGE_BINS, AGE_BINS[1:], AGE_LABELS))
+    return f"CASE {cases} END"
+
+
+AGE_INTERVAL_SQL = _age_interval_sql()
+# Locations a SpatialIndex covers, and the grid cell of one as computed by
+# spatial_index.cell_keys.  lat + 90 and lon + 180 are never negative there,
+# so truncating to INTEGER floors them.
+LOCATION_SQL = 'lat BETWEEN -90 AND 90 AND lon BETWEEN -180 AND 180'
+CELL_SQL = (f"CAST((lat + 90) / {INDEX_CELL_DEGREES!r} AS INTEGER) * {GRID_COLUMNS} "
+            f"+ CAST((lon + 180) / {INDEX_CELL_DEGREES!r} AS INTEGER)")
+
+
+class SQLiteBackend(Backend):
+    """
+    The dashboard queries, answered by an SQLite database file.
+    """
+
+    def __init__(self, path, pool_size=POOL_SIZE):
+        self.path = path
+        self.pool = ConnectionPool(path, size=pool_size)
+        # (fingerprint, Memo) of the database file as last seen.
+        self._memo = (None, Memo())
+
+    @property
+    def fingerprint(self):
+        parts = []
+        for suffix in ('', '-wal'):
+            try:
+                stat = os.stat(self.path + suffix)
+            except FileNotFoundError:
+                continue
+            parts.append(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+        return 'sqlite-' + '-'.join(parts)
+
+    @property
+    def version(self):
+        return self.fingerprint
+
+    def _memoize(self, key, compute):
+        # A value computed while the file changed lands in the Memo of the
+        # old fingerprint, which is dropped.
+        fingerprint = self.fingerprint
+        memo_fingerprint, memo = self._memo
+        if memo_fingerprint != fingerprint:
+            memo = Memo()
+            self._memo = (fingerprint, memo)
+        return memo.get(key, compute)
+
+    def _frame(self, sql, params=(), index_col=None):
+        with self.pool.connection() as connection:
+            return pd.read_sql_query(sql, connection, params=list(params), index_col=index_col)
+
+    def _rows(self, sql, params=()):
+        with self.pool.connection() as connection:
+            return connection.execute(sql, list(params)).fetchall()
+
+    def __len__(self):
+        return self._memoize('len', lambda: self._rows(f"SELECT COUNT(*) FROM {TABLE}")[0][0])
+
+    def _column_types(self):
+        def load():
+            info = self._rows(f"PRAGMA table_info({TABLE})")
+            return {name: declared.upper() in ('INTEGER', 'REAL') for _, name, declared, *_ in info if name != 'id'}
+        return self._memoize('column_types', load)
+
+    @property
+    def columns(self):
+        return list(self._column_types())
+
+    def _has_search_table(self):
+        return self._memoize('search_table', lambda: bool(self._rows(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", [SEARCH_TABLE])))
+
+    def departments(self):
+        return self._memoize('departments', lambda: [row[0] for row in self._rows(
+            f"SELECT Department FROM {TABLE} WHERE Department IS NOT NULL GROUP BY Department ORDER BY MIN(id)")])
+
+    def _search_condition(self, query, expression):
+        # Trigram matches narrow the candidates through the FTS index; the
+        # substring test then applies the exact, case-insensitive semantics.
+        query = query.lower()
+        condition, params = f"instr(lower({expression}), ?) > 0", [query]
+        if len(query) >= 3 and self._has_search_table():
+            condition = f"id IN (SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH ?) AND " + condition
+            params.insert(0, '"' + query.replace('"', '""') + '"')
+        return condition, params
+
+    def _employee_query(self, department, search, filter_query, sort_by):
+        """
+        SELECT of the employees a table view shows, in its order, and its
+        WHERE clause and parameters.
+        """
+        column_types = self._column_types()
+        clauses, params = [], []
+        if department is not None:
+            clauses.append('Department = ?')
+            params.append(department)
+        if search is not None:
+            condition, search_params = self._search_condition(search, 'Name')
+            clauses.append(condition)
+            params.extend(search_params)
+        condition, filter_params = filter_sql(filter_query, column_types)
+        clauses.append(condition)
+        params.extend(filter_params)
+        where = ' AND '.join(clauses)
+
+        order = [f"{quote_identifier(column)} {'ASC' if ascending else 'DESC'}"
+                 for column, ascending in sort_columns(sort_by, column_types)]
+        columns = ', '.join(quote_identifier(column) for column in column_types)
+        select = f"SELECT id, {columns} FROM {TABLE} WHERE {where} ORDER BY {', '.join(order + ['Name', 'id'])}"
+        return select, where, params
+
+    def employee_page(self, department=None, search=None, filter_query='', sort_by=None,
+                      page_current=0, page_size=PAGE_SIZE):
+        select, where, params = self._employee_query(department, search, filter_query, sort_by)
+        page_size = page_size or PAGE_SIZE
+        page = self._frame(f"{select} LIMIT ? OFFSET ?", params + [page_size, (page_current or 0) * page_size],
+                           index_col='id')
+        row_count = self._rows(f"SELECT COUNT(*) FROM {TABLE} WHERE {where}", params)[0][0]
+        return page, row_count
+
+    def employee_chunks(self, department=None, search=None, filter_query='', sort_by=None, chunk_size=CHUNK_ROWS):
+        # One statement read through the cursor, so the rows come from a
+        # single consistent read and only one chunk is held at a time.  An
+        # empty result still yields one empty frame.
+        select, _, params = self._employee_query(department, search, filter_query, sort_by)
+        with self.pool.connection() as connection:
+            yield from pd.read_sql_query(select, connection, params=params, index_col='id', chunksize=chunk_size)
+
+    def department_size(self, department):
+        return self._rows(f"SELECT COUNT(*) FROM {TABLE} WHERE Department = ?", [department])[0][0]
+
+    def department_employees(self, department, offset=0, limit=None):
+        return self._frame(
+            f"SELECT id, Name, Age, City FROM {TABLE} WHERE Department = ? ORDER BY Name, id LIMIT ? OFFSET ?",
+            [department, -1 if limit is None else limit, offset], index_col='id')
+
+    def _salary_quantiles(self, connection, condition, params, count, quantiles):
+        # Each quantile is read off the (Department, ..., Salary) index with an
+        # OFFSET instead of ranking every row, and interpolated between the two
+        # ranks around it as pandas does.
+        values = []
+        for q in quantiles:
+            position = q * (count - 1)
+            low = int(position)
+            rows = connection.execute(
+                f"SELECT Salary FROM {TABLE} WHERE {condition} AND Salary IS NOT NULL ORDER BY Salary LIMIT 2 OFFSET ?",
+                [*params, low]).fetchall()
+            below = rows[0][0]
+            above = rows[1][0] if len(rows) > 1 else below
+            values.append(below + (position - low) * (above - below))
+        return values
+
+    def _salary_aggregate(self, stat):
+        if stat not in SALARY_STATS:
+            raise ValueError(f"Unknown salary statistic: {stat}")
+        if stat in ('mean', 'sum'):
+            return self._frame(
+                f"SELECT Department, {'AVG' if stat == 'mean' else 'SUM'}(Salary) AS Salary FROM {TABLE} "
+                f"WHERE Department IS NOT NULL GROUP BY Department ORDER BY Department")
+
+        stats = self._frame(f"""
+            SELECT Department, COUNT(Salary) AS count, AVG(Salary) AS mean, SUM(Salary) AS total,
+                   SUM(Salary * Salary) AS squares, MIN(Salary) AS min, MAX(Salary) AS max
+            FROM {TABLE} WHERE Department IS NOT NULL AND Salary IS NOT NULL
+            GROUP BY Department ORDER BY Department
+        """)
+        quantiles = (0.5,) if stat == 'median' else (0.25, 0.5, 0.75)
+        with self.pool.connection() as connection:
+            values = [self._salary_quantiles(connection, 'Department = ?', [department], count, quantiles)
+                      for department, count in zip(stats['Department'], stats['count'])]
+        values = pd.DataFrame(values, columns=['25%', '50%', '75%'] if stat == 'describe' else ['Salary'])
+        if stat == 'median':
+            return pd.concat([stats[['Department']], values], axis=1)
+        # Integer sums are exact in Python, so the variance does not suffer
+        # the cancellation of E[x^2] - E[x]^2 in floating point.
+        rows = zip(stats['count'].tolist(), stats.pop('total').tolist(), stats.pop('squares').tolist())
+        stats.insert(3, 'std', [math.sqrt((n * squares - total * total) / (n * (n - 1))) if n > 1 else float('nan')
+                                for n, total, squares in rows])
+        stats['count'] = stats['count'].astype(float)
+        return pd.concat([stats.drop(columns='max'), values, stats[['max']]], axis=1)
+
+    def salary_aggregate(self, stat):
+        return self._memoize(('salary_aggregate', stat), lambda: self._salary_aggregate(stat))
+
+    def _salary_by_department(self):
+        # Grouped over the (Department, Salary) index alone, then put in order
+        # of first appearance.
+        totals = self._frame(f"SELECT Department, SUM(Salary) AS Salary, COUNT(*) AS Employees FROM {TABLE} "
+                             f"WHERE Department IS NOT NULL GROUP BY Department", index_col='Department')
+        return totals.reindex(self.departments()).rename_axis('Department').reset_index()
+
+    def salary_by_department(self):
+        return self._memoize('salary_by_department', self._salary_by_department)
+
+    def _scatter_3d_bins(self, bins):
+        present = 'Department IS NOT NULL AND Salary IS NOT NULL AND Age IS NOT NULL'
+        bounds = self._rows(f"SELECT MIN(Salary), MAX(Salary), MIN(Age), MAX(Age) FROM {TABLE} WHERE {present}")[0]
+        if bounds[0] is None:
+            return pd.DataFrame(columns=['Department', 'Salary', 'Age', 'Employees'])
+        salary_low, salary_high, age_low, age_high = bounds
+        salary_width = (salary_high - salary_low) / bins or 1.0
+        age_width = (age_high - age_low) / bins or 1.0
+        return self._frame(f"""
+            SELECT Department, AVG(Salary) AS Salary, AVG(Age) AS Age, COUNT(*) AS Employees FROM {TABLE}
+            WHERE {present}
+            GROUP BY Department, MIN(CAST((Salary - ?) / ? AS INTEGER), ?), MIN(CAST((Age - ?) / ? AS INTEGER), ?)
+            ORDER BY MIN(id)
+        """, [salary_low, salary_width, bins - 1, age_low, age_width, bins - 1])
+
+    def scatter_3d_bins(self, bins=LOD_BINS):
+        return self._memoize(('scatter_3d_bins', bins), lambda: self._scatter_3d_bins(bins))
+
+    def _salary_box_stats(self):
+        stats = self._frame(f"""
+            SELECT {AGE_INTERVAL_SQL} AS "Age Interval", Department, COUNT(*) AS count, AVG(Salary) AS mean
+            FROM {TABLE} WHERE Department IS NOT NULL AND Salary IS NOT NULL AND "Age Interval" IS NOT NULL
+            GROUP BY Department, "Age Interval" ORDER BY "Age Interval", Department
+        """)
+        group = f"Department = ? AND {AGE_INTERVAL_SQL} = ?"
+        rows = []
+        with self.pool.connection() as connection:
+            for interval, department, count in zip(stats['Age Interval'], stats['Department'], stats['count']):
+                q1, median, q3 = self._salary_quantiles(
+                    connection, group, [department, interval], count, (0.25, 0.5, 0.75))
+                iqr = q3 - q1
+                # Fences are the most extreme salaries within 1.5 IQR, one
+                # index seek each.
+                lowerfence = connection.execute(
+                    f"SELECT Salary FROM {TABLE} WHERE {group} AND Salary >= ? ORDER BY Salary LIMIT 1",
+                    [department, interval, q1 - 1.5 * iqr]).fetchone()[0]
+                upperfence = connection.execute(
+                    f"SELECT Salary FROM {TABLE} WHERE {group} AND Salary <= ? ORDER BY Salary DESC LIMIT 1",
+                    [department, interval, q3 + 1.5 * iqr]).fetchone()[0]
+                rows.append((q1, median, q3, lowerfence, upperfence))
+        fences = pd.DataFrame(rows, columns=['q1', 'median', 'q3', 'lowerfence', 'upperfence'], dtype=float)
+        stats = pd.concat([stats[['Age Interval', 'Department']], fences[['q1', 'median', 'q3']], stats[['mean']],
+                           fences[['lowerfence', 'upperfence']]], axis=1)
+        stats['Age Interval'] = pd.Categorical(stats['Age Interval'], categories=AGE_LABELS, ordered=True)
+        return stats
+
+    def salary_box_stats(self):
+        return self._memoize('salary_box_stats', self._salary_box_stats)
+
+    def exact_frame(self, columns):
+        column_types = self._column_types()
+        selected = ', '.join(quote_identifier(column) for column in columns if column in column_types)
+        return self._frame(f"SELECT {selected} FROM {TABLE} ORDER BY id")
+
+    def search_employees(self, query, limit=SEARCH_LIMIT):
+        query = query.lower().strip()
+        if not query:
+            return []
+        condition, params = self._search_condition(query, LABEL_SQL)
+        rows = self._rows(f"""
+            SELECT id FROM {TABLE} WHERE {condition}
+            ORDER BY CASE WHEN instr(lower(Name), ?) = 1 THEN 0 WHEN instr(lower(Name), ?) > 0 THEN 1 ELSE 2 END,
+                     Name, id
+            LIMIT ?
+        """, params + [query, ' ' + query, limit])
+        return [row[0] for row in rows]
+
+    def employee_labels(self, ids):
+        ids = list(ids)
+        labels = dict(self._rows(
+            f"SELECT id, {LABEL_SQL} FROM {TABLE} WHERE id IN ({', '.join('?' * len(ids))})", ids)) if ids else {}
+        return [labels.get(row_id) for row_id in ids]
+
+    def employee_location(self, row_id):
+        rows = self._rows(f"SELECT lat, lon FROM {TABLE} WHERE id = ?", [row_id])
+        return (float(rows[0][0]), float(rows[0][1])) if rows else None
+
+    def map_center(self):
+        return self._memoize('map_center', lambda: tuple(
+            float(value) for value in self._rows(f"SELECT AVG(lat), AVG(lon) FROM {TABLE}")[0]))
+
+    def _spatial_index(self):
+        def load():
+            rows = self._rows(f"SELECT {CELL_SQL} AS cell, COUNT(*), SUM(lat), SUM(lon), MIN(id) FROM {TABLE} "
+                              f"WHERE {LOCATION_SQL} GROUP BY cell ORDER BY cell")
+            return SpatialIndex(*(zip(*rows) if rows else ([],) * 5))
+        return self._memoize('spatial_index', load)
+
+    def _map_points(self, cells):
+        keys = self._spatial_index().keys[cells].tolist()
+        rows = self._frame(f"SELECT lat, lon, {LABEL_SQL} AS text FROM {TABLE} "
+                           f"WHERE {CELL_SQL} IN ({', '.join('?' * len(keys))}) AND {LOCATION_SQL}", keys)
+        return rows['lat'].to_numpy(), rows['lon'].to_numpy(), rows['text'].to_numpy()
+
+    def map_layer(self, zoom, viewport=None):
+        if viewport is not None:
+            return marker_layer(self._spatial_index(), zoom, viewport, self._map_points, self.employee_labels)
+        zoom = int(round(zoom))
+        return self._memoize(('map_layer', zoom), lambda: marker_layer(
+            self._spatial_index(), zoom, None, self._map_points, self.employee_labels))
+
+
+class SQLiteSource:
+    """
+    ``DataSource`` counterpart for a database file.
+
+    There is nothing to reload: the backend queries the live file, so the
+    snapshot is the backend itself and watching is a no-op.
+    """
+
+    def __init__(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        self.path = path
+        self._backend = SQLiteBackend(path)
+
+    def snapshot(self):
+        return self._backend
+
+    @property
+    def version(self):
+        return self._backend.version
+
+    def start_watching(self, interval=None):
+        pass
+
+    def stop_watching(self):
+        pass
+
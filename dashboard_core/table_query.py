@@ -0,0 +1,169 @@
+"""
+Server-side filtering, sorting and paging for DataTables in custom mode.
+
+A DataTable with ``filter_action``, ``sort_action`` and ``page_action`` set to
+``'custom'`` sends its ``filter_query``, ``sort_by`` and ``page_current`` props
+to a callback instead of processing rows in the browser.  The helpers here
+translate those props into vectorized pandas masks, or into SQL for the
+database backend, so that only the visible page is serialized back to the
+client.
+"""
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 25
+
+# Longest tokens first so that '>=' is not read as '>' followed by '='.
+OPERATORS = {
+    '>=': 'ge', '<=': 'le', '!=': 'ne', '>': 'gt', '<': 'lt', '=': 'eq',
+    'ge': 'ge', 'le': 'le', 'ne': 'ne', 'gt': 'gt', 'lt': 'lt', 'eq': 'eq',
+    'contains': 'contains', 'datestartswith': 'datestartswith',
+    'is blank': 'blank',
+}
+
+_TERM_RE = re.compile(
+    r'^\{(?P<column>[^}]+)\}\s*'
+    r'(?P<case>[is]?)(?P<op>' + '|'.join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True)) + r')'
+    r'(?:\s+|(?=["\'\d-])|$)(?P<value>.*)$'
+)
+
+
+def parse_filter_query(filter_query):
+    """
+    Split a DataTable filter expression into (column, operator, value, case_sensitive) terms.
+
+    Terms that cannot be parsed are skipped, mirroring how the native filter
+    ignores incomplete input while the user is still typing.
+    """
+    terms = []
+    for part in (filter_query or '').split(' && '):
+        match = _TERM_RE.match(part.strip())
+        if not match:
+            continue
+        value = match.group('value').strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'", '`'):
+            value = value[1:-1]
+        terms.append((match.group('column'), OPERATORS[match.group('op')], value, match.group('case') != 'i'))
+    return terms
+
+
+def _coerce_value(series, value):
+    if pd.api.types.is_numeric_dtype(series):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return value
+
+
+def _evaluate(series, predicate):
+    # Categorical columns are tested once per category and the result is
+    # broadcast through the codes, instead of once per row.
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        hits = np.asarray(predicate(pd.Series(series.cat.categories)), dtype=bool)
+        codes = series.cat.codes.to_numpy()
+        return pd.Series(np.where(codes >= 0, hits[codes], False), index=series.index)
+    return predicate(series)
+
+
+def filter_mask(dataframe, filter_query):
+    """
+    Build a boolean mask selecting the rows matched by ``filter_query``.
+    """
+    mask = pd.Series(True, index=dataframe.index)
+    for column, op, value, case_sensitive in parse_filter_query(filter_query):
+        if column not in dataframe.columns:
+            continue
+        series = dataframe[column]
+        if op == 'blank':
+            mask &= series.isna() | (series.astype(str).str.strip() == '')
+        elif op == 'contains':
+            mask &= _evaluate(
+                series, lambda s: s.astype(str).str.contains(value, case=case_sensitive, regex=False, na=False))
+        elif op == 'datestartswith':
+            prefix = value if case_sensitive else value.lower()
+            mask &= _evaluate(series, lambda s: (
+                s.astype(str) if case_sensitive else s.astype(str).str.lower()).str.startswith(prefix, na=False))
+        else:
+            coerced = _coerce_value(series, value)
+            if coerced is None:
+                mask &= False
+                continue
+            if not case_sensitive and isinstance(coerced, str):
+                coerced = coerced.lower()
+                mask &= _evaluate(series, lambda s: getattr(s.astype(str).str.lower(), op)(coerced))
+            else:
+                mask &= _evaluate(series, lambda s: getattr(s, op)(coerced))
+    return mask
+
+
+def sort_columns(sort_by, columns):
+    """
+    ``(column, ascending)`` pairs of a DataTable ``sort_by`` prop, keeping
+    only known columns.
+    """
+    return [(s['column_id'], s['direction'] == 'asc') for s in (sort_by or []) if s['column_id'] in columns]
+
+
+def page_count(row_count, page_size=PAGE_SIZE):
+    return max(1, math.ceil(row_count / (page_size or PAGE_SIZE)))
+
+
+def query_positions(dataframe, positions, filter_query='', sort_by=None):
+    """
+    Narrow row ``positions`` of ``dataframe`` to those matched by
+    ``filter_query`` and order them by ``sort_by``.
+
+    Sorting is stable, so rows that tie keep the order of ``positions``.
+    """
+    if filter_query:
+        positions = positions[filter_mask(dataframe.iloc[positions], filter_query).to_numpy()]
+    sort = sort_columns(sort_by, dataframe.columns)
+    if sort:
+        keys = dataframe.iloc[positions][[column for column, _ in sort]].reset_index(drop=True)
+        order = keys.sort_values([column for column, _ in sort], ascending=[asc for _, asc in sort], kind='mergesort')
+        positions = positions[order.index.to_numpy()]
+    return positions
+
+
+def quote_identifier(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def filter_sql(filter_query, numeric_columns):
+    """
+    Translate ``filter_query`` into an SQL condition and its parameters.
+
+    ``numeric_columns`` maps every queryable column to whether it is numeric;
+    terms on other columns are skipped, as ``filter_mask`` does, so column
+    names never reach the SQL unchecked.
+    """
+    clauses, params = [], []
+    comparisons = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+    for column, op, value, case_sensitive in parse_filter_query(filter_query):
+        if column not in numeric_columns:
+            continue
+        target = quote_identifier(column)
+        text = f"CAST({target} AS TEXT)" if case_sensitive else f"lower(CAST({target} AS TEXT))"
+        if op == 'blank':
+            clauses.append(f"({target} IS NULL OR trim(CAST({target} AS TEXT)) = '')")
+        elif op == 'contains':
+            clauses.append(f"instr({text}, ?) > 0")
+            params.append(value if case_sensitive else value.lower())
+        elif op == 'datestartswith':
+            clauses.append(f"instr({text}, ?) = 1")
+            params.append(value if case_sensitive else value.lower())
+        elif numeric_columns[column]:
+            try:
+                params.append(float(value))
+            except ValueError:
+                clauses.append('0')
+                continue
+            clauses.append(f"{target} {comparisons[op]} ?")
+        else:
+            clauses.append(f"{target if case_sensitive else text} {comparisons[op]} ?")
+            params.append(value if case_sensitive else value.lower())
+    return ' AND '.join(clauses) or '1', params
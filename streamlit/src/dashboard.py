@@ -1,9 +1,19 @@
+import os
+import sys
+from functools import partial
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from streamlit_tree_select import tree_select
 
+# The shared dashboard_core package lives at the repository root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from dashboard_core import Dataset, SQLiteBackend, open_data_source
+from dashboard_core.export import EXPORT_FORMATS, ExportCache, available_formats, export_filename
+from dashboard_core.figures import base_map_figure, salary_bar_figure, salary_box_figure, salary_scatter_3d_figure
+from dashboard_core.level_of_detail import use_aggregates
+from dashboard_core.map_layers import MAX_MARKERS, viewport_around
+from dashboard_core.table_query import PAGE_SIZE, page_count
+
 # Set page configuration as the first Streamlit command
 st.set_page_config(page_title="Streamlit Dashboard", layout="wide")
 
@@ -14,13 +24,31 @@ def local_css(file_name):
 
 
 # Load sample data
-@st.cache_data
-def load_data():
+@st.cache_resource
+def data_source():
     """
-    Load data from CSV file and cache it for performance.
+    Load data through the memory-mapped Arrow cache of the CSV file and
+    reload it in the background when the file changes, or query an SQLite
+    database in place when DASHBOARD_DATA_PATH points at one.
+
+    Cached as a resource so every session shares the same memory-mapped frame
+    instead of receiving a pickled copy of it; callers must not mutate it.
     """
-    data = pd.read_csv('data.csv')
-    return data
+    source = open_data_source(os.environ.get('DASHBOARD_DATA_PATH', 'data.csv'))
+    source.start_watching()
+    return source
+
+
+# Derived views, tables and figures are cached per dataset and shared between
+# sessions without copying, so callers must not mutate them.  A backend is
+# hashed by its fingerprint alone, so keys cost nothing to compute however
+# large the data is.  Each helper keeps at most CACHE_ENTRIES
+# results, least recently used evicted first.
+CACHE_ENTRIES = int(os.environ.get('DASHBOARD_CACHE_ENTRIES', 64))
+cache_derived = st.cache_resource(max_entries=CACHE_ENTRIES, hash_funcs={
+    Dataset: lambda dataset: dataset.fingerprint,
+    SQLiteBackend: lambda dataset: dataset.fingerprint
+})
 
 
 def render_html_table(dataframe):
@@ -29,6 +57,65 @@ def render_html_table(dataframe):
     """
     return dataframe.to_html(classes='custom-table', index=False, escape=False)
 
+
+# Tables show one page of rows at a time; filtering, sorting and paging run
+# here, so only the visible rows are rendered and sent to the browser.
+PAGE_SIZES = (PAGE_SIZE, 50, 100)
+FILTER_PLACEHOLDER = '{Salary} > 50000 && {City} contains "New"'
+
+
+@cache_derived
+def table_page(dataset, department, search, filter_query, sort_column, descending, page, page_size):
+    """
+    One page of a table view after filtering and sorting, and the number of
+    matching rows.  Views start sorted by Name and sorting is stable, so ties
+    stay in Name order.
+    """
+    sort_by = [{'column_id': sort_column, 'direction': 'desc' if descending else 'asc'}]
+    frame, row_count = dataset.employee_page(department, search, filter_query, sort_by, page - 1, page_size)
+    return render_html_table(frame), row_count
+
+
+def paged_table(dataset, key, department=None, search=None):
+    """
+    Render employees as a styled HTML table one page at a time, with
+    server-side filter, sort and paging controls.
+    """
+    controls = st.columns([4, 2, 1, 1])
+    filter_query = controls[0].text_input("Filter", key=f"{key}-filter", placeholder=FILTER_PLACEHOLDER)
+    sort_column = controls[1].selectbox("Sort by", dataset.columns, key=f"{key}-sort")
+    descending = controls[2].checkbox("Descending", key=f"{key}-descending")
+    page_size = controls[3].selectbox("Rows", PAGE_SIZES, key=f"{key}-size")
+
+    query = (department, search, filter_query.strip(), sort_column, descending)
+
+    # Go back to the first page whenever the rows shown change, and never
+    # past the last one.  The page widget is created below, so its state can
+    # still be set here.
+    page_key = f"{key}-page"
+    previous = st.session_state.get(f"{key}-query")
+    if previous != query:
+        st.session_state[f"{key}-query"] = query
+        st.session_state[page_key] = 1
+        if previous is not None:
+            # Reports export the table the user last changed.
+            st.session_state.setdefault('report', {})['query'] = {
+                'department': department, 'search': search, 'filter_query': query[2],
+                'sort_by': [{'column_id': sort_column, 'direction': 'desc' if descending else 'asc'}]
+            }
+    page = st.session_state.get(page_key, 1)
+    html, row_count = table_page(dataset, *query, page, page_size)
+    pages = page_count(row_count, page_size)
+    if page > pages:
+        page = pages
+        html, row_count = table_page(dataset, *query, page, page_size)
+    st.session_state[page_key] = page
+
+    st.markdown(html, unsafe_allow_html=True)
+    pager = st.columns([1, 4])
+    pager[0].number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
+    pager[1].caption(f"{row_count:,} employees, page {page} of {pages}")
+
 def show_overview():
     st.title("Overview")
     st.write("Welcome to the Streamlit Dashboard Example!")
@@ -36,100 +123,168 @@ def show_overview():
     st.markdown("***")
     st.write("© 2024 Redhat Dashboard Example")
 
-def show_employee_data(data):
-    """
-    Display the employee data section of the dashboard.
-    """
-    st.title("Employee Data")
-
+# Each section of the Employee Data and Statistics pages is a fragment: a
+# widget inside one reruns only that section, so a search keystroke does not
+# re-send the department or raw data tables and a statistic switch does not
+# re-send the charts.
+@st.fragment
+def department_section(dataset):
     # Dropdown for selecting department, narrower width
-    departments = data['Department'].unique()
-    selected_department = st.selectbox("Select Department", departments)
-
-    # Filter data based on the selected department
-    filtered_data = data[data['Department'] == selected_department].sort_values(by='Name')
+    selected_department = st.selectbox("Select Department", dataset.departments())
 
-    # Display a table with the filtered data
+    # Display a table with the data of the selected department
     st.subheader("Filtered Employee Data")
-    st.markdown(render_html_table(filtered_data), unsafe_allow_html=True)
+    paged_table(dataset, 'department-table', department=selected_department)
 
+
+@st.fragment
+def search_section(dataset):
     # Search functionality for the table
     search_term = st.text_input("Search by Name")
     if search_term:
-        search_results = data[data['Name'].str.contains(search_term, case=False)].sort_values(by='Name')
-        st.markdown(render_html_table(search_results), unsafe_allow_html=True)
+        paged_table(dataset, 'search-table', search=search_term)
+
 
+@st.fragment
+def raw_data_section(dataset):
     # Checkbox for showing/hiding the raw data table, selected by default
     if st.checkbox("Show Raw Data", value=True):
         st.subheader("Raw Data")
-        st.markdown(render_html_table(data.sort_values(by='Name')), unsafe_allow_html=True)
+        paged_table(dataset, 'raw-table')
+
 
-def show_statistics(data):
+def show_employee_data(dataset):
     """
-    Display the statistics section of the dashboard.
+    Display the employee data section of the dashboard.
     """
-    st.title("Statistics")
+    st.title("Employee Data")
+    department_section(dataset)
+    search_section(dataset)
+    raw_data_section(dataset)
+
+
+@cache_derived
+def salary_figures(dataset, aggregate):
+    return (
+        salary_bar_figure(dataset, aggregate, barmode='group', title='Salary Distribution by Department'),
+        salary_scatter_3d_figure(dataset, aggregate, title='3D Salary Distribution by Department and Age')
+    )
+
+
+@cache_derived
+def salary_age_figure(dataset):
+    return salary_box_figure(dataset, title='Salary by Age Intervals Cross Departments')
+
+
+@cache_derived
+def summary_table_html(dataset, stat):
+    """
+    HTML table of a per-department Salary statistic: 'describe', 'mean', 'median' or 'sum'.
+    """
+    return render_html_table(dataset.salary_aggregate(stat))
+
+
+@st.fragment
+def charts_section(dataset):
+    exact = st.checkbox("Exact mode (plot every employee)", value=False)
+    fig_2d, fig_3d = salary_figures(dataset, use_aggregates(dataset, exact))
 
     # Display a 2D graph
     st.subheader("Salary Distribution")
-    fig_2d = px.bar(data, x='Department', y='Salary', color='Department', barmode='group', title='Salary Distribution by Department')
     st.plotly_chart(fig_2d, use_container_width=True)
 
     # Display a 3D graph
     st.subheader("3D Salary Distribution")
-    fig_3d = px.scatter_3d(data, x='Department', y='Salary', z='Age', color='Department', title='3D Salary Distribution by Department and Age')
     st.plotly_chart(fig_3d, use_container_width=True)
 
     # Salary by Age Intervals Cross Departments
     st.subheader("Salary by Age Intervals (10 years) Cross Departments")
-    bins = [20, 30, 40, 50, 60]
-    labels = ["20-30", "30-40", "40-50", "50-60"]
-    data['Age Interval'] = pd.cut(data['Age'], bins=bins, labels=labels, right=False)
-    data['Age Interval'] = pd.Categorical(data['Age Interval'], categories=labels, ordered=True)
-    data = data.sort_values('Age Interval')  # Ensure data is sorted by Age Interval
-    fig_age_salary = px.box(data, x='Age Interval', y='Salary', color='Department', title='Salary by Age Intervals Cross Departments')
-    st.plotly_chart(fig_age_salary, use_container_width=True)
+    st.plotly_chart(salary_age_figure(dataset), use_container_width=True)
 
-    # Display a summary statistics table
-    st.subheader("Summary Statistics")
-    summary_stats = data.groupby('Department')['Salary'].describe().reset_index().sort_values(by='Department')
-    st.markdown(render_html_table(summary_stats), unsafe_allow_html=True)
 
+@st.fragment
+def summary_statistic_section(dataset):
     # Radio buttons for selecting a summary statistic
     stat = st.radio("Summary Statistic", ('Mean', 'Median', 'Sum'))
-    if stat == 'Mean':
-        summary_mean = data.groupby('Department')['Salary'].mean().reset_index().sort_values(by='Department')
-        st.markdown(render_html_table(summary_mean), unsafe_allow_html=True)
-    elif stat == 'Median':
-        summary_median = data.groupby('Department')['Salary'].median().reset_index().sort_values(by='Department')
-        st.markdown(render_html_table(summary_median), unsafe_allow_html=True)
-    else:
-        summary_sum = data.groupby('Department')['Salary'].sum().reset_index().sort_values(by='Department')
-        st.markdown(render_html_table(summary_sum), unsafe_allow_html=True)
-
-def show_department_tree_view(data):
+    st.markdown(summary_table_html(dataset, stat.lower()), unsafe_allow_html=True)
+
+
+def show_statistics(dataset):
+    """
+    Display the statistics section of the dashboard.
+    """
+    st.title("Statistics")
+    charts_section(dataset)
+
+    # Display a summary statistics table
+    st.subheader("Summary Statistics")
+    st.markdown(summary_table_html(dataset, 'describe'), unsafe_allow_html=True)
+
+    summary_statistic_section(dataset)
+
+# Employees are added to an expanded department in chunks of this size
+TREE_PAGE_SIZE = 50
+
+
+def employee_nodes(dept_data):
+    """
+    Build tree nodes for a slice of employees from its column arrays.
+    """
+    names = dept_data['Name'].astype(str).tolist()
+    ages = dept_data['Age'].tolist()
+    cities = dept_data['City'].astype(str).tolist()
+    # Create a node for each employee with subnodes for details
+    return [
+        {
+            "label": f"Employee: {name}",
+            "value": name,
+            "children": [
+                {"label": f"Age: {age}", "value": f"age-{name}"},
+                {"label": f"City: {city}", "value": f"city-{name}"}
+            ]
+        }
+        for name, age, city in zip(names, ages, cities)
+    ]
+
+
+@cache_derived
+def department_nodes(dataset, dept, shown):
+    """
+    Tree nodes for the first ``shown`` employees of a department, by Name.
+    """
+    return employee_nodes(dataset.department_employees(dept, limit=shown))
+
+
+def show_more_employees(dept):
+    pages = st.session_state.setdefault('tree_pages', {})
+    pages[dept] = pages.get(dept, 1) + 1
+
+
+def show_department_tree_view(dataset):
     """
     Display the department tree view section of the dashboard.
+
+    Departments start collapsed with a placeholder child; employees are only
+    built for departments the user has expanded, one page at a time.
     """
     st.title("Department Tree View")
 
-    # Create nodes for each department with children for each employee
-    # and further children for employee details like Age and City.
+    # The component's value from the previous interaction tells us which
+    # departments are expanded before it is rendered again.
+    expanded = (st.session_state.get('dept_tree') or {}).get('expanded') or []
+    pages = st.session_state.setdefault('tree_pages', {})
+
     nodes = []
-    for dept in data['Department'].unique():
-        dept_data = data[data['Department'] == dept].sort_values(by='Name')
-        children = []
-        for _, row in dept_data.iterrows():
-            # Create a node for each employee with subnodes for details
-            employee_details = [
-                {"label": f"Age: {row['Age']}", "value": f"age-{row['Name']}"},
-                {"label": f"City: {row['City']}", "value": f"city-{row['Name']}"}
-            ]
-            children.append({
-                "label": f"Employee: {row['Name']}",
-                "value": row['Name'],
-                "children": employee_details
-            })
+    partially_loaded = []
+    for dept in dataset.departments():
+        if dept in expanded:
+            total = dataset.department_size(dept)
+            shown = pages.get(dept, 1) * TREE_PAGE_SIZE
+            children = department_nodes(dataset, dept, shown)
+            if shown < total:
+                partially_loaded.append((dept, shown, total))
+        else:
+            children = [{"label": "Loading...", "value": f"placeholder-{dept}", "showCheckbox": False}]
 
         nodes.append({
             "label": f"Department: {dept}",
@@ -140,73 +295,112 @@ def show_department_tree_view(data):
     # Display tree select without multiselect option
     selected_nodes = tree_select(
         nodes,
+        expanded=expanded,
         key='dept_tree'
     )
+    for dept, shown, total in partially_loaded:
+        st.button(f"Show more of {dept} ({shown} of {total})", key=f"more-{dept}",
+                  on_click=show_more_employees, args=(dept,))
     st.write("Selected node(s):", selected_nodes)
 
-def show_interactive_map(data):
+# Employees offered for a map search, best matches first.
+EMPLOYEE_OPTIONS_LIMIT = 20
+
+
+@cache_derived
+def map_options(dataset, search_term):
+    """
+    Row ids of the employees matching ``search_term`` and their "Name (City)" labels.
+    """
+    ids = dataset.search_employees(search_term, limit=EMPLOYEE_OPTIONS_LIMIT)
+    return ids, dict(zip(ids, dataset.employee_labels(ids)))
+
+
+# Zoom level the Streamlit map opens at; its employee layer is clustered for it.
+MAP_ZOOM = 5
+# Zoom level the map moves to around a selected employee.
+SELECTED_ZOOM = 6
+
+
+@cache_derived
+def map_figure_dict(dataset):
+    """
+    The base map as a figure dict; each rerun only sets its center and
+    selection highlight on a shallow copy.
+    """
+    return base_map_figure(dataset, MAP_ZOOM).to_dict()
+
+
+@cache_derived
+def selection_marker_layer(dataset, lat, lon):
+    """
+    Marker trace properties for the viewport around a selected location.
+    """
+    layer = dataset.map_layer(SELECTED_ZOOM, viewport_around(lat, lon, SELECTED_ZOOM))
+    return {key: value.tolist() if hasattr(value, 'tolist') else value for key, value in layer.items()}
+
+
+def show_interactive_map(dataset):
     """
     Display the interactive map page with employee locations.
     """
     st.title("Interactive Map")
     st.write("This page displays an interactive map with employee locations.")
 
-    # Extract latitude and longitude data
-    map_data = data[['lat', 'lon', 'City', 'Name', 'Department']]
-
-    # Reorder columns for display and sort the data by employee name
-    display_data = map_data[['Name', 'Department', 'City', 'lat', 'lon']].sort_values(by='Name')
-    
+    # Only the matches of a search are offered, so the page does not carry
+    # the whole roster.
     st.write("Employee Locations:")
-    selected_employee = st.selectbox("Select an Employee", display_data['Name'].unique(), format_func=lambda x: f"{x} ({display_data.loc[display_data['Name'] == x, 'City'].values[0]})")
+    search_term = st.text_input("Search for an Employee by name or city")
+    option_ids, option_labels = map_options(dataset, search_term) if search_term else ([], {})
+    selected_employee = st.selectbox("Select an Employee", option_ids, format_func=option_labels.get)
 
     # Process click on dataframe row
-    if selected_employee:
-        selected_row = display_data[display_data['Name'] == selected_employee].iloc[0]
-        selected_lat = selected_row['lat']
-        selected_lon = selected_row['lon']
-        st.session_state['selected_lat'] = selected_lat
-        st.session_state['selected_lon'] = selected_lon
-
-    # Create Plotly figure
-    fig = go.Figure(go.Scattermapbox(
-        lat=map_data['lat'],
-        lon=map_data['lon'],
-        mode='markers',
-        marker=go.scattermapbox.Marker(size=9),
-        text=map_data.apply(lambda row: f"{row['Name']} ({row['City']})", axis=1)
-    ))
-
-    fig.update_layout(
-        mapbox=dict(
-            center=dict(
-                lat=st.session_state.get('selected_lat', map_data['lat'].mean()),
-                lon=st.session_state.get('selected_lon', map_data['lon'].mean())
-            ),
-            zoom=5,
-            style="open-street-map"
-        ),
-        margin={"r":0,"t":0,"l":0,"b":0}
-    )
-
-    # Highlight selected location
+    location = dataset.employee_location(selected_employee) if selected_employee is not None else None
+    if location is not None:
+        st.session_state['selected_lat'], st.session_state['selected_lon'] = location
+
+    base = map_figure_dict(dataset)
+    center = base['layout']['mapbox']['center']
+    fig = {
+        'data': list(base['data']),
+        'layout': {**base['layout'], 'mapbox': {**base['layout']['mapbox'], 'center': dict(
+            lat=float(st.session_state.get('selected_lat', center['lat'])),
+            lon=float(st.session_state.get('selected_lon', center['lon']))
+        )}}
+    }
+
+    # Highlight selected location in the base figure's highlight trace
     if 'selected_lat' in st.session_state and 'selected_lon' in st.session_state:
-        fig.add_trace(go.Scattermapbox(
-            lat=[st.session_state['selected_lat']],
-            lon=[st.session_state['selected_lon']],
-            mode='markers+text',
-            marker=dict(size=12, color='red'),
-            text=["Selected Location"],
-            textposition="top right"
-        ))
+        lat, lon = st.session_state['selected_lat'], st.session_state['selected_lon']
+        fig['data'][1] = {**fig['data'][1], 'lat': [lat], 'lon': [lon]}
+        # Streamlit reports no pan or zoom, so the map zooms in on the
+        # selection and only the employees around it are sent.
+        if len(dataset) > MAX_MARKERS:
+            layer = selection_marker_layer(dataset, lat, lon)
+            fig['data'][0] = {**fig['data'][0], 'lat': layer['lat'], 'lon': layer['lon'], 'text': layer['text'],
+                              'marker': {**fig['data'][0]['marker'], 'size': layer['size']}}
+            fig['layout']['mapbox']['zoom'] = SELECTED_ZOOM
 
     # Display map with Streamlit
     st.plotly_chart(fig, use_container_width=True)
 
 
+@st.cache_resource
+def export_cache():
+    return ExportCache()
+
+
+def report_file(cache, dataset, fmt, report):
+    """
+    Contents of the report export for the table query in ``report``.
+    """
+    with open(cache.export(dataset, fmt, report.get('query')), 'rb') as f:
+        return f.read()
+
+
 # Main content based on sidebar selection
 local_css("styles.css")
-data = load_data()
+dataset = data_source().snapshot()
 st.sidebar.image("logo.png", width=100)
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to", ["Overview", "Employee Data", "Statistics", "Department Tree View", "Interactive Map"])
@@ -214,22 +408,32 @@ page = st.sidebar.radio("Go to", ["Overview", "Employee Data", "Statistics", "De
 if page == "Overview":
     show_overview()
 elif page == "Employee Data":
-    show_employee_data(data)
+    show_employee_data(dataset)
 elif page == "Statistics":
-    show_statistics(data)
+    show_statistics(dataset)
 elif page == "Department Tree View":
-    show_department_tree_view(data)
+    show_department_tree_view(dataset)
 elif page == "Interactive Map":
-    show_interactive_map(data)
+    show_interactive_map(dataset)
 
 # Add some useful links
 st.sidebar.markdown("[Streamlit Documentation](https://docs.streamlit.io)")
 st.sidebar.markdown("[Dash and Plotly Documentation](https://plotly.com/python/)")
 st.sidebar.markdown("[React Documentation](https://react.dev/)")
 
-# Button for downloading a document (dummy action)
-if st.sidebar.button("Download Reports"):
-    st.sidebar.success("Reports were downloaded successfully!")
+# Reports are written when the button is clicked, outside the script run, and
+# kept on disk per data version, table query and format, so a repeat download
+# is read straight back.  The report dict is the session's own, so the query a
+# table fragment stores in it after this sidebar was drawn is still used.
+report_format = st.sidebar.selectbox("Report format", available_formats(),
+                                     format_func=lambda fmt: EXPORT_FORMATS[fmt][0])
+st.sidebar.download_button(
+    "Download Reports",
+    data=partial(report_file, export_cache(), dataset, report_format, st.session_state.setdefault('report', {})),
+    file_name=export_filename(report_format),
+    mime=EXPORT_FORMATS[report_format][1],
+    on_click='ignore'
+)
 
 # Run this with `streamlit run dashboard.py`
 
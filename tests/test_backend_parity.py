@@ -0,0 +1,17 @@
+"""
+The SQLite backend answers every query as the in-memory ``Dataset`` does;
+see ``benchmarks/check_backend_parity.py``, which runs the same check on
+larger rosters.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'benchmarks')))
+
+from check_backend_parity import check  # noqa: E402
+
+
+def test_sqlite_backend_matches_dataset(tmp_path):
+    count, found = check(3000, str(tmp_path))
+    assert count > 1000
+    assert found == []
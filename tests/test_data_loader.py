@@ -0,0 +1,116 @@
+"""
+The memory-mapped Arrow IPC cache behind ``load_frame``: served while it
+matches the CSV, rebuilt when it does not.
+"""
+import os
+import shutil
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dashboard_core import data_loader  # noqa: E402
+from dashboard_core.data_loader import cache_path_for, load_frame  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'dash', 'data.csv')
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    shutil.copy(DATA_PATH, path)
+    load_frame(path)
+    return path
+
+
+@pytest.fixture
+def expected(csv_path):
+    return data_loader.read_csv_compact(csv_path)
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """
+    The CSVs parsed by ``load_frame`` from here on, i.e. its cache misses.
+    """
+    parsed = []
+    original = data_loader.read_csv_compact
+
+    def read_csv_compact(path):
+        parsed.append(path)
+        return original(path)
+
+    monkeypatch.setattr(data_loader, 'read_csv_compact', read_csv_compact)
+    return parsed
+
+
+def replace_text(path, old, new, keep_mtime=False):
+    stat = os.stat(path)
+    with open(path) as f:
+        text = f.read()
+    with open(path, 'w') as f:
+        f.write(text.replace(old, new, 1))
+    if keep_mtime:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    else:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def test_cache_is_served_while_the_csv_is_unchanged(csv_path, expected, parses):
+    assert load_frame(csv_path).equals(expected)
+    assert parses == []
+
+
+def test_modification_time_change_rebuilds(csv_path, parses):
+    # Same size, different content and a new mtime.
+    replace_text(csv_path, '83827', '83828')
+    assert load_frame(csv_path).loc[0, 'Salary'] == 83828
+    assert parses == [csv_path]
+    assert load_frame(csv_path).loc[0, 'Salary'] == 83828
+    assert parses == [csv_path]
+
+
+def test_size_change_rebuilds(csv_path, parses):
+    replace_text(csv_path, '83827', '183827', keep_mtime=True)
+    assert load_frame(csv_path).loc[0, 'Salary'] == 183827
+    assert parses == [csv_path]
+
+
+def test_verify_catches_content_changes_with_the_same_mtime_and_size(csv_path, parses):
+    replace_text(csv_path, '83827', '83828', keep_mtime=True)
+    assert load_frame(csv_path).loc[0, 'Salary'] == 83827
+    assert load_frame(csv_path, verify=True).loc[0, 'Salary'] == 83828
+    assert parses == [csv_path]
+
+
+def test_cache_of_another_csv_is_rebuilt(csv_path, tmp_path, expected, parses):
+    other = str(tmp_path / 'other.csv')
+    with open(DATA_PATH) as f:
+        lines = f.readlines()
+    with open(other, 'w') as f:
+        f.writelines(lines[:10])
+    load_frame(other)
+    shutil.copy(cache_path_for(other), cache_path_for(csv_path))
+
+    assert load_frame(csv_path).equals(expected)
+    assert parses == [other, csv_path]
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: b'',
+    lambda data: data[:len(data) // 2],
+    lambda data: b'not an arrow file' * 100,
+], ids=['empty', 'truncated', 'garbage'])
+def test_corrupt_cache_is_rebuilt(csv_path, expected, parses, corrupt):
+    cache_path = cache_path_for(csv_path)
+    with open(cache_path, 'rb') as f:
+        data = f.read()
+    with open(cache_path, 'wb') as f:
+        f.write(corrupt(data))
+
+    assert load_frame(csv_path).equals(expected)
+    assert parses == [csv_path]
+    # The rebuilt cache is served from then on.
+    load_frame(csv_path)
+    assert parses == [csv_path]
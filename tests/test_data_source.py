@@ -0,0 +1,144 @@
+"""
+Reloading the roster and swapping the new snapshot in.
+"""
+import os
+import shutil
+import sys
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dashboard_core.data_source import DataSource  # noqa: E402
+from dashboard_core.delta import append_delta  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'dash', 'data.csv')
+WATCH_INTERVAL = 0.02
+WATCH_TIMEOUT = 10
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    shutil.copy(DATA_PATH, path)
+    source = DataSource(path)
+    yield source
+    source.stop_watching()
+
+
+def rewrite(path, text):
+    # A later mtime than the last write even on coarse-grained filesystems.
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, 'w') as f:
+        f.write(text)
+    os.utime(path, ns=(mtime + 10 ** 9, mtime + 10 ** 9))
+
+
+def edited_csv(path, **changes):
+    data = pd.read_csv(path).astype(object)
+    for column, value in changes.items():
+        data.loc[0, column] = value
+    return data.to_csv(index=False)
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + WATCH_TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "the watcher did not pick up the change"
+        time.sleep(WATCH_INTERVAL)
+
+
+def test_touching_the_file_keeps_the_version(source):
+    before = source.snapshot()
+    os.utime(source.path, ns=(os.stat(source.path).st_mtime_ns + 10 ** 9,) * 2)
+    assert source.reload() is before
+    assert source.version == 1
+
+
+def test_changed_content_is_swapped_in(source):
+    rewrite(source.path, edited_csv(source.path, Salary=123456))
+    dataset = source.reload()
+    assert source.snapshot() is dataset
+    assert dataset.version == 2
+    assert dataset.data.loc[0, 'Salary'] == 123456
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    'Name,Age,Department,Salary,City,lat,lon\n',
+    'Name,Age,Department\nJames Green,56,Finance\n',
+    None,
+], ids=['empty', 'header only', 'missing columns', 'text salary'])
+def test_bad_reload_keeps_the_current_snapshot(source, text):
+    before = source.snapshot()
+    rewrite(source.path, edited_csv(source.path, Salary='lots') if text is None else text)
+    with pytest.raises(ValueError):
+        source.reload()
+    assert source.snapshot() is before
+
+
+def test_truncated_delta_file_reloads_without_its_lines(source):
+    source.start_watching(WATCH_INTERVAL)
+    append_delta(source.delta_path, [{'id': 0, 'Salary': 98000}])
+    wait_for(lambda: source.version == 2)
+    assert source.snapshot().data.loc[0, 'Salary'] == 98000
+
+    open(source.delta_path, 'w').close()
+    wait_for(lambda: source.version == 3)
+    assert source.snapshot().data.equals(pd.read_csv(DATA_PATH).astype(source.snapshot().data.dtypes))
+
+
+def test_truncated_csv_is_picked_up_by_the_watcher_only_once_valid(source):
+    before = source.snapshot()
+    source.start_watching(WATCH_INTERVAL)
+    rewrite(source.path, 'Name,Age,Department,Salary,City,lat,lon\n')
+    time.sleep(WATCH_INTERVAL * 10)
+    assert source.snapshot() is before
+
+    rewrite(source.path, edited_csv(DATA_PATH, Age=61))
+    wait_for(lambda: source.version == 2)
+    assert source.snapshot().data.loc[0, 'Age'] == 61
+
+
+def test_snapshot_in_flight_survives_a_swap(source):
+    snapshot = source.snapshot()
+    page, total = snapshot.employee_page(department='Finance', page_size=10)
+    stats = snapshot.salary_box_stats()
+
+    rewrite(source.path, edited_csv(source.path, Department='HR', Salary=1))
+    assert source.reload() is not snapshot
+
+    assert snapshot.version == 1
+    after, after_total = snapshot.employee_page(department='Finance', page_size=10)
+    pd.testing.assert_frame_equal(after, page)
+    assert after_total == total
+    pd.testing.assert_frame_equal(snapshot.salary_box_stats(), stats)
+    assert not source.snapshot().salary_box_stats().equals(stats)
+
+
+def test_concurrent_readers_see_whole_snapshots(source):
+    stop = threading.Event()
+    seen = []
+
+    def read():
+        while not stop.is_set():
+            snapshot = source.snapshot()
+            seen.append((snapshot.version, len(snapshot), snapshot.fingerprint.split('-')[0]))
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        base = pd.read_csv(DATA_PATH)
+        for rows in (40, 30, len(base)):
+            rewrite(source.path, base.head(rows).to_csv(index=False))
+            source.reload()
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert {version for version, _, _ in seen} <= {1, 2, 3, 4}
+    assert all(str(length) == fingerprint_length for _, length, fingerprint_length in seen)
@@ -0,0 +1,127 @@
+"""
+Row deltas applied to a loaded roster: values sent in the wrong form must
+not break the dataset the dashboards read.
+"""
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dashboard_core import Dataset, load_frame  # noqa: E402
+from dashboard_core.data_source import DataSource  # noqa: E402
+from dashboard_core.delta import append_delta, apply_records  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'dash', 'data.csv')
+
+
+@pytest.fixture
+def frame():
+    return load_frame(DATA_PATH)
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'data.csv')
+    shutil.copy(DATA_PATH, path)
+    return DataSource(path)
+
+
+def statistics(dataset):
+    return (dataset.salary_aggregate('describe'), dataset.salary_box_stats(), dataset.scatter_3d_bins(),
+            dataset.salary_by_department())
+
+
+def test_quoted_numbers_are_parsed(frame):
+    change = apply_records(frame, [{'id': 0, 'Salary': '98000'}, {'id': 1, 'Age': '41'},
+                                   {'id': 2, 'lat': ' 40.5 '}])
+    assert not change.retyped
+    assert change.frame.dtypes.equals(frame.dtypes)
+    assert change.frame.loc[0, 'Salary'] == 98000
+    assert change.frame.loc[1, 'Age'] == 41
+    assert change.frame.loc[2, 'lat'] == 40.5
+
+
+@pytest.mark.parametrize('record', [
+    {'id': 0, 'Salary': 'abc'},
+    {'id': 0, 'Age': '41', 'Salary': ''},
+    {'id': 0, 'Salary': True},
+    {'id': 0, 'Salary': [98000]},
+    {'Name': 'Ada Lovelace', 'Age': 36, 'Department': 'Engineering', 'Salary': 'a lot', 'City': 'Boston'},
+])
+def test_records_with_values_that_are_not_numbers_are_skipped(frame, record):
+    change = apply_records(frame, [record, {'id': 3, 'Salary': 70000}])
+    assert not change.retyped
+    assert len(change.frame) == len(frame)
+    assert change.frame.drop(index=3).equals(frame.drop(index=3))
+    assert change.frame.loc[3, 'Salary'] == 70000
+
+
+def test_numpy_numbers_are_accepted(frame):
+    change = apply_records(frame, [{'id': 0, 'Age': np.int8(39), 'Salary': np.int64(91000), 'lat': np.float32(40.5)}])
+    assert change.frame.loc[0, ['Age', 'Salary', 'lat']].tolist() == [39, 91000, 40.5]
+
+
+def test_missing_numbers_are_kept(frame):
+    change = apply_records(frame, [{'id': 0, 'Salary': None}])
+    assert change.frame['Salary'].isna().sum() == 1
+
+
+def test_statistics_survive_quoted_and_bad_deltas(source):
+    statistics(source.snapshot())
+    append_delta(source.delta_path, [{'id': 0, 'Salary': '98000'}, {'id': 1, 'Age': '41'},
+                                     {'id': 2, 'Salary': 'abc'}])
+    dataset = source.apply_deltas()
+    assert dataset.version == 2
+    assert dataset.data.loc[0, 'Salary'] == 98000
+    statistics(dataset)
+    pd.testing.assert_frame_equal(dataset.salary_box_stats(), Dataset(dataset.data).salary_box_stats())
+
+    # A full reload applies the whole delta file the same way.
+    reloaded = source.reload()
+    assert reloaded.fingerprint == dataset.fingerprint
+    statistics(reloaded)
+
+
+def index_state(index):
+    return (index.departments, index.name_order.tolist(), index.name_rank.tolist(),
+            {department: index.positions(department).tolist() for department in index.departments})
+
+
+# Batches of records applied one after another.  The statistics are built
+# before each, so every batch after one that changes a dtype is applied
+# incrementally too.
+@pytest.mark.parametrize('batches', [
+    [[{'id': 4, 'Name': 'Aaron Abbott'}, {'id': 9, 'Name': 'Zoe Zimmer'}], [{'id': 4, 'Name': 'Mia Moore'}]],
+    [[{'id': 4, 'Department': 'HR'}, {'id': 5, 'Department': 'Finance', 'Salary': 120000}],
+     [{'id': 4, 'Department': 'Marketing'}]],
+    [[{'id': 4, 'Department': 'Legal'}, {'id': 6, 'City': 'Reykjavik', 'lat': 64.1, 'lon': -21.9}],
+     [{'id': 7, 'Department': 'Legal', 'Salary': 99000}, {'id': 4, 'Department': 'Research'}]],
+    [[{'Name': 'Ada Lovelace', 'Age': 36, 'Department': 'Engineering', 'Salary': 120000, 'City': 'Boston',
+       'lat': 42.36, 'lon': -71.06},
+      {'Name': 'Grace Hopper', 'Age': 79, 'Department': 'Research', 'Salary': 150000, 'City': 'Arlington',
+       'lat': 38.88, 'lon': -77.1},
+      {'id': 48, 'Salary': 125000}],
+     [{'id': 49, 'Name': 'Grace Brewster Hopper'}, {'Name': 'Alan Turing', 'Age': 41, 'Department': 'Engineering',
+                                                    'Salary': 110000, 'City': 'Boston', 'lat': 42.4, 'lon': -71.1}]],
+    [[{'id': 4, 'Salary': None}],
+     [{'id': 5, 'Salary': None}, {'id': 4, 'Salary': 50000},
+      {'Name': 'Alan Turing', 'Age': 41, 'Department': 'Engineering', 'City': 'Boston'}]],
+], ids=['names', 'departments', 'new categories', 'appended rows', 'missing salaries'])
+def test_incremental_update_matches_rebuild(frame, batches):
+    updated = Dataset(frame)
+    for records in batches:
+        statistics(updated)
+        updated = updated.apply_delta(records)
+    rebuilt = Dataset(updated.data)
+
+    assert updated.fingerprint == rebuilt.fingerprint
+    assert index_state(updated.index) == index_state(rebuilt.index)
+    for incremental, full in zip(statistics(updated), statistics(rebuilt)):
+        pd.testing.assert_frame_equal(incremental, full)
+    for stat in ('mean', 'median', 'sum'):
+        pd.testing.assert_frame_equal(updated.salary_aggregate(stat), rebuilt.salary_aggregate(stat))
@@ -0,0 +1,178 @@
+"""
+Background jobs are forked from threaded workers; a job must not hang on a
+lock that another thread of the worker held at the fork.
+
+Each test keeps a thread inside a memoized build, or inside the connection
+pool, forks a job the way ``DiskcacheManager`` does meanwhile, and requires
+the job to finish.
+"""
+import gc
+import multiprocessing
+import os
+import sys
+import threading
+import weakref
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dash', 'src')))
+
+import dashboard_core  # noqa: E402
+from dashboard_core import Dataset, SQLiteBackend, load_frame  # noqa: E402
+from dashboard_core import dataset as dataset_module  # noqa: E402
+from dashboard_core import derived_columns  # noqa: E402
+from dashboard_core.export import ExportCache  # noqa: E402
+from dashboard_core.sql_backend import import_csv  # noqa: E402
+from figure_cache import FigureCache  # noqa: E402
+from shared import DeferredSource  # noqa: E402
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'dash', 'data.csv')
+JOB_TIMEOUT = 30
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="background jobs fork only where fork exists")
+
+
+def held_open(monkeypatch, module, name):
+    """
+    Patch ``module.name`` so that building it in this process blocks until
+    released; returns (entered, release) events.  Builds in a forked child
+    run straight through.
+    """
+    original = getattr(module, name)
+    parent = os.getpid()
+    entered, release = threading.Event(), threading.Event()
+
+    def build(*args, **kwargs):
+        if os.getpid() == parent:
+            entered.set()
+            release.wait()
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(module, name, build)
+    return entered, release
+
+
+def fork_while_held(entered, release, hold, job):
+    """
+    Run ``hold`` on a thread until it is inside its build, then run ``job``
+    in a forked child; returns the child's exit code.
+    """
+    holder = threading.Thread(target=hold)
+    holder.start()
+    try:
+        assert entered.wait(JOB_TIMEOUT)
+        process = multiprocessing.get_context('fork').Process(target=job)
+        process.start()
+        process.join(JOB_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+            pytest.fail(f"the forked job hung for {JOB_TIMEOUT}s")
+        return process.exitcode
+    finally:
+        release.set()
+        holder.join()
+
+
+@pytest.fixture
+def dataset():
+    return Dataset(load_frame(DATA_PATH))
+
+
+def test_job_while_salary_statistics_build(monkeypatch, dataset):
+    entered, release = held_open(monkeypatch, dataset_module, 'scatter_3d_bins')
+
+    def job():
+        dataset.salary_box_stats()
+        dataset.salary_aggregate('describe')
+        dataset.scatter_3d_bins()
+
+    assert fork_while_held(entered, release, dataset.scatter_3d_bins, job) == 0
+
+
+def test_job_while_search_index_builds(monkeypatch, dataset):
+    entered, release = held_open(monkeypatch, dataset_module, 'SearchIndex')
+
+    def job():
+        dataset.search_employees('an')
+        dataset.salary_aggregate('mean')
+
+    assert fork_while_held(entered, release, lambda: dataset.search_employees('an'), job) == 0
+
+
+def test_job_while_derived_column_builds(monkeypatch, dataset):
+    entered, release = held_open(monkeypatch, derived_columns, 'age_intervals')
+
+    def job():
+        dataset.map_layer(3)
+        dataset.salary_box_stats()
+
+    assert fork_while_held(entered, release, lambda: dataset.derived.age_interval, job) == 0
+
+
+def test_export_job_while_search_index_builds(monkeypatch, dataset, tmp_path):
+    entered, release = held_open(monkeypatch, dataset_module, 'SearchIndex')
+
+    def job():
+        ExportCache(str(tmp_path)).export(dataset, 'zip', {'search': 'an', 'filter_query': '{Age} > 30'})
+
+    assert fork_while_held(entered, release, lambda: dataset.search_employees('an'), job) == 0
+    assert any(name.endswith('.zip') for name in os.listdir(tmp_path))
+
+
+def test_export_job_on_sqlite_while_a_connection_is_taken(tmp_path):
+    import_csv(DATA_PATH, str(tmp_path / 'data.db'))
+    backend = SQLiteBackend(str(tmp_path / 'data.db'))
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        # A request thread taking or returning a pooled connection.
+        with backend.pool._lock:
+            entered.set()
+            release.wait()
+
+    def job():
+        ExportCache(str(tmp_path / 'exports')).export(backend, 'csv', {'department': 'Finance'})
+
+    assert fork_while_held(entered, release, hold, job) == 0
+
+
+def test_job_while_the_data_source_opens(monkeypatch):
+    entered, release = held_open(monkeypatch, dashboard_core, 'open_data_source')
+    source = DeferredSource(DATA_PATH)
+
+    def job():
+        source.snapshot().salary_box_stats()
+
+    assert fork_while_held(entered, release, source.snapshot, job) == 0
+    source.source.stop_watching()
+
+
+def test_deferred_sources_are_not_kept_alive():
+    source = weakref.ref(DeferredSource(DATA_PATH))
+    gc.collect()
+    assert source() is None
+
+
+def test_figure_job_while_the_cache_is_locked():
+    cache = FigureCache()
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        # A request thread storing a figure.
+        with cache._lock:
+            entered.set()
+            release.wait()
+
+    def job():
+        cache.put('figure', b'{}')
+        assert cache.get('figure') == b'{}'
+
+    assert fork_while_held(entered, release, hold, job) == 0
+
+
+def test_figure_caches_are_not_kept_alive():
+    cache = weakref.ref(FigureCache())
+    gc.collect()
+    assert cache() is None
@@ -0,0 +1,110 @@
+"""
+Content-Encoding negotiation and the cache of compressed response bodies.
+"""
+import gzip
+import os
+import sys
+
+import pytest
+from flask import Flask, Response
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'dash', 'src')))
+
+import serving  # noqa: E402
+from serving import compress_responses, negotiate  # noqa: E402
+
+brotli = pytest.importorskip('brotli')
+
+
+@pytest.mark.parametrize('accept_encoding, coding', [
+    ('gzip, deflate, br', 'br'),
+    ('br, gzip', 'br'),
+    ('gzip', 'gzip'),
+    ('GZIP', 'gzip'),
+    ('br;q=0.5, gzip', 'gzip'),
+    ('gzip;q=0.8, br;q=0.9', 'br'),
+    ('gzip; q=0.8 , br ; q=0.8', 'br'),
+    ('br;q=0, gzip', 'gzip'),
+    ('br;q=0, gzip;q=0', None),
+    ('gzip;level=1;q=0', None),
+    ('br;q=0.0, gzip;q=0.000', None),
+    ('gzip;q=abc', None),
+    ('*', 'br'),
+    ('*;q=0.5, br;q=0', 'gzip'),
+    ('*;q=0', None),
+    ('identity', None),
+    ('identity, gzip;q=0.1', 'gzip'),
+    ('deflate', None),
+    ('', None),
+])
+def test_negotiate(accept_encoding, coding):
+    assert negotiate(accept_encoding) == coding
+
+
+@pytest.mark.parametrize('accept_encoding, coding', [
+    ('gzip, deflate, br', 'gzip'),
+    ('br', None),
+    ('*', 'gzip'),
+    ('gzip;q=0, *', None),
+])
+def test_negotiate_without_brotli(monkeypatch, accept_encoding, coding):
+    monkeypatch.setattr(serving, 'brotli', None)
+    assert negotiate(accept_encoding) == coding
+
+
+BODIES = {
+    '/figure': b'{"data": [' + b'1, ' * 2000 + b'1]}',
+    '/table': b'{"rows": [' + b'"a", ' * 2000 + b'"a"]}',
+    '/small': b'{}',
+}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    for path, body in BODIES.items():
+        app.add_url_rule(path, path, lambda body=body: Response(body, mimetype='application/json'))
+    app.add_url_rule('/missing', 'missing', lambda: Response(BODIES['/figure'], 404, mimetype='application/json'))
+    app.add_url_rule('/image', 'image', lambda: Response(BODIES['/figure'], mimetype='image/png'))
+    return app
+
+
+def get(client, path, accept_encoding):
+    return client.get(path, headers={'Accept-Encoding': accept_encoding})
+
+
+def test_bodies_are_compressed_once_per_coding(app):
+    cache = compress_responses(app)
+    client = app.test_client()
+
+    response = get(client, '/figure', 'gzip, br')
+    assert response.headers['Content-Encoding'] == 'br'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert brotli.decompress(response.get_data()) == BODIES['/figure']
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 1)
+
+    assert get(client, '/figure', 'br').get_data() == response.get_data()
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+    # The same body gzipped is a separate entry; so is another body.
+    response = get(client, '/figure', 'gzip')
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.get_data()) == BODIES['/figure']
+    get(client, '/table', 'br')
+    assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+    assert {key[0] for key in cache._entries} == {'br', 'gzip'}
+
+
+@pytest.mark.parametrize('path, accept_encoding', [
+    ('/figure', 'identity'),
+    ('/figure', ''),
+    ('/small', 'br'),
+    ('/missing', 'br'),
+    ('/image', 'br'),
+])
+def test_responses_left_uncompressed(app, path, accept_encoding):
+    cache = compress_responses(app)
+    response = get(app.test_client(), path, accept_encoding)
+    assert 'Content-Encoding' not in response.headers
+    assert response.get_data() == BODIES.get(path, BODIES['/figure'])
+    assert len(cache) == 0